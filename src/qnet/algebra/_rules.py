@@ -9,9 +9,9 @@ from .core.hilbert_space_algebra import (
 from .core.operator_algebra import (
     Adjoint, Commutator, Create, Destroy, Displace, IdentityOperator, Jminus,
     Jmjmcoeff, Jpjmcoeff, Jplus, Jz, Jzjmcoeff, LocalOperator, LocalProjector,
-    LocalSigma, Operator, OperatorIndexedSum, OperatorPlus, OperatorTimes,
-    OperatorTrace, Phase, PseudoInverse, ScalarTimesOperator, Squeeze,
-    ZeroOperator, decompose_space, factor_for_trace, )
+    LocalSigma, Operator, OperatorIndexedSum, OperatorPlus, OperatorPower,
+    OperatorTimes, OperatorTrace, Phase, PseudoInverse, ScalarTimesOperator,
+    Squeeze, ZeroOperator, decompose_space, factor_for_trace, )
 from .core.scalar_algebra import (
     Scalar, ScalarExpression, ScalarValue, ScalarPlus, ScalarTimes,
     ScalarPower, ScalarIndexedSum, Zero, One, KroneckerDelta)
@@ -131,6 +131,10 @@ def _algebraic_rules_operator():
 
     A_plus = wc("A", head=OperatorPlus)
     A_times = wc("A", head=OperatorTimes)
+    A_pow = wc("A", head=OperatorPower)
+    B_pow = wc("B", head=OperatorPower)
+    pow_n = wc("n", head=int)
+    pow_m = wc("m", head=int)
 
     ls = wc("ls", head=LocalSpace)
     h1 = wc("h1", head=HilbertSpace)
@@ -146,6 +150,50 @@ def _algebraic_rules_operator():
 
     indranges__ = wc("indranges__", head=IndexRangeBase)
 
+    def _power_base(A):
+        return A.base if isinstance(A, OperatorPower) else A
+
+    def pow_times(A, B):
+        """(P**n) * B = P**(n-1) * (P * B), if P * B simplifies"""
+        P = A.base
+        if P.space.isdisjoint(B.space) or P == _power_base(B):
+            raise CannotSimplify()
+        PB = P * B
+        if PB == OperatorTimes(P, B):
+            raise CannotSimplify()
+        return OperatorPower.create(P, A.exp - 1) * PB
+
+    def times_pow(A, B):
+        """A * (P**n) = (A * P) * P**(n-1), if A * P simplifies"""
+        P = B.base
+        if P.space.isdisjoint(A.space) or P == _power_base(A):
+            raise CannotSimplify()
+        AP = A * P
+        if AP == OperatorTimes(A, P):
+            raise CannotSimplify()
+        return AP * OperatorPower.create(P, B.exp - 1)
+
+    OperatorPower._rules.update(check_rules_dict([
+        ('exp0', (
+            pattern_head(A, 0),
+            lambda A: IdentityOperator)),
+        ('exp1', (
+            pattern_head(A, 1),
+            lambda A: A)),
+        ('id', (
+            pattern_head(IdentityOperator, pow_n),
+            lambda n: IdentityOperator)),
+        ('zero', (
+            pattern_head(ZeroOperator, pow_n),
+            lambda n: ZeroOperator)),
+        ('coeff', (
+            pattern_head(pattern(ScalarTimesOperator, u, A), pow_n),
+            lambda u, A, n: u**n * OperatorPower.create(A, n))),
+        ('nested', (
+            pattern_head(pattern(OperatorPower, A, pow_m), pow_n),
+            lambda A, m, n: OperatorPower.create(A, m * n))),
+    ]))
+
     ScalarTimesOperator._rules.update(check_rules_dict([
         ('1A', (
             pattern_head(1, A),
@@ -335,6 +383,14 @@ def _algebraic_rules_operator():
         ('spinord3', (
             pattern_head(pattern(Jz, hs=ls), pattern(Jplus, hs=ls)),
             lambda ls: Jplus(hs=ls) * Jz(hs=ls) + Jplus(hs=ls))),
+
+        # Powers: peel off a single factor if it combines with the neighbor
+        ('powB', (
+            pattern_head(A_pow, B),
+            pow_times)),
+        ('Apow', (
+            pattern_head(A, B_pow),
+            times_pow)),
     ]))
 
     Displace._rules.update(check_rules_dict([
@@ -643,6 +699,8 @@ def _algebraic_rules_state():
     A_times = wc("A", head=OperatorTimes)
     A_local = wc("A", head=LocalOperator)
     B_local = wc("B", head=LocalOperator)
+    A_pow = wc("A", head=OperatorPower)
+    B_pow = wc("B", head=OperatorPower)
 
     nsym = wc("nsym", head=(int, str, SympyBasic))
 
@@ -678,6 +736,16 @@ def _algebraic_rules_state():
     def local_rule(A, B, Psi):
         return OperatorTimes.create(*A) * (B * Psi)
 
+    def power_rule(A, Psi):
+        # A^n * Psi = A^(n-1) * (A * Psi), if (A * Psi) can be evaluated
+        base_ket = A.base * Psi
+        if base_ket == OperatorTimesKet(A.base, Psi):
+            raise CannotSimplify()
+        return OperatorPower.create(A.base, A.exp - 1) * base_ket
+
+    def local_power_rule(A, B, Psi):
+        return OperatorTimes.create(*A) * power_rule(B, Psi)
+
     OperatorTimesKet._rules.update(check_rules_dict([
         ('R001', (  # Id * Psi = Psi
             pattern_head(IdentityOperator, Psi),
@@ -773,6 +841,16 @@ def _algebraic_rules_state():
         ('R021', (
             pattern_head(A, sum),
             lambda A, sum: KetIndexedSum.create(A * sum.term, *sum.ranges))),
+
+        ('R022', (
+            pattern_head(A_pow, Psi_tensor),
+            lambda A, Psi: act_locally(A, Psi))),
+        ('R023', (
+            pattern_head(A_pow, Psi_local),
+            power_rule)),
+        ('R024', (
+            pattern_head(pattern(OperatorTimes, A__, B_pow), Psi_local),
+            local_power_rule)),
     ]))
 
     KetPlus._binary_rules.update(check_rules_dict([
@@ -13,16 +13,19 @@ See :ref:`abstract_algebra` for design details and usage.
 import logging
 from abc import ABCMeta, abstractmethod
 
+import attr
 from sympy import (
     Basic as SympyBasic)
 from sympy.core.sympify import SympifyError
 
-from .exceptions import CannotSimplify
+from .exceptions import CannotSimplify, ExpansionBudgetError
 from ..pattern_matching import ProtoExpr, pattern
 from ...utils.singleton import Singleton
+from ...utils._attrs import immutable_attribs
 
 __all__ = [
-    'Expression', 'Operation', 'simplify', 'simplify_by_method', 'substitute']
+    'Expression', 'Operation', 'ExpansionEstimate', 'simplify',
+    'simplify_by_method', 'substitute']
 
 __private__ = []  # anything not in __all__ must be in __private__
 
@@ -71,6 +74,11 @@ class Expression(metaclass=ABCMeta):
     _instances = {}
     instance_caching = True
 
+    # one token for every active context that changes the rules for creating
+    # expressions (cf. `qnet.algebra.toolbox.core`). Caches of results that
+    # depend on these rules must include the tokens in their keys
+    _rule_contexts = ()
+
     # eventually, we should ensure that the create method is idempotent, i.e.
     # expr.create(*expr.args, **expr.kwargs) == expr(*expr.args, **expr.kwargs)
     _create_idempotent = False
@@ -509,6 +517,43 @@ def _bound_symbols(expr):
         return set()
 
 
+@immutable_attribs
+class ExpansionEstimate():
+    """Estimated size of the result of an expansion, as obtained from the
+    operands of an expression without doing the expansion, cf.
+    :meth:`.QuantumExpression.estimate_expansion` and
+    :meth:`.IndexedSum.estimate_doit`
+
+    Attributes:
+        terms (int): The number of terms, or :obj:`sympy.oo` for the
+            expansion of an infinite sum
+        factors (int): The (maximum) number of factors in a term
+    """
+    terms = attr.ib()
+    factors = attr.ib(default=1)
+
+    # Approximate memory footprint of a new term (a product with a scalar
+    # coefficient), and of every factor referenced by it, in CPython
+    _term_nbytes = 1500
+    _factor_nbytes = 64
+
+    @property
+    def nbytes(self):
+        """Approximate memory (in bytes) that the expansion requires"""
+        return self.terms * (
+            self._term_nbytes + self._factor_nbytes * self.factors)
+
+    def check_budget(self, budget, what):
+        """Raise an :exc:`.ExpansionBudgetError` if the estimated number of
+        terms exceeds `budget` (if not None). The string `what` describes the
+        expansion in the error message"""
+        if budget is not None and self.terms > budget:
+            raise ExpansionBudgetError(
+                "%s would produce an estimated %s terms (approx. %.3g MB), "
+                "which exceeds the budget of %s terms"
+                % (what, self.terms, self.nbytes / 1e6, budget))
+
+
 class Operation(Expression, metaclass=ABCMeta):
     """Base class for all "operations", i.e. Expressions that act algebraically
     on other expressions (their "operands").
@@ -7,6 +7,7 @@ The algebra defined in this module is the superset of the Hilbert space algebra
 of states (augmented by the tensor product), and the C* algebras of operators
 and superoperators.
 """
+import hashlib
 import re
 from abc import ABCMeta, abstractmethod
 from itertools import product as cartesian_product
@@ -15,12 +16,16 @@ import sympy
 from sympy import Symbol, sympify
 
 from .hilbert_space_algebra import ProductSpace, LocalSpace, TrivialSpace
-from .abstract_algebra import Operation, Expression, substitute
+from .abstract_algebra import (
+    Operation, Expression, ExpansionEstimate, substitute)
 from .indexed_operations import IndexedSum
 from ...utils.ordering import (
     DisjunctCommutativeHSOrder, FullCommutativeHSOrder, KeyTuple, )
 from ...utils.indices import (
     SymbolicLabelBase, IndexOverList, IndexOverFockSpace, IndexOverRange)
+from ...utils.lru import LRUDict
+from ...utils.simplify_cache import get_simplify_cache, simplify_cached
+from ...utils.simplify_profiles import get_simplify_func
 
 
 __all__ = [
@@ -105,21 +110,160 @@ class QuantumExpression(Expression, metaclass=ABCMeta):
     def _adjoint(self):
         raise NotImplementedError(self.__class__.__name__)
 
-    def expand(self):
+    def expand(self, budget=None):
         """Expand out distributively all products of sums.
 
+        Args:
+            budget (int or None): If given, the maximum number of terms that
+                the expansion may produce, according to
+                :meth:`estimate_expansion`. This is checked before doing any
+                work.
+
+        Raises:
+            .ExpansionBudgetError: if the expansion is estimated to exceed
+                `budget`
+
         Note:
             This does not expand out sums of scalar coefficients. You may use
             :meth:`simplify_scalar` for this purpose.
         """
+        if budget is not None:
+            self.estimate_expansion().check_budget(
+                budget, what="Expanding %s" % self.__class__.__name__)
         return self._expand()
 
     def _expand(self):
         return self
 
-    def simplify_scalar(self, func=sympy.simplify):
+    def estimate_expansion(self):
+        """Estimate the size of the result of :meth:`expand` from the number
+        of operands in the expression tree, without doing the expansion.
+
+        The estimate counts the products of all summands of all factors. It
+        does not account for terms that are combined or that cancel, nor
+        for additional terms from simplification rules (e.g., normal
+        ordering):
+
+            >>> A = OperatorSymbol('A', hs=1)
+            >>> B = OperatorSymbol('B', hs=1)
+            >>> ((A + B) * (A - B) * (A + 2 * B)).estimate_expansion().terms
+            8
+
+        Returns:
+            .ExpansionEstimate: the estimated number of terms and memory
+        """
+        return self._estimate_expansion()
+
+    def _estimate_expansion(self):
+        return ExpansionEstimate(terms=1, factors=1)
+
+    def fingerprint(self, ndigits=8):
+        """Hash of the expanded expression that is independent of the order
+        and grouping of its terms.
+
+        The fingerprint is computed from the :meth:`iter_terms` of the
+        expression, after collecting like terms. Numeric coefficients (and
+        floats in symbolic coefficients) are rounded to `ndigits` significant
+        digits, and symbolic coefficients are expanded, but not simplified.
+        Thus, expressions with equal expanded forms are likely to have the
+        same fingerprint. The converse does not hold: expressions that are
+        equal only after simplification of their coefficients, e.g. with a
+        coefficient ``(k**2 - 1) / (k - 1)`` instead of ``k + 1``, have
+        different fingerprints. This allows to bucket candidate-equal
+        expressions cheaply, and to compare only within a bucket:
+
+            >>> A = OperatorSymbol('A', hs=1)
+            >>> B = OperatorSymbol('B', hs=1)
+            >>> expr1 = (A + B) * (A - B)
+            >>> expr2 = A * A - B * B + (B * A - A * B) * (1 - 1e-12)
+            >>> expr1 == expr2
+            False
+            >>> expr1.fingerprint() == expr2.fingerprint()
+            True
+            >>> expr1.fingerprint() == (A * A - B * B).fingerprint()
+            False
+
+        The fingerprint is a hex string that does not depend on the Python
+        process (hash randomization), so it is suitable for persistent caches.
+        """
+        from qnet.printing import srepr
+        from qnet.algebra.core.scalar_algebra import Scalar
+        coeffs = {}
+        for (coeff, term) in self.iter_terms():
+            if isinstance(term, Scalar):
+                coeff, term = coeff * term, None
+            if term in coeffs:
+                coeffs[term] = coeffs[term] + coeff
+            else:
+                coeffs[term] = coeff
+        items = []
+        for (term, coeff) in coeffs.items():
+            coeff_key = _fingerprint_coeff(coeff, ndigits)
+            if coeff_key is not None:
+                term_key = '1' if term is None else srepr(term)
+                items.append(term_key + ':' + coeff_key)
+        digest = hashlib.sha1()
+        for item in sorted(items):
+            digest.update(item.encode('utf-8'))
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def iter_terms(self):
+        """Iterate over the terms of the distributive expansion of the
+        expression, without instantiating the expanded sum.
+
+        Yields:
+            tuples ``(coeff, term)`` of a scalar coefficient and an expression
+            that is neither a sum nor a product with a scalar, such that the
+            sum of all ``coeff * term`` is equal to :meth:`expand`. Like terms
+            are not collected: the same `term` may occur more than once.
+
+        Only the terms of the individual factors of a product are held in
+        memory, so that very large expansions can be consumed one term at a
+        time, e.g. by :func:`.get_coeffs` or :func:`.convert_to_qutip`:
+
+            >>> A = OperatorSymbol('A', hs=1)
+            >>> B = OperatorSymbol('B', hs=1)
+            >>> for (coeff, term) in ((A + 2 * B) * A).iter_terms():
+            ...     print(ascii(coeff), ascii(term))
+            1 A^(1) * A^(1)
+            2 B^(1) * A^(1)
+        """
+        return self._iter_terms()
+
+    def expand_iter(self):
+        """Alias for :meth:`iter_terms`"""
+        return self._iter_terms()
+
+    def _iter_terms(self):
+        # Subclasses for which `expand` combines the terms of their operands
+        # should override this to yield the terms lazily
+        expanded = self.expand()
+        if isinstance(expanded, QuantumPlus):
+            summands = expanded.operands
+        else:
+            summands = (expanded, )
+        for summand in summands:
+            yield from _iter_scaled_terms(_one_coeff(), summand)
+
+    def simplify_scalar(self, func=None, workers=None):
         """Simplify all scalar symbolic (SymPy) coefficients by appyling `func`
-        to them"""
+        to them
+
+        If `func` is None, use the current default simplification profile
+        (:func:`sympy.simplify`, unless changed), cf.
+        :mod:`qnet.utils.simplify_profiles`. Instead of a function, `func` may
+        also be the name of a profile (``'fast'``, ``'thorough'``).
+
+        The results of `func` are cached process-wide, see
+        :mod:`qnet.utils.simplify_cache`. If `workers` is given, the distinct
+        coefficients are first simplified in a pool of `workers` processes
+        (see :meth:`.SimplifyCache.populate`), and the expression is rebuilt
+        from the results.
+        """
+        func = get_simplify_func(func)
+        if workers is not None:
+            get_simplify_cache().populate(func, self, workers=workers)
         return self._simplify_scalar(func=func)
 
     def _simplify_scalar(self, func):
@@ -150,6 +294,42 @@ class QuantumExpression(Expression, metaclass=ABCMeta):
         # TODO: abstract_method
         raise NotImplementedError()
 
+    def gradient(self, syms, expand_simplify: bool = True) -> tuple:
+        """Differentiate by several scalar parameters in a single pass.
+
+        This is equivalent to ``tuple(self.diff(sym) for sym in syms)``, but
+        the expression tree is traversed only once: subexpressions that do not
+        depend on any of the `syms` are skipped, and intermediary results (e.g.
+        the partial products of a :class:`QuantumTimes`) are shared between
+        all parameters.
+
+        Args:
+            syms: Sequence of scalar parameters to differentiate by
+            expand_simplify: Whether to simplify the results.
+
+        Returns:
+            tuple of the first derivatives, in the same order as `syms`
+        """
+        syms = tuple(syms)
+        grad = _partial_gradient(self, syms, memo={})
+        res = []
+        for sym in syms:
+            if sym in grad:
+                expr = grad[sym]
+                if expand_simplify:
+                    expr = expr.expand().simplify_scalar()
+            else:
+                expr = self.__class__._zero
+            res.append(expr)
+        return tuple(res)
+
+    def _gradient(self, syms, memo):
+        # Return a dict sym => derivative, for all `syms` (which `self` is
+        # guaranteed to depend on). Subclasses should override this to share
+        # work between the `syms`, and use `_partial_gradient` to obtain
+        # the gradients of their operands.
+        return {sym: self._diff(sym) for sym in syms}
+
     def series_expand(
             self, param: Symbol, about, order: int) -> tuple:
         r"""Expand the expression as a truncated power series in a
@@ -181,6 +361,15 @@ class QuantumExpression(Expression, metaclass=ABCMeta):
                 >>> t = sympy.symbols("t")
                 >>> assert expr.series_expand(t, 0, 1) == (expr, ZeroKet)
         """
+        # expansions are cached per (expr, param, about) and rule context; an
+        # expansion to some order contains the expansion to any lower order
+        key = (self, param, about, Expression._rule_contexts)
+        try:
+            cached = _SERIES_CACHE[key]
+            if len(cached) > order:
+                return cached[:order + 1]
+        except (KeyError, TypeError):
+            pass
         expansion = self._series_expand(param, about, order)
         # _series_expand is generally not "type-stable", so we continue to
         # ensure the type-stability
@@ -192,7 +381,12 @@ class QuantumExpression(Expression, metaclass=ABCMeta):
                 v = self._one
             assert isinstance(v, self._base_cls)
             res.append(v)
-        return tuple(res)
+        res = tuple(res)
+        try:
+            _SERIES_CACHE[key] = res
+        except TypeError:
+            pass  # unhashable `about`
+        return res
 
     def _series_expand(self, param, about, order):
         # Expressions are assumed constant by default.
@@ -248,7 +442,10 @@ class QuantumExpression(Expression, metaclass=ABCMeta):
 
     def __truediv__(self, other):
         try:
-            factor = _sympyOne / other
+            if isinstance(other, (float, complex)):
+                factor = 1 / other  # keep numeric coefficients native
+            else:
+                factor = _sympyOne / other
             return self * factor
         except TypeError:
             try:
@@ -386,7 +583,7 @@ class SingleQuantumOperation(QuantumOperation, metaclass=ABCMeta):
 
     def _series_expand(self, param, about, order):
         ope = self.operand.series_expand(param, about, order)
-        return tuple(opet.adjoint() for opet in ope)
+        return _TruncatedSeries(ope, order).adjoint().coeffs
 
 
 class QuantumAdjoint(SingleQuantumOperation, metaclass=ABCMeta):
@@ -399,9 +596,16 @@ class QuantumAdjoint(SingleQuantumOperation, metaclass=ABCMeta):
             return self.__class__._plus_cls.create(*summands)
         return eo.adjoint()
 
+    def _estimate_expansion(self):
+        return self.operand._estimate_expansion()
+
     def _diff(self, sym):
         return self.__class__.create(self.operands[0].diff(sym))
 
+    def _gradient(self, syms, memo):
+        grad = _partial_gradient(self.operand, syms, memo)
+        return {sym: self.__class__.create(d) for (sym, d) in grad.items()}
+
     def _adjoint(self):
         return self.operand
 
@@ -421,6 +625,16 @@ class QuantumPlus(QuantumOperation, metaclass=ABCMeta):
         summands = [o.expand() for o in self.operands]
         return self.__class__._plus_cls.create(*summands)
 
+    def _iter_terms(self):
+        for o in self.operands:
+            yield from o._iter_terms()
+
+    def _estimate_expansion(self):
+        estimates = [o._estimate_expansion() for o in self.operands]
+        return ExpansionEstimate(
+            terms=sum(e.terms for e in estimates),
+            factors=max(e.factors for e in estimates))
+
     def _series_expand(self, param, about, order):
         tuples = (o.series_expand(param, about, order) for o in self.operands)
         res = (self.__class__._plus_cls.create(*tels) for tels in zip(*tuples))
@@ -429,6 +643,14 @@ class QuantumPlus(QuantumOperation, metaclass=ABCMeta):
     def _diff(self, sym):
         return sum([o.diff(sym) for o in self.operands], self.__class__._zero)
 
+    def _gradient(self, syms, memo):
+        summands = {}
+        for o in self.operands:
+            for (sym, d) in _partial_gradient(o, syms, memo).items():
+                summands.setdefault(sym, []).append(d)
+        return {
+            sym: sum(ds[1:], ds[0]) for (sym, ds) in summands.items()}
+
     def _adjoint(self):
         return self.__class__._plus_cls(*[o.adjoint() for o in self.operands])
 
@@ -479,18 +701,18 @@ class QuantumTimes(QuantumOperation, metaclass=ABCMeta):
         else:
             return ret
 
+    def _iter_terms(self):
+        return _iter_product_terms(
+            self.operands, self.__class__._times_cls.create)
+
+    def _estimate_expansion(self):
+        return _estimate_product_expansion(self.operands)
+
     def _series_expand(self, param, about, order):
         assert len(self.operands) > 1
-        cfirst = self.operands[0].series_expand(param, about, order)
-        if len(self.operands) > 2:
-            crest = (
-                self.__class__(*self.operands[1:])
-                .series_expand(param, about, order))
-        else:
-            # a single remaining operand needs to be treated explicitly because
-            # we didn't use `create` for the `crest` above, for efficiency
-            crest = self.operands[1].series_expand(param, about, order)
-        return _series_expand_combine_prod(cfirst, crest, order)
+        series = _TruncatedSeries.product(
+            self.operands, param, about, order)
+        return series.coeffs
 
     def _diff(self, sym):
         assert len(self.operands) > 1
@@ -498,6 +720,26 @@ class QuantumTimes(QuantumOperation, metaclass=ABCMeta):
         rest = self.__class__._times_cls.create(*self.operands[1:])
         return first.diff(sym) * rest + first * rest.diff(sym)
 
+    def _gradient(self, syms, memo):
+        # product rule: the partial products to the left and right of each
+        # factor are constructed once, for all `syms`
+        ops = self.operands
+        times = self.__class__._times_cls.create
+        res = {}
+        for (i, o) in enumerate(ops):
+            grad = _partial_gradient(o, syms, memo)
+            if len(grad) == 0:
+                continue
+            left = times(*ops[:i]) if i > 0 else None
+            right = times(*ops[i+1:]) if i < len(ops) - 1 else None
+            for (sym, d) in grad.items():
+                if left is not None:
+                    d = left * d
+                if right is not None:
+                    d = d * right
+                res[sym] = (res[sym] + d) if sym in res else d
+        return res
+
     def _adjoint(self):
         return self.__class__._times_cls.create(
                 *[o.adjoint() for o in reversed(self.operands)])
@@ -573,20 +815,36 @@ class ScalarTimesQuantumExpression(
             return self.__class__._plus_cls.create(*summands)
         return c * et
 
+    def _iter_terms(self):
+        for (c, t) in self.term._iter_terms():
+            yield self.coeff * c, t
+
+    def _estimate_expansion(self):
+        return self.term._estimate_expansion()
+
     def _series_expand(self, param, about, order):
-        ce = self.coeff.series_expand(param, about, order)
-        te = self.term.series_expand(param, about, order)
-        return _series_expand_combine_prod(ce, te, order)
+        series = _TruncatedSeries.product(
+            (self.coeff, self.term), param, about, order)
+        return series.coeffs
 
     def _diff(self, sym):
         c, t = self.operands
         return c.diff(sym) * t + c * t.diff(sym)
 
+    def _gradient(self, syms, memo):
+        c, t = self.operands
+        res = {
+            sym: d * t
+            for (sym, d) in _partial_gradient(c, syms, memo).items()}
+        for (sym, d) in _partial_gradient(t, syms, memo).items():
+            res[sym] = (res[sym] + c * d) if sym in res else c * d
+        return res
+
     def _simplify_scalar(self, func):
         coeff, term = self.operands
         try:
             if isinstance(coeff.val, sympy.Basic):
-                coeff = func(coeff)
+                coeff = simplify_cached(coeff.val, func=func)
         except AttributeError:
             # coeff is not a SymPy ScalarValue; leave it unchanged
             pass
@@ -613,6 +871,9 @@ class QuantumIndexedSum(IndexedSum, SingleQuantumOperation, metaclass=ABCMeta):
     def _expand(self):
         return self.__class__.create(self.term.expand(), *self.ranges)
 
+    def _estimate_expansion(self):
+        return self.term._estimate_expansion()
+
     def _series_expand(self, param, about, order):
         raise NotImplementedError()
 
@@ -814,25 +1075,224 @@ def ensure_local_space(hs):
     return hs
 
 
+def _partial_gradient(expr, syms, memo):
+    """Dict of the derivatives of `expr` by those of the `syms` that `expr`
+    depends on.
+
+    The result for every sub-expression is stored in `memo`, so that shared
+    sub-expressions are only differentiated once.
+    """
+    try:
+        return memo[expr]
+    except KeyError:
+        free_symbols = expr.free_symbols
+        syms = [
+            sym for sym in syms if sym.free_symbols.issubset(free_symbols)]
+        if len(syms) == 0:
+            grad = {}
+        else:
+            grad = expr._gradient(syms, memo)
+        memo[expr] = grad
+        return grad
+
+
+def _one_coeff():
+    from qnet.algebra.core.scalar_algebra import One
+    return One
+
+
+def _iter_product_terms(factors, product, conjugate=()):
+    """Iterate over the ``(coeff, term)`` tuples of the distributive expansion
+    of the product of `factors`, where `product` is a callable that
+    instantiates the product of the terms of the individual factors. The
+    coefficients of the factors at the indices in `conjugate` are complex
+    conjugated (e.g., for a factor that is the ket of a bra).
+
+    Only the terms of each factor are stored, not their cartesian product.
+    """
+    factor_terms = []
+    for (i, factor) in enumerate(factors):
+        if i in conjugate:
+            factor_terms.append(
+                [(c.conjugate(), t) for (c, t) in factor._iter_terms()])
+        else:
+            factor_terms.append(list(factor._iter_terms()))
+    for combo in cartesian_product(*factor_terms):
+        coeff = _one_coeff()
+        for (c, _) in combo:
+            coeff *= c
+        summand = product(*[t for (_, t) in combo])
+        yield from _iter_scaled_terms(coeff, summand)
+
+
+def _iter_scaled_terms(coeff, expr):
+    """Iterate over the ``(coeff, term)`` tuples of ``coeff * expr``, where
+    `expr` is a summand of an expansion. As the product of two terms may
+    produce a sum (e.g., through normal ordering), `expr` is expanded further
+    if necessary."""
+    if isinstance(expr, ScalarTimesQuantumExpression):
+        coeff, expr = coeff * expr.coeff, expr.term
+    if expr.is_zero:
+        return
+    if (isinstance(expr, QuantumPlus) or
+            (isinstance(expr, QuantumTimes) and
+             any(isinstance(o, QuantumPlus) for o in expr.operands))):
+        for (c, t) in expr._iter_terms():
+            yield coeff * c, t
+    else:
+        yield coeff, expr
+
+
+def _fingerprint_coeff(coeff, ndigits):
+    """Normalized string representation of a scalar `coeff`, for
+    :meth:`QuantumExpression.fingerprint`, or None if `coeff` vanishes"""
+    from qnet.printing import srepr
+    coeff = getattr(coeff, 'val', coeff)  # unwrap ScalarValue
+    try:
+        val = complex(coeff)
+    except (TypeError, ValueError):
+        pass
+    else:
+        re = _round_significant(val.real, ndigits)
+        im = _round_significant(val.imag, ndigits)
+        if re == 0 and im == 0:
+            return None
+        return repr(complex(re, im))
+    if isinstance(coeff, sympy.Basic):
+        coeff = sympy.expand(coeff)
+        coeff = coeff.xreplace({
+            f: sympy.Float(_round_significant(float(f), ndigits))
+            for f in coeff.atoms(sympy.Float)})
+        if coeff == 0:
+            return None
+        return sympy.srepr(coeff)
+    return srepr(coeff)
+
+
+def _round_significant(val, ndigits):
+    """Round the float `val` to `ndigits` significant digits"""
+    return float('%.*g' % (ndigits, val)) + 0.0  # normalize -0.0
+
+
+def _estimate_product_expansion(factors):
+    """:class:`.ExpansionEstimate` for the expansion of the product of
+    `factors`"""
+    terms = 1
+    n_factors = 0
+    for factor in factors:
+        estimate = factor._estimate_expansion()
+        terms *= estimate.terms
+        n_factors += estimate.factors
+    return ExpansionEstimate(terms=terms, factors=n_factors)
+
+
+#: Bounded cache for the coefficients of
+#: :meth:`QuantumExpression.series_expand`
+_SERIES_CACHE = LRUDict(maxsize=10000)
+
+
 def _series_expand_combine_prod(c1, c2, order):
     """Given the result of the ``c1._series_expand(...)`` and
     ``c2._series_expand(...)``, construct the result of
     ``(c1*c2)._series_expand(...)``
     """
+    series = _TruncatedSeries(c1, order) * _TruncatedSeries(c2, order)
+    return series.coeffs
+
+
+class _TruncatedSeries():
+    r"""Power series $\sum_{n=0}^{N} c_n (x - x_0)^n$, truncated at order $N$
+
+    The coefficients $c_n$ are the type-stable results of
+    :meth:`QuantumExpression.series_expand`. Vanishing coefficients are
+    tracked, so that arithmetic only evaluates those contributions that
+    survive the truncation.
+
+    Args:
+        coeffs: sequence of coefficients $(c_0, c_1, \dots)$
+        order: truncation order $N$. Coefficients beyond $N$ are dropped.
+    """
+
+    __slots__ = ('coeffs', 'nonzero')
+
+    def __init__(self, coeffs, order):
+        self.coeffs = tuple(coeffs)[:order + 1]
+        if len(self.coeffs) <= order:
+            raise ValueError(
+                "Need at least %d coefficients for series of order %d"
+                % (order + 1, order))
+        self.nonzero = tuple(
+            n for (n, c) in enumerate(self.coeffs) if not _coeff_is_zero(c))
+
+    @property
+    def order(self):
+        """Truncation order $N$"""
+        return len(self.coeffs) - 1
+
+    @property
+    def is_zero(self):
+        """Whether all coefficients vanish up to the truncation order"""
+        return len(self.nonzero) == 0
+
+    def __add__(self, other):
+        order = min(self.order, other.order)
+        return _TruncatedSeries(
+            [_sum_coeffs([a, b])
+             for (a, b) in zip(self.coeffs[:order+1], other.coeffs)],
+            order)
+
+    def __mul__(self, other):
+        order = min(self.order, other.order)
+        coeffs = [[] for _ in range(order + 1)]
+        other_nonzero = [m for m in other.nonzero if m <= order]
+        for k in self.nonzero:
+            if k > order:
+                break
+            for m in other_nonzero:
+                if k + m > order:
+                    break
+                coeffs[k + m].append(self.coeffs[k] * other.coeffs[m])
+        return _TruncatedSeries(
+            [_sum_coeffs(summands) for summands in coeffs], order)
+
+    def adjoint(self):
+        """Series of the Hermitian adjoint"""
+        return _TruncatedSeries([c.adjoint() for c in self.coeffs], self.order)
+
+    @classmethod
+    def product(cls, factors, param, about, order):
+        """Series of the product of all `factors`, evaluated in a single
+        left-to-right pass.
+
+        Orders beyond `order` are discarded after every partial product, and
+        the remaining factors are not expanded at all once the partial
+        product vanishes up to `order`.
+        """
+        factors = iter(factors)
+        series = cls(next(factors).series_expand(param, about, order), order)
+        for factor in factors:
+            if series.is_zero:
+                break
+            series = series * cls(
+                factor.series_expand(param, about, order), order)
+        return series
+
+
+def _sum_coeffs(summands):
+    """Sum of the non-vanishing `summands` (scalar :obj:`.Zero` if there are
+    none)"""
     from qnet.algebra.core.scalar_algebra import Zero
-    res = []
-    c1 = list(c1)
-    c2 = list(c2)
-    for n in range(order + 1):
-        summands = []
-        for k in range(n + 1):
-            if c1[k].is_zero or c2[n-k].is_zero:
-                summands.append(Zero)
-            else:
-                summands.append(c1[k] * c2[n - k])
-        sum = summands[0]
-        for summand in summands[1:]:
-            if summand != 0:
-                sum += summand
-        res.append(sum)
-    return tuple(res)
+    res = Zero
+    for summand in summands:
+        if not _coeff_is_zero(summand):
+            res = summand if res is Zero else res + summand
+    return res
+
+
+def _coeff_is_zero(coeff):
+    """Whether a series coefficient vanishes. This also covers coefficients
+    that are plain numbers (e.g., from products of bras and kets)"""
+    try:
+        return bool(coeff.is_zero)
+    except AttributeError:
+        return coeff == 0
@@ -15,7 +15,10 @@ __private__ = [
     'convert_to_spaces', 'empty_trivial', 'implied_local_space',
     'delegate_to_method', 'scalars_to_op', 'convert_to_scalars',
     'disjunct_hs_zero', 'commutator_order', 'accept_bras',
-    'basis_ket_zero_outside_hs', 'indexed_sum_over_const',
+    'basis_ket_zero_outside_hs', 'ladder_zero_in_truncation',
+    'local_sigma_product', 'basis_ket_overlap', 'basis_ket_outer_product',
+    'collect_powers',
+    'indexed_sum_over_const',
     'indexed_sum_over_kronecker', 'scalar_indexed_sum_over_kronecker']
 
 
@@ -482,6 +485,176 @@ def basis_ket_zero_outside_hs(cls, ops, kwargs):
     return ops, kwargs
 
 
+def ladder_zero_in_truncation(cls, ops, kwargs):
+    r"""Return :obj:`.ZeroOperator` (for :class:`.OperatorTimes`) or
+    :obj:`.ZeroKet` (for :class:`.OperatorTimesKet`) if the product of
+    operators in `ops` vanishes in the finite dimension of the underlying
+    Hilbert spaces, or an unchanged `ops`, `kwargs` otherwise.
+
+    A sequence of ladder operators (:class:`.Create`, :class:`.Destroy`,
+    :class:`.Jplus`, :class:`.Jminus`, and the diagonal :class:`.Jz`) acting
+    on a :class:`.LocalSpace` of dimension $N$ vanishes if there is no basis
+    state that it can be applied to without leaving the levels $0, \dots,
+    N-1$. For example, ``Destroy(hs=hs)**N`` is zero.
+
+    This is not part of the default simplifications, as it treats the Fock
+    space of a harmonic oscillator as truncated; cf.
+    :func:`.truncated_algebra`.
+    """
+    from qnet.algebra.core.operator_algebra import (
+        OperatorTimes, ZeroOperator)
+    from qnet.algebra.core.state_algebra import OperatorTimesKet, ZeroKet
+    if issubclass(cls, OperatorTimesKet):
+        operator = ops[0]
+        if isinstance(operator, OperatorTimes):
+            factors = operator.operands
+        else:
+            factors = (operator, )
+        zero = ZeroKet
+    else:
+        factors = ops
+        zero = ZeroOperator
+    if _ladder_product_vanishes(factors):
+        return zero
+    return ops, kwargs
+
+
+def _ladder_product_vanishes(factors):
+    """Whether any uninterrupted run of ladder operators within `factors`
+    (each acting on a :class:`.LocalSpace` with a basis) leaves the range of
+    levels of its Hilbert space for every possible initial state"""
+    from qnet.algebra.core.hilbert_space_algebra import LocalSpace
+    from qnet.algebra.core.operator_algebra import (
+        Create, Destroy, Jplus, Jminus, Jz, OperatorPower)
+    shifts = {Create: 1, Jplus: 1, Destroy: -1, Jminus: -1, Jz: 0}
+    runs = {}  # hs => [shift, min_shift, max_shift], applied right-to-left
+    for factor in reversed(factors):
+        count = 1
+        if isinstance(factor, OperatorPower):
+            factor, count = factor.base, factor.exp
+        shift = shifts.get(factor.__class__, None)
+        hs = factor.space
+        if (shift is not None and isinstance(hs, LocalSpace) and
+                hs.has_basis):
+            run = runs.setdefault(hs, [0, 0, 0])
+            # the shifts of a power are monotonic, so its end point is
+            # sufficient to update the extrema
+            run[0] += count * shift
+            run[1] = min(run[1], run[0])
+            run[2] = max(run[2], run[0])
+            if run[2] - run[1] >= hs.dimension:
+                return True
+        else:
+            # a non-ladder factor interrupts all runs that it does not
+            # commute with
+            for run_hs in list(runs.keys()):
+                if not hs.isdisjoint(run_hs):
+                    del runs[run_hs]
+    return False
+
+
+def local_sigma_product(cls, ops, kwargs):
+    r"""Combine subsequent :class:`.LocalSigma` operands on the same Hilbert
+    space, $\Op{\sigma}_{jk} \Op{\sigma}_{lm} = \delta_{kl}
+    \Op{\sigma}_{jm}$, directly from the levels $k$, $l$.
+
+    This is a fast path for the corresponding binary rules of
+    :class:`.OperatorTimes`: as :class:`.LocalSigma` stores non-symbolic
+    levels either all as labels (if the Hilbert space has a basis) or all as
+    integer indices, $\delta_{kl}$ is a plain comparison that does not
+    require a lookup in the basis. Pairs involving symbolic labels are left to
+    the rules. Returns :obj:`.ZeroOperator` if any pair is orthogonal, the
+    single remaining operand, or the modified `ops`, `kwargs`.
+
+    Like the rules it replaces, this is disabled if the binary rule ``'sig'``
+    is not present (e.g. inside :func:`.no_rules`).
+    """
+    from qnet.algebra.core.operator_algebra import LocalSigma, ZeroOperator
+    from qnet.utils.indices import SymbolicLabelBase
+    if 'sig' not in cls._binary_rules:
+        return ops, kwargs
+    res = []
+    for op in ops:
+        if len(res) > 0 and isinstance(op, LocalSigma):
+            prev = res[-1]
+            if (isinstance(prev, LocalSigma) and prev.space == op.space and
+                    not isinstance(prev.k, SymbolicLabelBase) and
+                    not isinstance(op.j, SymbolicLabelBase)):
+                if prev.k == op.j:
+                    res[-1] = LocalSigma.create(prev.j, op.k, hs=op.space)
+                    continue
+                else:
+                    return ZeroOperator
+        res.append(op)
+    if len(res) == 1:
+        return res[0]
+    return tuple(res), kwargs
+
+
+def collect_powers(cls, ops, kwargs):
+    """Collect consecutive identical operands (or powers of identical
+    operands) into an :class:`.OperatorPower`. Returns the single remaining
+    power, or the modified `ops`, `kwargs`.
+
+    This must run after :func:`match_replace_binary`, so that any pair of
+    identical operands that can be simplified by the rules has already been
+    combined.
+    """
+    from qnet.algebra.core.operator_algebra import OperatorPower
+    res = []  # list of [base, exp]
+    for op in ops:
+        if isinstance(op, OperatorPower):
+            base, exp = op.base, op.exp
+        else:
+            base, exp = op, 1
+        if len(res) > 0 and res[-1][0] == base:
+            res[-1][1] += exp
+        else:
+            res.append([base, exp])
+    if len(res) == len(ops):
+        return ops, kwargs
+    new_ops = tuple(
+        base if exp == 1 else OperatorPower.create(base, exp)
+        for (base, exp) in res)
+    if len(new_ops) == 1:
+        return new_ops[0]
+    return new_ops, kwargs
+
+
+def basis_ket_overlap(cls, ops, kwargs):
+    """For a :class:`.BraKet` of two :class:`.BasisKet` instances with integer
+    indices in the same Hilbert space, return :obj:`.One` or :obj:`.Zero`
+    without going through the rules (if the corresponding rule ``'R003'`` is
+    active)"""
+    from qnet.algebra.core.scalar_algebra import One, Zero
+    from qnet.algebra.core.state_algebra import BasisKet
+    bra, ket = ops
+    if ('R003' in cls._rules and
+            isinstance(bra, BasisKet) and isinstance(ket, BasisKet) and
+            bra.space == ket.space):
+        i, j = bra.index, ket.index
+        if isinstance(i, int) and isinstance(j, int):
+            return One if i == j else Zero
+    return ops, kwargs
+
+
+def basis_ket_outer_product(cls, ops, kwargs):
+    """For a :class:`.KetBra` of two :class:`.BasisKet` instances with integer
+    indices in the same Hilbert space, return the corresponding
+    :class:`.LocalSigma` without going through the rules (if the corresponding
+    rule ``'R001'`` is active)"""
+    from qnet.algebra.core.operator_algebra import LocalSigma
+    from qnet.algebra.core.state_algebra import BasisKet
+    ket, bra = ops
+    if ('R001' in cls._rules and
+            isinstance(bra, BasisKet) and isinstance(ket, BasisKet) and
+            bra.space == ket.space):
+        i, j = ket.index, bra.index
+        if isinstance(i, int) and isinstance(j, int):
+            return LocalSigma(i, j, hs=ket.space)
+    return ops, kwargs
+
+
 def indexed_sum_over_const(cls, ops, kwargs):
     r'''Execute an indexed sum over a term that does not depend on the
     summation indices
@@ -6,11 +6,12 @@ For more details see :ref:`circuit_algebra`.
 import os
 import re
 from abc import ABCMeta, abstractmethod
+from bisect import bisect_right
 from collections import OrderedDict
 from functools import reduce
+from itertools import accumulate, chain
 
 import numpy as np
-import sympy
 from sympy import I
 from sympy import Matrix as SympyMatrix
 from sympy import symbols, sympify
@@ -36,6 +37,8 @@ from .operator_algebra import (
 from ...utils.permutations import (
     BadPermutationError, block_perm_and_perms_within_blocks, check_permutation,
     full_block_perm, invert_permutation, permutation_to_block_permutations, )
+from ...utils.simplify_cache import get_simplify_cache
+from ...utils.simplify_profiles import get_simplify_func
 from ...utils.singleton import Singleton, singleton_object
 
 __all__ = [
@@ -45,6 +48,7 @@ __all__ = [
     'extract_signal', 'extract_signal_circuit', 'getABCD',
     'get_common_block_structure', 'map_signals', 'map_signals_circuit',
     'move_drive_to_H', 'pad_with_identity', 'prepare_adiabatic_limit',
+    'suggest_fock_truncation', 'truncate_fock_spaces',
     'try_adiabatic_elimination', 'CIdentity', 'CircuitZero', 'Component', ]
 
 __private__ = []  # anything not in __all__ must be in __private__
@@ -58,6 +62,8 @@ __private__ = []  # anything not in __all__ must be in __private__
 class Circuit(metaclass=ABCMeta):
     """Abstract base class for the circuit algebra elements."""
 
+    _block_structure_cache = None
+
     @property
     @abstractmethod
     def cdim(self) -> int:
@@ -90,7 +96,9 @@ class Circuit(metaclass=ABCMeta):
             (3,)
 
         """
-        return self._block_structure
+        if self._block_structure_cache is None:
+            self._block_structure_cache = self._block_structure
+        return self._block_structure_cache
 
     @property
     def _block_structure(self) -> tuple:
@@ -115,11 +123,12 @@ class Circuit(metaclass=ABCMeta):
 
         if len(struct) == 1:
             return channel_index, 0
-        i = 1
-        while sum(struct[:i]) <= channel_index and i < self.cdim:
-            i += 1
-        block_index = i - 1
-        index_in_block = channel_index - sum(struct[:block_index])
+        block_ends = list(accumulate(struct))
+        block_index = bisect_right(block_ends, channel_index)
+        if block_index == 0:
+            index_in_block = channel_index
+        else:
+            index_in_block = channel_index - block_ends[block_index - 1]
 
         return index_in_block, block_index
 
@@ -425,18 +434,29 @@ class SLH(Circuit, Expression):
     def _toSLH(self):
         return self
 
-    def expand(self):
+    def expand(self, workers=None):
         """Expand out all operator expressions within S, L and H and return a
         new SLH object with these expanded expressions.
+
+        If `workers` is given, the elements of S and L are expanded in a pool
+        of `workers` processes, see :meth:`.Matrix.expand`.
         """
-        return SLH(self.S.expand(), self.L.expand(), self.H.expand())
+        return SLH(
+            self.S.expand(workers=workers), self.L.expand(workers=workers),
+            self.H.expand())
 
-    def simplify_scalar(self, func=sympy.simplify):
+    def simplify_scalar(self, func=None, workers=None):
         """Simplify all scalar expressions within S, L and H and return a new
         SLH object with the simplified expressions.
 
+        If `workers` is given, the distinct coefficients in S, L, and H are
+        simplified together in a pool of `workers` processes.
+
         See also: :meth:`.QuantumExpression.simplify_scalar`
         """
+        func = get_simplify_func(func)
+        if workers is not None:
+            get_simplify_cache().populate(func, self, workers=workers)
         return SLH(
             self.S.simplify_scalar(func=func),
             self.L.simplify_scalar(func=func),
@@ -1176,7 +1196,8 @@ class Concatenation(Circuit, Operation):
 
     def _get_blocks(self, block_structure):
         blocks = []
-        block_iter = iter(sum((op.get_blocks() for op in self.operands), ()))
+        block_iter = chain.from_iterable(
+            op.get_blocks() for op in self.operands)
         cbo = []
         current_length = 0
         for bl in block_structure:
@@ -1470,22 +1491,11 @@ def get_common_block_structure(lhs_bs, rhs_bs):
         raise AlgebraError('Blockstructures have different total '
                            'channel numbers.')
 
-    if len(lhs_bs) == len(rhs_bs) == 0:
-        return ()
-
-    i = j = 1
-    lsum = 0
-    while True:
-        lsum = sum(lhs_bs[:i])
-        rsum = sum(rhs_bs[:j])
-        if lsum < rsum:
-            i += 1
-        elif rsum < lsum:
-            j += 1
-        else:
-            break
-
-    return (lsum, ) + get_common_block_structure(lhs_bs[i:], rhs_bs[j:])
+    # the common blocks end where blocks end in both structures
+    block_ends = sorted(
+        set(accumulate(lhs_bs)).intersection(accumulate(rhs_bs)))
+    return tuple(
+        end - start for (start, end) in zip([0] + block_ends, block_ends))
 
 
 def extract_signal(k, n):
@@ -1696,8 +1706,9 @@ def getABCD(slh, a0=None, doubled_up=True):
         # conjugate() method doesn't work
         Dc = np.array([[D[ii, jj].conjugate() for jj in range(cdim)]
                        for ii in range(cdim)])
-        D = np.vstack((np.hstack((D, np.zeros((cdim, cdim)))),
-                       np.hstack((np.zeros((cdim, cdim)), Dc))))
+        D = np.vstack((
+            np.hstack((D, np.zeros((cdim, cdim), dtype=object))),
+            np.hstack((np.zeros((cdim, cdim), dtype=object), Dc))))
 
     # create substitutions to displace the model
     mode_substitutions = {aj: aj + aj_0 * IdentityOperator
@@ -1759,6 +1770,173 @@ def getABCD(slh, a0=None, doubled_up=True):
     return map(SympyMatrix, (A, B, C, D, a, c))
 
 
+def suggest_fock_truncation(
+        slh, params=None, tail=1e-6, a0=None, min_dimension=2, max_iter=50,
+        tol=1e-10):
+    r"""Estimate the dimension of the truncated Fock space that is required
+    for each mode of `slh`
+
+    The estimate is based on a linearization of the model about its
+    mean-field steady state:
+
+    1. The mean-field amplitudes $\alpha_j = \langle \Op{a}_j \rangle$ are
+       found by a Newton iteration, using the linearization returned by
+       :func:`getABCD` as the Jacobian.
+    2. The steady-state fluctuations $\delta\Op{a}_j = \Op{a}_j -
+       \alpha_j$ follow from the Lyapunov equation for the linearized model
+       (assuming vacuum inputs). The fluctuations are approximated by a
+       thermal state with mean photon number $\bar{n}_j = \langle
+       \delta\Op{a}_j^\dagger \delta\Op{a}_j\rangle + \Abs{\langle
+       \delta\Op{a}_j \delta\Op{a}_j\rangle}$, where the second term
+       accounts for squeezing.
+    3. The photon numbers $N_{\text{coh}}$ and $N_{\text{th}}$ above which
+       the tail probability of the Poisson distribution with mean
+       $\Abs{\alpha_j}^2$ and of the thermal distribution with mean
+       $\bar{n}_j$ is less than ``tail/2`` are combined as amplitudes,
+       $N = (\sqrt{N_{\text{coh}}} + \sqrt{N_{\text{th}}})^2$, and the
+       dimension is $N+1$.
+
+    This is a heuristic: it does not account for non-Gaussian features of
+    the state (e.g. due to a strong Kerr nonlinearity), and should be
+    checked by a convergence test of the simulation.
+
+    Args:
+        slh (SLH): The model. All of its degrees of freedom must be harmonic
+            modes.
+        params (dict or None): Mapping of the symbols in `slh` to numeric
+            values. After the substitution, `slh` must not contain any free
+            symbols.
+        tail (float): The target probability for finding a photon number
+            outside of the truncated space, for each mode
+        a0 (dict or None): Initial guess for the mean-field amplitudes, as a
+            mapping of annihilation operators to complex numbers (cf.
+            :func:`getABCD`). For models with more than one steady state,
+            this selects the steady state.
+        min_dimension (int): The minimum dimension to suggest for any mode
+        max_iter (int): The maximum number of Newton iterations
+        tol (float): Relative tolerance for the convergence of the mean-field
+            amplitudes
+
+    Returns:
+        OrderedDict: Mapping of the (sorted) local factors of ``slh.space``
+        to the suggested dimension. This can be passed to
+        :func:`truncate_fock_spaces`.
+
+    Raises:
+        ValueError: If `slh` has non-numeric coefficients or is not a model of
+            harmonic modes, if the Newton iteration does not converge, or if
+            the linearized model is not stable.
+
+    Example:
+
+        >>> a = Destroy(hs='c')
+        >>> slh = SLH(identity_matrix(1), [a], 0).coherent_input(2)
+        >>> dims = suggest_fock_truncation(slh)
+        >>> dims[LocalSpace('c')]
+        40
+        >>> truncate_fock_spaces(slh, dims).space.dimension
+        40
+    """
+    from scipy.linalg import solve_continuous_lyapunov
+    from scipy.stats import poisson
+    if params is not None:
+        slh = slh.substitute(params)
+    slh = slh.toSLH()
+    modes = sorted(slh.space.local_factors)
+    for ls in modes:
+        if ls.has_basis and not all(
+                label.isdigit() for label in ls.basis_labels):
+            raise ValueError(
+                "%r is not the Hilbert space of a harmonic mode" % ls)
+    n = len(modes)
+    cdim = slh.cdim
+    ops = [Destroy(hs=ls) for ls in modes]
+    if a0 is None:
+        a0 = {}
+    alpha = np.array([complex(a0.get(op, 0)) for op in ops])
+
+    def _numeric(matrix):
+        try:
+            return np.array(matrix.evalf(), dtype=complex)
+        except TypeError:
+            raise ValueError(
+                "Cannot evaluate %s numerically: substitute values for all "
+                "symbols through `params`" % matrix)
+
+    for _ in range(max_iter):
+        A, B, C, D, a, c = getABCD(
+            slh, a0=dict(zip(ops, alpha)), doubled_up=True)
+        A, a = _numeric(A), _numeric(a).ravel()
+        try:
+            step = np.linalg.solve(A, -a)[:n]
+        except np.linalg.LinAlgError:
+            raise ValueError(
+                "The linearized model is singular at the mean-field "
+                "amplitudes %s" % alpha)
+        alpha = alpha + step
+        if np.all(np.abs(step) <= tol * np.maximum(1, np.abs(alpha))):
+            break
+    else:
+        raise ValueError(
+            "The mean-field amplitudes did not converge in %d iterations"
+            % max_iter)
+
+    A, B, C, D, a, c = getABCD(slh, a0=dict(zip(ops, alpha)), doubled_up=True)
+    A, B = _numeric(A), _numeric(B)
+    if np.any(np.linalg.eigvals(A).real >= 0):
+        raise ValueError(
+            "The model linearized around the mean-field amplitudes %s is not "
+            "stable" % alpha)
+    # covariance <X X^+> for the fluctuations X = (a_1, ..., a_n, a_1^+, ...,
+    # a_n^+), from A Cov + Cov A^+ + B N B^+ = 0, where N = <dA dA^+>/dt for
+    # vacuum inputs dA = (dA_1, ..., dA_c, dA_1^+, ..., dA_c^+)
+    noise = np.diag(np.r_[np.ones(cdim), np.zeros(cdim)])
+    cov = solve_continuous_lyapunov(A, -B @ noise @ B.conj().T)
+
+    dimensions = OrderedDict()
+    for (j, ls) in enumerate(modes):
+        n_th = max(cov[n+j, n+j].real, 0) + abs(cov[j, n+j])
+        n_coh = poisson.isf(tail / 2, abs(alpha[j])**2)
+        if n_th > tol:
+            # P(n > N) = q^(N+1) for a thermal state, with q = n_th/(1+n_th)
+            q = n_th / (1 + n_th)
+            n_fluct = max(np.ceil(np.log(tail / 2) / np.log(q)) - 1, 0)
+        else:
+            n_fluct = 0
+        n_max = int(np.ceil((np.sqrt(n_coh) + np.sqrt(n_fluct))**2))
+        dimensions[ls] = max(n_max + 1, min_dimension)
+    return dimensions
+
+
+def truncate_fock_spaces(expr, dimensions):
+    """Replace the Hilbert spaces in `expr` by truncated Fock spaces
+
+    Args:
+        expr (Expression): The expression (e.g. an :class:`SLH` model) in
+            which to replace the Hilbert spaces
+        dimensions (dict): Mapping of a :class:`.LocalSpace` (or its label)
+            to the dimension of the truncated space, e.g. as returned by
+            :func:`suggest_fock_truncation`
+
+    Returns:
+        Expression: `expr` with every :class:`.LocalSpace` in `dimensions`
+        replaced by a space with the same label, ``order_index`` and
+        ``local_identifiers``, and the given ``dimension``. Any basis
+        defined for the original spaces is discarded.
+    """
+    labels = {
+        getattr(ls, 'label', ls): dimension
+        for (ls, dimension) in dimensions.items()}
+    hs_mapping = {}
+    for ls in expr.space.local_factors:
+        if ls.label in labels:
+            kwargs = OrderedDict(ls.minimal_kwargs)
+            kwargs.pop('basis', None)
+            kwargs['dimension'] = labels[ls.label]
+            hs_mapping[ls] = ls.__class__(ls.label, **kwargs)
+    return expr.substitute(hs_mapping)
+
+
 def move_drive_to_H(slh, which=None):
     r'''For the given `slh` model, move inhomogeneities in the Lindblad
     operators (resulting from the presence of a coherent drive, see
@@ -0,0 +1,219 @@
+r"""
+Sparse polynomial representation of symbolic scalar coefficients.
+
+Most symbolic coefficients in circuit models are polynomials or rational
+functions in a handful of parameters, e.g. ``kappa``, ``Delta``, ``alpha``,
+``conjugate(alpha)``, ``sqrt(kappa)``. A :class:`CoefficientField` represents
+such coefficients as elements of a sparse multivariate rational function field
+(SymPy's :func:`sympy.polys.fields.field`). In this representation, sums and
+products are always in canonical form, so that e.g. terms cancel without any
+call to :func:`sympy.simplify`.
+
+The representation is used by :class:`.ScalarValue` (and thus for the
+coefficients of :class:`.ScalarTimesOperator` etc.) only inside the
+:func:`.polynomial_coefficients` context manager. Coefficients that contain
+non-polynomial functions, or floating point numbers, remain general SymPy
+expressions.
+
+The generators of the field are the symbols that appear in the
+coefficients, their complex conjugates, their square roots, and the
+imaginary unit. After every operation, the relations ``sqrt(x)**2 == x`` and
+``I**2 == -1`` are applied.
+"""
+import sympy
+from sympy.polys.fields import FracElement, field as sympy_field
+
+__all__ = ['CoefficientField']
+
+__private__ = []
+
+
+class CoefficientField():
+    """Rational function field for symbolic scalar coefficients
+
+    Args:
+        domain: The SymPy ground domain for the coefficients of the
+            polynomials (:obj:`sympy.QQ` by default)
+
+    The field grows as new generators appear in the expressions that are
+    converted with :meth:`from_expr`.
+
+    Example:
+
+        >>> from operator import add, mul
+        >>> kappa, Delta = sympy.symbols('kappa Delta', positive=True)
+        >>> F = CoefficientField()
+        >>> p = F.from_expr(sympy.sqrt(kappa))
+        >>> q = F.from_expr((kappa - Delta) / sympy.sqrt(kappa))
+        >>> F.binary_op(add, F.binary_op(mul, p, q), Delta)
+        kappa
+        >>> F.from_expr(sympy.exp(kappa)) is None
+        True
+    """
+
+    def __init__(self, domain=sympy.QQ):
+        self._domain = domain
+        self._gens = []
+        self._field = sympy_field([], domain)[0]
+        self._relations = []
+        self._i_index = None
+
+    @property
+    def gens(self):
+        """Tuple of the SymPy expressions that are the generators of the
+        field"""
+        return tuple(self._gens)
+
+    @property
+    def field(self):
+        """The current SymPy rational function field"""
+        return self._field
+
+    def from_expr(self, expr):
+        """Convert the SymPy `expr` to an element of the field
+
+        Returns None if `expr` is not a rational function of allowed
+        generators, or if it contains floating point numbers.
+        """
+        gens = set()
+        if not self._collect_gens(expr, gens):
+            return None
+        self._extend(gens)
+        try:
+            return self.reduce(self._field.from_expr(expr))
+        except (ValueError, sympy.polys.polyerrors.CoercionFailed,
+                sympy.polys.polyerrors.GeneratorsError):
+            return None
+
+    def convert(self, val):
+        """Convert `val` (an element of this or an earlier version of the
+        field, a rational number, or a SymPy expression) to an element of
+        the current field, or return None if this is not possible"""
+        if isinstance(val, FracElement):
+            if val.field is self._field:
+                return val
+            try:
+                return val.set_field(self._field)
+            except (ValueError, sympy.polys.polyerrors.CoercionFailed):
+                return self.from_expr(val.as_expr())
+        elif isinstance(val, int) and not isinstance(val, bool):
+            return self._field(val)
+        elif isinstance(val, sympy.Basic):
+            if val.is_Rational:
+                return self._field(val)
+            return self.from_expr(val)
+        return None
+
+    def binary_op(self, op, a, b):
+        """Apply the binary operator `op` to `a` and `b` in the field
+
+        Both `a` and `b` are converted with :meth:`convert` first. Returns
+        None if this is not possible for either of them. The result is
+        reduced with :meth:`reduce`, unless `op` is a comparison.
+        """
+        a = self.convert(a)
+        if a is None:
+            return None
+        b = self.convert(b)
+        if b is None:
+            return None
+        res = op(a, b)
+        if isinstance(res, FracElement):
+            return self.reduce(res)
+        return res
+
+    @staticmethod
+    def to_expr(val):
+        """Convert a field element to a SymPy expression (other values are
+        returned unchanged)"""
+        if isinstance(val, FracElement):
+            return val.as_expr()
+        return val
+
+    def reduce(self, val):
+        """Apply the relations between the generators to the field element
+        `val`. A constant result is returned as a SymPy number."""
+        if self._relations:
+            numer = self._reduce_poly(val.numer)
+            denom = self._reduce_poly(val.denom)
+            if self._i_index is not None:
+                # make the denominator real (free of I), as (a + I b)^{-1} =
+                # (a - I b) / (a^2 + b^2)
+                denom_conj = self._conjugate_i(denom)
+                if denom_conj != denom:
+                    numer = self._reduce_poly(numer * denom_conj)
+                    denom = self._reduce_poly(denom * denom_conj)
+            if numer is not val.numer or denom is not val.denom:
+                val = val.field.new(numer, denom)
+        if val.numer.is_ground and val.denom.is_ground:
+            return val.as_expr()
+        return val
+
+    def _reduce_poly(self, poly):
+        changed = False
+        terms = {}
+        for (monom, coeff) in poly.terms():
+            monom = list(monom)
+            for (i_gen, i_square, sign) in self._relations:
+                if monom[i_gen] >= 2:
+                    changed = True
+                    n, monom[i_gen] = divmod(monom[i_gen], 2)
+                    if i_square is not None:
+                        monom[i_square] += n
+                    coeff = coeff * sign**n
+            monom = tuple(monom)
+            terms[monom] = terms.get(monom, 0) + coeff
+        if not changed:
+            return poly
+        return poly.ring.from_dict(
+            {monom: coeff for (monom, coeff) in terms.items() if coeff != 0})
+
+    def _conjugate_i(self, poly):
+        """Replace I by -I in `poly`"""
+        i = self._i_index
+        return poly.ring.from_dict({
+            monom: (-coeff if monom[i] % 2 else coeff)
+            for (monom, coeff) in poly.terms()})
+
+    def _collect_gens(self, expr, gens):
+        """Collect the generators for `expr` into `gens`. Return False if
+        `expr` is not a rational function of allowed generators"""
+        if expr.is_Symbol or expr is sympy.I:
+            gens.add(expr)
+            return True
+        elif expr.is_Rational:
+            return True
+        elif expr.is_Add or expr.is_Mul:
+            return all(self._collect_gens(arg, gens) for arg in expr.args)
+        elif expr.is_Pow:
+            base, exp = expr.args
+            if exp.is_Integer:
+                return self._collect_gens(base, gens)
+            elif exp.is_Rational and exp.q == 2 and base.is_Symbol:
+                gens.add(sympy.sqrt(base))
+                gens.add(base)
+                return True
+            return False
+        elif isinstance(expr, sympy.conjugate):
+            if expr.args[0].is_Symbol:
+                gens.add(expr)
+                return True
+            return False
+        return False
+
+    def _extend(self, gens):
+        """Extend the field with the given generators, if necessary"""
+        new_gens = [gen for gen in gens if gen not in self._gens]
+        if len(new_gens) == 0:
+            return
+        self._gens.extend(sorted(new_gens, key=sympy.default_sort_key))
+        self._field = sympy_field(self._gens, self._domain)[0]
+        relations = []
+        self._i_index = None
+        for (i, gen) in enumerate(self._gens):
+            if gen is sympy.I:
+                self._i_index = i
+                relations.append((i, None, -1))
+            elif gen.is_Pow:
+                relations.append((i, self._gens.index(gen.args[0]), 1))
+        self._relations = relations
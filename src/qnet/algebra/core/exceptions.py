@@ -2,7 +2,8 @@
 
 
 __all__ = [
-    'AlgebraException', 'AlgebraError', 'InfiniteSumError', 'CannotSimplify',
+    'AlgebraException', 'AlgebraError', 'InfiniteSumError',
+    'ExpansionBudgetError', 'CannotSimplify',
     'WrongSignatureError', 'CannotConvertToSLH', 'CannotConvertToABCD',
     'CannotVisualize', 'WrongCDimError', 'IncompatibleBlockStructures',
     'CannotEliminateAutomatically', 'BasisNotSetError', 'UnequalSpaces',
@@ -27,6 +28,12 @@ class InfiniteSumError(AlgebraError):
     pass
 
 
+class ExpansionBudgetError(AlgebraError):
+    """Raised when the estimated number of terms of an expansion exceeds a
+    given budget"""
+    pass
+
+
 class CannotSimplify(AlgebraException):
     """Raised when an expression cannot be further simplified"""
     pass
@@ -7,12 +7,16 @@ Hilbert spaces of quantum systems.
 For more details see :ref:`hilbert_space_algebra`.
 """
 import functools
+import heapq
 import operator
 import re
+import weakref
 from abc import ABCMeta, abstractmethod
 from collections import OrderedDict
 from itertools import product as cartesian_product
 
+import numpy
+
 from .abstract_algebra import (
     Expression, Operation, )
 from .algebraic_properties import (
@@ -70,10 +74,10 @@ class HilbertSpace(metaclass=ABCMeta):
         other Hilbert space, while `TrivialSpace` *is* disjoint with any other
         HilbertSpace (even itself)
         """
-        if other == FullSpace:
+        try:
+            return not (self._mask & other._mask)
+        except AttributeError:  # FullSpace has no mask
             return False
-        else:
-            return set(self.local_factors).isdisjoint(set(other.local_factors))
 
     def is_tensor_factor_of(self, other):
         """Test if a space is included within a larger tensor product space.
@@ -83,7 +87,10 @@ class HilbertSpace(metaclass=ABCMeta):
         :type other: HilbertSpace
         :rtype: bool
         """
-        return self <= other
+        try:
+            return not (self._mask & ~other._mask)
+        except AttributeError:  # FullSpace has no mask
+            return self <= other
 
     def is_strict_tensor_factor_of(self, other):
         """Test if a space is included within a larger tensor product space.
@@ -137,6 +144,60 @@ class HilbertSpace(metaclass=ABCMeta):
         raise BasisNotSetError(
             "Hilbert space %s has no defined basis" % str(self))
 
+    def basis_index(self, label):
+        """Return the index of the basis state with the given `label`
+
+        Raises:
+            .BasisNotSetError: if the Hilbert space has no defined basis
+            ValueError: if there is no basis state with the given label
+        """
+        return self.basis_labels.index(label)
+
+    def local_indices(self, index):
+        """Convert the `index` of a basis state into the tuple of indices of
+        the basis states in the :attr:`local_factors` that make up the basis
+        state. `index` may also be an array of indices, resulting in a tuple
+        of arrays.
+
+        The index of a basis state in a product space is "mixed-radix", with
+        the index in the last local factor varying fastest. This is the
+        inverse of :meth:`flat_index`:
+
+            >>> hs1 = LocalSpace('q1', dimension=2)
+            >>> hs = hs1 * LocalSpace('q2', dimension=3)
+            >>> hs.local_indices(4)
+            (1, 1)
+            >>> hs.flat_index((1, 1))
+            4
+            >>> hs.local_indices(numpy.array([0, 4, 5]))
+            (array([0, 1, 1]), array([0, 1, 2]))
+
+        Raises:
+            .BasisNotSetError: if the Hilbert space has no defined basis
+            ValueError: if `index` is out of range
+        """
+        dims = [ls.dimension for ls in self.local_factors]
+        local_indices = numpy.unravel_index(index, dims)
+        if numpy.ndim(index) == 0:
+            return tuple(int(ind) for ind in local_indices)
+        return local_indices
+
+    def flat_index(self, local_indices):
+        """Convert a tuple of indices of basis states in the
+        :attr:`local_factors` into the index of the basis state in the full
+        Hilbert space. The `local_indices` may also be arrays, resulting in
+        an array of indices. This is the inverse of :meth:`local_indices`.
+
+        Raises:
+            .BasisNotSetError: if the Hilbert space has no defined basis
+            ValueError: if any of the `local_indices` is out of range
+        """
+        dims = [ls.dimension for ls in self.local_factors]
+        index = numpy.ravel_multi_index(tuple(local_indices), dims)
+        if numpy.ndim(index) == 0:
+            return int(index)
+        return index
+
     @abstractmethod
     def is_strict_subfactor_of(self, other):
         """Test whether a Hilbert space occures as a strict sub-factor in
@@ -174,6 +235,57 @@ class HilbertSpace(metaclass=ABCMeta):
 ###############################################################################
 
 
+def _local_space_mask(local_space):
+    """Return the bitmask ``1 << id`` for the given `local_space`, where `id`
+    is a small integer that is unique to all :class:`LocalSpace` instances
+    that compare as equal to `local_space`.
+
+    The bitmask of a :class:`ProductSpace` is the bitwise OR of the bitmasks
+    of its factors. This allows to implement the set operations on Hilbert
+    spaces (:meth:`~HilbertSpace.isdisjoint`, :meth:`~HilbertSpace.intersect`,
+    etc.) as operations on integers.
+
+    Every call registers `local_space` as a user of the bitmask. Once all
+    users have been garbage-collected, the `id` is recycled for new local
+    spaces. A :class:`ProductSpace` holds references to its factors, so that
+    its bitmask cannot alias the bitmask of a new local space.
+    """
+    key = local_space._instance_key
+    try:
+        entry = _LOCAL_SPACE_MASKS[key]
+    except KeyError:
+        if len(_FREE_LOCAL_SPACE_IDS) > 0:
+            i = heapq.heappop(_FREE_LOCAL_SPACE_IDS)
+        else:
+            i = len(_LOCAL_SPACE_MASKS)
+        entry = [1 << i, 0]  # bitmask, number of users
+        _LOCAL_SPACE_MASKS[key] = entry
+    entry[1] += 1
+    finalizer = weakref.finalize(local_space, _release_local_space_mask, key)
+    finalizer.atexit = False
+    return entry[0]
+
+
+def _release_local_space_mask(key):
+    """Unregister a user of the bitmask for the local space with the given
+    instance `key`, cf. :func:`_local_space_mask`"""
+    entry = _LOCAL_SPACE_MASKS[key]
+    entry[1] -= 1
+    if entry[1] == 0:
+        del _LOCAL_SPACE_MASKS[key]
+        heapq.heappush(_FREE_LOCAL_SPACE_IDS, entry[0].bit_length() - 1)
+
+
+#: The bitmasks of all live :class:`LocalSpace` instances, cf.
+#: :func:`_local_space_mask`, as a map of the instance key to a list
+#: ``[bitmask, number of users]``. The keys do not reference the instances.
+_LOCAL_SPACE_MASKS = {}
+
+#: Heap of the bit positions that were released by
+#: :func:`_release_local_space_mask`, for re-use in new bitmasks
+_FREE_LOCAL_SPACE_IDS = []
+
+
 class LocalSpace(HilbertSpace, Expression):
     """A local Hilbert space, i.e., for a single degree of freedom.
 
@@ -251,6 +363,11 @@ class LocalSpace(HilbertSpace, Expression):
             order_index, label, str(dimension), basis,
             sorted_local_identifiers))
         self._basis = basis
+        if basis is None:
+            self._basis_index = None
+        else:
+            self._basis_index = {
+                label: index for (index, label) in enumerate(basis)}
         self._dimension = dimension
         self._local_identifiers = local_identifiers
         self._order_index = order_index
@@ -266,6 +383,13 @@ class LocalSpace(HilbertSpace, Expression):
             label, basis=basis, dimension=dimension,
             local_identifiers=sorted_local_identifiers,
             order_index=order_index)
+        self._mask = _local_space_mask(self)
+
+    def __setstate__(self, state):
+        # bitmasks are specific to a process and must be re-assigned after
+        # unpickling
+        self.__dict__.update(state)
+        self._mask = _local_space_mask(self)
 
     @classmethod
     def _check_basis_label_type(cls, label_or_index):
@@ -334,6 +458,25 @@ class LocalSpace(HilbertSpace, Expression):
                 "Hilbert space %s has no defined basis" % str(self))
         return self._basis
 
+    def basis_index(self, label):
+        """Return the index of the basis state with the given `label`
+
+        This is equivalent to ``basis_labels.index(label)``, but uses a
+        dictionary lookup instead of a linear search.
+
+        Raises:
+            .BasisNotSetError: if the Hilbert space has no defined basis
+            ValueError: if there is no basis state with the given label
+        """
+        if self._basis_index is None:
+            raise BasisNotSetError(
+                "Hilbert space %s has no defined basis" % str(self))
+        try:
+            return self._basis_index[label]
+        except (KeyError, TypeError):
+            raise ValueError(
+                "%r is not a basis label of %s" % (label, self))
+
     @property
     def dimension(self):
         """Dimension of the Hilbert space.
@@ -356,12 +499,12 @@ class LocalSpace(HilbertSpace, Expression):
         return self._minimal_kwargs
 
     def remove(self, other):
-        if other == self:
+        if other is FullSpace or self._mask & other._mask:
             return TrivialSpace
         return self
 
     def intersect(self, other):
-        if self in other.local_factors:
+        if other is FullSpace or self._mask & other._mask:
             return self
         return TrivialSpace
 
@@ -370,7 +513,7 @@ class LocalSpace(HilbertSpace, Expression):
         return (self, )
 
     def is_strict_subfactor_of(self, other):
-        if isinstance(other, ProductSpace) and self in other.operands:
+        if isinstance(other, ProductSpace) and self._mask & other._mask:
             assert len(other.operands) > 1
             return True
         if other is FullSpace:
@@ -409,7 +552,7 @@ class LocalSpace(HilbertSpace, Expression):
                                      % (new_index, self._basis))
             return new_index
         elif isinstance(label_or_index, str):
-            label_index = self.basis_labels.index(label_or_index)
+            label_index = self.basis_index(label_or_index)
             new_index = label_index + n
             if (new_index < 0) or (new_index >= len(self._basis)):
                 raise IndexError("index %d out of range for basis %s"
@@ -427,6 +570,8 @@ class TrivialSpace(HilbertSpace, Expression, metaclass=Singleton):
     This is the Hilbert space of scalars.
     """
 
+    _mask = 0  # bitmask of local factors, cf. _local_space_mask
+
     def __hash__(self):
         return hash(self.__class__)
 
@@ -581,30 +726,45 @@ class ProductSpace(HilbertSpace, Operation):
                     [ls.dimension for ls in local_spaces], 1)
         except BasisNotSetError:
             self._dimension = None
-        # determine the basis labels automatically
-        try:
-            ls_bases = [ls.basis_labels for ls in local_spaces]
-            basis = []
-            for label_tuple in cartesian_product(*ls_bases):
-                basis.append(",".join([str(l) for l in label_tuple]))
-            self._basis = tuple(basis)
-        except BasisNotSetError:
-            self._basis = None
+        # the basis labels are determined automatically, but only when they
+        # are first needed, as there are as many labels as the dimension
+        self._has_basis = all(ls.has_basis for ls in local_spaces)
+        self._basis = None
         op_keys = [space._order_key for space in local_spaces]
         self._order_key = KeyTuple([v for op_key in op_keys for v in op_key])
+        self._mask = functools.reduce(
+            operator.or_, [ls._mask for ls in local_spaces], 0)
         super().__init__(*local_spaces)  # Operation __init__
 
+    def __setstate__(self, state):
+        # the operands have new bitmasks after unpickling
+        self.__dict__.update(state)
+        self._mask = functools.reduce(
+            operator.or_, [ls._mask for ls in self.operands], 0)
+
     @classmethod
     def create(cls, *local_spaces):
         if any(local_space is FullSpace for local_space in local_spaces):
             return FullSpace
+        try:
+            masks = [local_space._mask for local_space in local_spaces]
+        except AttributeError:  # labels instead of LocalSpace instances
+            pass
+        else:
+            # if one of the spaces contains all of the others, it is the
+            # result (e.g. for the product of the spaces of two operators
+            # acting on the same degrees of freedom)
+            mask = functools.reduce(operator.or_, masks, 0)
+            for (local_space, local_mask) in zip(local_spaces, masks):
+                if local_mask == mask:
+                    return local_space
         return super().create(*local_spaces)
 
     @property
     def has_basis(self):
         """True if the all the local factors of the `ProductSpace` have a
         defined basis"""
-        return self._basis is not None
+        return self._has_basis
 
     @property
     def basis_states(self):
@@ -631,11 +791,40 @@ class ProductSpace(HilbertSpace, Operation):
         Raises:
             .BasisNotSetError: if the Hilbert space has no defined basis
         """
-        if self._basis is None:
+        if not self._has_basis:
             raise BasisNotSetError(
                 "Hilbert space %s has no defined basis" % str(self))
+        if self._basis is None:
+            ls_bases = [ls.basis_labels for ls in self.local_factors]
+            self._basis = tuple([
+                ",".join([str(l) for l in label_tuple])
+                for label_tuple in cartesian_product(*ls_bases)])
         return self._basis
 
+    def basis_index(self, label):
+        """Return the index of the basis state with the given `label`, from
+        the indices of the local labels in the :attr:`local_factors`
+
+        Raises:
+            .BasisNotSetError: if the Hilbert space has no defined basis
+            ValueError: if there is no basis state with the given label
+        """
+        if not self._has_basis:
+            raise BasisNotSetError(
+                "Hilbert space %s has no defined basis" % str(self))
+        try:
+            local_labels = label.split(",")
+        except AttributeError:
+            raise ValueError(
+                "%r is not a basis label of %s" % (label, self))
+        if len(local_labels) != len(self.local_factors):
+            raise ValueError(
+                "label %s for Hilbert space %s must be comma-separated "
+                "concatenation of local labels" % (label, self))
+        return self.flat_index([
+            ls.basis_index(local_label) for (ls, local_label)
+            in zip(self.local_factors, local_labels)])
+
     def basis_state(self, index_or_label):
         """Return the basis state with the given index or label.
 
@@ -646,14 +835,16 @@ class ProductSpace(HilbertSpace, Operation):
         """
         from qnet.algebra.core.state_algebra import BasisKet, TensorKet
         if isinstance(index_or_label, int):  # index
-            ls_bases = [ls.basis_labels for ls in self.local_factors]
-            label_tuple = list(cartesian_product(*ls_bases))[index_or_label]
+            index = index_or_label
+            if index < 0:  # count from the end, as for a list of labels
+                index += self.dimension
             try:
-                return TensorKet(
-                    *[BasisKet(label, hs=ls) for (ls, label)
-                        in zip(self.local_factors, label_tuple)])
+                local_indices = self.local_indices(index)
             except ValueError as exc_info:
                 raise IndexError(str(exc_info))
+            return TensorKet(
+                *[BasisKet(ind, hs=ls) for (ls, ind)
+                    in zip(self.local_factors, local_indices)])
         else:  # label
             local_labels = index_or_label.split(",")
             if len(local_labels) != len(self.local_factors):
@@ -684,14 +875,7 @@ class ProductSpace(HilbertSpace, Operation):
         """Remove a particular factor from a tensor product space."""
         if other is FullSpace:
             return TrivialSpace
-        if other is TrivialSpace:
-            return self
-        if isinstance(other, ProductSpace):
-            oops = set(other.operands)
-        else:
-            oops = {other}
-        return ProductSpace.create(
-                *sorted(set(self.operands).difference(oops)))
+        return self._select_factors(self._mask & ~other._mask)
 
     @property
     def local_factors(self):
@@ -708,20 +892,22 @@ class ProductSpace(HilbertSpace, Operation):
         """Find the mutual tensor factors of two Hilbert spaces."""
         if other is FullSpace:
             return self
-        if other is TrivialSpace:
-            return TrivialSpace
-        if isinstance(other, ProductSpace):
-            other_ops = set(other.operands)
-        else:
-            other_ops = {other}
+        return self._select_factors(self._mask & other._mask)
+
+    def _select_factors(self, mask):
+        """Return the product of the factors of `self` selected by the bitmask
+        `mask`"""
+        if mask == self._mask:
+            return self
         return ProductSpace.create(
-                *sorted(set(self.operands).intersection(other_ops)))
+            *[ls for ls in self.operands if ls._mask & mask])
 
     def is_strict_subfactor_of(self, other):
         """Test if a space is included within a larger tensor product space.
         Not ``True`` if ``self == other``."""
         if isinstance(other, ProductSpace):
-            return set(self.operands) < set(other.operands)
+            return (
+                not (self._mask & ~other._mask) and self._mask != other._mask)
         if other is FullSpace:
             return True
         return False
@@ -3,12 +3,16 @@
 from abc import ABCMeta
 
 import attr
+import sympy
 
-from .abstract_algebra import Operation
+from .abstract_algebra import (
+    Expression, Operation, ExpansionEstimate, substitute, _free_symbols)
 from .exceptions import InfiniteSumError
 from ..pattern_matching import wc
 from ...utils.indices import (
-    IdxSym, IndexRangeBase, SymbolicLabelBase, yield_from_ranges, )
+    IdxSym, IndexRangeBase, IntIndex, SymbolicLabelBase,
+    yield_index_tuples, )
+from ...utils.singleton import Singleton
 
 __all__ = ["IndexedSum"]
 
@@ -75,17 +79,44 @@ class IndexedSum(Operation, metaclass=ABCMeta):
 
     @property
     def terms(self):
-        for mapping in yield_from_ranges(self.ranges):
-            term = self.term.substitute(mapping)
-            try:
-                term = term.simplify(rules=[(
-                    wc('label', head=SymbolicLabelBase),
-                    lambda label: label.evaluate(mapping))])
-            except AttributeError:
-                # for ScalarIndexedSum, term may be a scalar that doesn't have
-                # a `simplify` method
-                pass
-            yield term
+        term_for_values = self._term_for_values()
+        for values in yield_index_tuples(self.ranges):
+            yield term_for_values(values)
+
+    def substitute_indices(self, block):
+        """Return the list of terms of the sum for a block of index values
+
+        Args:
+            block: sequence of tuples of values for the :attr:`variables`,
+                e.g. as yielded by :func:`.yield_index_blocks`, or a
+                two-dimensional array with one column for each variable
+
+        The expression tree of :attr:`term` is analyzed only once for the
+        entire block.
+
+            >>> i, j = IdxSym('i'), IdxSym('j')
+            >>> hs = LocalSpace(0, dimension=4)
+            >>> op = OperatorIndexedSum(
+            ...     LocalSigma(FockIndex(i), FockIndex(j), hs=hs),
+            ...     IndexOverFockSpace(i, hs), IndexOverFockSpace(j, hs))
+            >>> print(ascii(op.substitute_indices([(0, 1), (2, 3)])))
+            [|0><1|^(0), |2><3|^(0)]
+        """
+        term_for_values = self._term_for_values()
+        return [term_for_values(values) for values in block]
+
+    def _term_for_values(self):
+        """Return a function that maps a tuple of values for the
+        :attr:`variables` to the corresponding term of the sum"""
+        variables = self.variables
+        substitute_indices = _substitution_plan(
+            self.term, set(variables), evaluate_labels=True)
+
+        def term_for_values(values):
+            return substitute_indices(dict(zip(
+                variables, [sympy.sympify(val) for val in values])))
+
+        return term_for_values
 
     def __len__(self):
         length = 1
@@ -97,7 +128,62 @@ class IndexedSum(Operation, metaclass=ABCMeta):
                     "Cannot determine length from non-finite ranges")
         return length
 
-    def doit(self, indices=None, max_terms=None):
+    def estimate_doit(self, indices=None, max_terms=None):
+        """Estimate the size of the result of :meth:`doit` for the given
+        `indices` and `max_terms`, from the length of the index ranges and the
+        number of summands in :attr:`term`, without evaluating the sum.
+
+        Returns:
+            .ExpansionEstimate: the estimated number of terms (``oo`` for an
+            infinite range) and memory
+        """
+        if indices is None:
+            ranges = self.ranges
+        else:
+            index_symbols = set(
+                ind if isinstance(ind, IdxSym) else IdxSym(ind)
+                for ind in indices)
+            ranges = [
+                r for r in self.ranges if r.index_symbol in index_symbols]
+        length = 1
+        for ind_range in ranges:
+            try:
+                length *= len(ind_range)
+            except TypeError:
+                length = sympy.oo
+        if max_terms is not None:
+            length = min(length, max_terms)
+        try:
+            factors = self.term._estimate_expansion().factors
+        except AttributeError:
+            factors = 1
+        plus_cls = getattr(self, '_plus_cls', None)
+        if plus_cls is not None and isinstance(self.term, plus_cls):
+            length *= len(self.term.operands)
+        return ExpansionEstimate(terms=length, factors=factors)
+
+    def doit(self, indices=None, max_terms=None, budget=None):
+        """Write out the indexed sum explicitly.
+
+        Args:
+            indices (list or None): If given, only sum over the given index
+                symbols, otherwise sum over all indices
+            max_terms (int or None): If given, the number of terms after which
+                to truncate the sum (only if `indices` is None)
+            budget (int or None): If given, the maximum number of terms that
+                the result may have, according to :meth:`estimate_doit`. This
+                is checked before evaluating any terms.
+
+        Raises:
+            .InfiniteSumError: if the sum is infinite or exceeds the limit on
+                the number of terms
+            .ExpansionBudgetError: if the result is estimated to exceed
+                `budget`
+        """
+        if budget is not None:
+            self.estimate_doit(
+                indices=indices, max_terms=max_terms).check_budget(
+                    budget, what="Evaluating %s" % self.__class__.__name__)
         if indices is None:
             return self._doit_full(max_terms=max_terms)
         else:
@@ -107,8 +193,47 @@ class IndexedSum(Operation, metaclass=ABCMeta):
                     "indices")
             return self._doit_over_indices(indices)
 
+    def doit_iter(self, chunk_size=1, max_terms=None):
+        """Evaluate the indexed sum lazily, in chunks of `chunk_size` terms.
+
+        Yields:
+            the evaluated terms of the sum (if `chunk_size` is 1), or the
+            partial sums of `chunk_size` consecutive terms (the last partial
+            sum may have fewer terms)
+
+        Only one chunk of terms is held in memory at any time. Unlike for
+        :meth:`doit`, there is no limit on the number of terms, and the sum
+        may be infinite, unless `max_terms` is given. The result of
+        :meth:`doit` is the sum of all the yielded expressions. The partial
+        sums may be passed directly to :func:`.convert_to_qutip` or
+        :func:`.convert_to_sympy_matrix`:
+
+            >>> i = IdxSym('i')
+            >>> hs = LocalSpace(0, dimension=4)
+            >>> psi = KetIndexedSum(
+            ...     BasisKet(FockIndex(i), hs=hs), IndexOverFockSpace(i, hs))
+            >>> for partial_sum in psi.doit_iter(chunk_size=3):
+            ...     print(ascii(partial_sum))
+            |0>^(0) + |1>^(0) + |2>^(0)
+            |3>^(0)
+
+        Raises:
+            ValueError: if `chunk_size` is smaller than 1
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        chunk = []
+        for i, term in enumerate(self.terms):
+            if max_terms is not None and i >= max_terms:
+                break
+            chunk.append(term)
+            if len(chunk) >= chunk_size:
+                yield self._sum_terms(chunk)
+                chunk = []
+        if len(chunk) > 0:
+            yield self._sum_terms(chunk)
+
     def _doit_full(self, max_terms=None):
-        res = None
         if max_terms is None:
             len(self)  # side-effect: raise InfiniteSumError
         else:
@@ -116,19 +241,17 @@ class IndexedSum(Operation, metaclass=ABCMeta):
                 raise ValueError(
                     "max_terms = %s must be smaller than the limit %s"
                     % (max_terms, self._expand_limit))
+        terms = []
         for i, term in enumerate(self.terms):
             if max_terms is not None:
                 if i >= max_terms:
                     break
-            if res is None:
-                res = term
-            else:
-                res += term
+            terms.append(term)
             if i > self._expand_limit:
                 raise InfiniteSumError(
                     "Cannot expand %s: more than %s terms"
                     % (self, self._expand_limit))
-        return res
+        return self._sum_terms(terms)
 
     def _doit_over_indices(self, indices):
         if len(indices) == 0:
@@ -146,17 +269,16 @@ class IndexedSum(Operation, metaclass=ABCMeta):
         if selected_range is None:
             raise ValueError(
                 "Index %s does not appear in %s" % (ind_sym, self))
-        res_term = None
+        substitute_index = _substitution_plan(self.term, {ind_sym})
+        summands = []
         for i, mapping in enumerate(selected_range.iter()):
-            res_summand = self.term.substitute(mapping)
-            if res_term is None:
-                res_term = res_summand
-            else:
-                res_term += res_summand
+            summands.append(substitute_index(
+                {ind_sym: sympy.sympify(mapping[ind_sym])}))
             if i > self._expand_limit:
                 raise InfiniteSumError(
                     "Cannot expand %s: more than %s terms"
                     % (self, self._expand_limit))
+        res_term = self._sum_terms(summands)
         if len(other_ranges) == 0:
             res = res_term.simplify(rules=[(
                 wc('label', head=SymbolicLabelBase),
@@ -166,6 +288,24 @@ class IndexedSum(Operation, metaclass=ABCMeta):
             res = res._doit_over_indices(indices=indices)
         return res
 
+    def _sum_terms(self, terms):
+        """Sum the given `terms` with a single instantiation of the
+        `_plus_cls` of the summation, instead of adding them one by one.
+        Returns None if there are no `terms`."""
+        if len(terms) == 0:
+            return None
+        elif len(terms) == 1:
+            return terms[0]
+        plus_cls = getattr(self, '_plus_cls', None)
+        base_cls = getattr(self, '_base_cls', None)
+        if plus_cls is not None and base_cls is not None:
+            if all(isinstance(term, base_cls) for term in terms):
+                return plus_cls.create(*terms)
+        res = terms[0]
+        for term in terms[1:]:
+            res += term
+        return res
+
     def make_disjunct_indices(self, *others):
         """Return a copy with modified indices to ensure disjunct indices with
         `others`.
@@ -227,3 +367,103 @@ class IndexedSum(Operation, metaclass=ABCMeta):
             return super().__rmul__(other)
         except AttributeError:
             return NotImplemented
+
+
+def _substitution_plan(expr, symbols, evaluate_labels=False):
+    """Return a function that takes a mapping of the given (index) `symbols`
+    to (SymPy) values and returns ``expr.substitute(mapping)``.
+
+    The expression tree of `expr` is analyzed only once. Sub-expressions that
+    do not depend on any of the `symbols` are re-used as-is for every
+    mapping; only the sub-expressions that do are re-instantiated. If
+    `evaluate_labels` is True, every :class:`.SymbolicLabelBase` is replaced
+    by its evaluated value.
+    """
+    plan = _compile_substitution(expr, symbols, evaluate_labels)
+    if plan is None:
+        return lambda mapping: expr
+    return plan
+
+
+def _compile_substitution(expr, symbols, evaluate_labels):
+    """Recursive implementation of :func:`_substitution_plan`. Returns None
+    if `expr` does not depend on any of the `symbols`"""
+    # import here, to avoid circular imports
+    from .abstract_quantum_algebra import ScalarTimesQuantumExpression
+    if isinstance(expr, SymbolicLabelBase):
+        if evaluate_labels:
+            if isinstance(expr, IntIndex) and _xreplace_is_subs(expr.expr):
+                label_expr = expr.expr
+                return lambda mapping: int(label_expr.xreplace(mapping))
+            return expr.evaluate
+        elif not symbols.isdisjoint(expr.free_symbols):
+            return expr.substitute
+        return None
+    elif isinstance(expr, sympy.Basic):
+        if symbols.isdisjoint(expr.free_symbols):
+            return None
+        if _xreplace_is_subs(expr):
+            return expr.xreplace
+        return lambda mapping: substitute(expr, mapping)
+    elif isinstance(expr, ScalarTimesQuantumExpression):
+        coeff, term = expr.coeff, expr.term
+        coeff_plan = _compile_substitution(coeff, symbols, evaluate_labels)
+        term_plan = _compile_substitution(term, symbols, evaluate_labels)
+        if coeff_plan is None and term_plan is None:
+            return None
+
+        def substituted(mapping):
+            new_coeff = coeff if coeff_plan is None else coeff_plan(mapping)
+            new_term = term if term_plan is None else term_plan(mapping)
+            return new_coeff * new_term
+
+        return substituted
+    elif (isinstance(expr, Expression) and
+            type(expr)._substitute is Expression._substitute):
+        if isinstance(expr.__class__, Singleton):
+            return None
+        arg_plans = [
+            _compile_substitution(arg, symbols, evaluate_labels)
+            for arg in expr.args]
+        kwarg_plans = {
+            key: _compile_substitution(val, symbols, evaluate_labels)
+            for (key, val) in expr.kwargs.items()}
+        if (all(plan is None for plan in arg_plans) and
+                all(plan is None for plan in kwarg_plans.values())):
+            return None
+        args = expr.args
+        kwargs = expr.kwargs
+
+        def substituted(mapping):
+            new_args = [
+                arg if plan is None else plan(mapping)
+                for (arg, plan) in zip(args, arg_plans)]
+            new_kwargs = {
+                key: val if kwarg_plans[key] is None
+                else kwarg_plans[key](mapping)
+                for (key, val) in kwargs.items()}
+            return expr.create(*new_args, **new_kwargs)
+
+        return substituted
+    else:
+        dependent = not symbols.isdisjoint(_free_symbols(expr))
+        if isinstance(expr, Expression):
+            dependent = dependent or any(
+                not symbols.isdisjoint(_free_symbols(val))
+                for val in expr.kwargs.values())
+        else:
+            try:
+                dependent = dependent or expr in symbols
+            except TypeError:  # unhashable expr
+                pass
+        if dependent:
+            return lambda mapping: substitute(expr, mapping)
+        return None
+
+
+def _xreplace_is_subs(expr):
+    """Whether replacing symbols in the SymPy `expr` by values with
+    :meth:`~sympy.core.basic.Basic.xreplace` is equivalent to (but much
+    faster than) :meth:`~sympy.core.basic.Basic.subs`, that is, whether
+    `expr` has no bound symbols (e.g. in an Integral)"""
+    return expr.atoms(sympy.Symbol) == expr.free_symbols
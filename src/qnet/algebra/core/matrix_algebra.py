@@ -1,9 +1,10 @@
 """Matrices of Operators"""
+from itertools import accumulate
 
 from numpy import (
     array as np_array, conjugate as np_conjugate, diag as np_diag,
-    hstack as np_hstack, ndarray, ones as np_ones, vstack as np_vstack,
-    zeros as np_zeros, )
+    empty as np_empty, hstack as np_hstack, ndarray, ones as np_ones,
+    vstack as np_vstack, zeros as np_zeros, )
 import sympy
 from sympy import I, sympify, Symbol
 
@@ -11,9 +12,14 @@ from .abstract_algebra import Expression, substitute
 from .abstract_quantum_algebra import QuantumExpression
 from .exceptions import NonSquareMatrix
 from .hilbert_space_algebra import ProductSpace, TrivialSpace
-from .operator_algebra import Operator
+from .operator_algebra import Operator, ZeroOperator
 from .scalar_algebra import is_scalar
-from ...utils.permutations import check_permutation
+from ...utils.interning import intern_sympy
+from ...utils.permutations import (
+    block_structure_from_pairs, check_permutation)
+from ...utils.simplify_cache import (
+    get_simplify_cache, parallel_map, simplify_cached)
+from ...utils.simplify_profiles import get_simplify_func
 
 __all__ = [
     'Matrix', 'block_matrix', 'diagm', 'hstackm',
@@ -27,9 +33,17 @@ sympyOne = sympify(1)
 
 
 class Matrix(Expression):
-    """Matrix with Operator (or scalar-) valued elements."""
+    """Matrix with Operator (or scalar-) valued elements.
+
+    In addition to the dense array of elements (:attr:`matrix`), a matrix
+    keeps a sparse (row-compressed) index of its non-zero elements, which is
+    created on demand. Products of matrices are evaluated on the non-zero
+    elements only.
+    """
     matrix = None
     _hash = None
+    _sparse = None
+    _block_structure = None
 
     def __init__(self, m):
         if isinstance(m, ndarray):
@@ -42,6 +56,8 @@ class Matrix(Expression):
             self.matrix = self.matrix.reshape((self.matrix.shape[0], 1))
         if len(self.matrix.shape) > 2:
             raise ValueError()
+        if self.matrix.dtype == object:
+            self.matrix = _intern_elements(self.matrix)
         super().__init__(self.matrix)
 
     @property
@@ -60,34 +76,30 @@ class Matrix(Expression):
         if n != m:
             raise AttributeError("block_structure only defined for square "
                                  "matrices")
-        for k in range(1, n):
-            if ((self.matrix[:k, k:] == 0).all() and
-                    (self.matrix[k:, :k] == 0).all()):
-                return (k,) + self[k:, k:].block_structure
-        return n,
+        if self._block_structure is None:
+            # the blocks are the connected components of the graph with an
+            # edge (i, j) for every non-zero element
+            rows = self._get_sparse()[0]
+            self._block_structure = block_structure_from_pairs(
+                n, ((i, j) for (i, row) in enumerate(rows) for (j, _) in row))
+        return self._block_structure
 
     def _get_blocks(self, block_structure):
         n, m = self.shape
+        if sum(block_structure) != n:
+            raise ValueError()
+        offsets = [0] + list(accumulate(block_structure))
         if n == m:
-            if not sum(block_structure) == n:
-                raise ValueError()
-            if not len(block_structure):
-                return ()
-            j = block_structure[0]
-
-            if ((self.matrix[:j, j:] == 0).all() and
-                    (self.matrix[j:, :j] == 0).all()):
-                return ((self[:j, :j],) +
-                        self[j:, j:]._get_blocks(block_structure[1:]))
-            else:
+            if not set(offsets[1:]).issubset(
+                    accumulate(self.block_structure)):
                 raise ValueError()
+            return tuple(
+                self[start:end, start:end]
+                for (start, end) in zip(offsets[:-1], offsets[1:]))
         elif m == 1:
-            if not len(block_structure):
-                return ()
-            else:
-                return ((self[:block_structure[0], :],) +
-                        self[:block_structure[0], :]
-                        ._get_blocks(block_structure[1:]))
+            return tuple(
+                self[start:end, :]
+                for (start, end) in zip(offsets[:-1], offsets[1:]))
         else:
             raise ValueError()
 
@@ -113,16 +125,85 @@ class Matrix(Expression):
         return (cls, tuple(matrix.ravel()), tuple(matrix.shape))
 
     def __hash__(self):
-        if not self._hash:
+        if self._hash is None:
             self._hash = hash((tuple(self.matrix.ravel()),
                                self.matrix.shape, Matrix))
         return self._hash
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return (isinstance(other, Matrix) and
                 self.shape == other.shape and
                 (self.matrix == other.matrix).all())
 
+    def _get_sparse(self):
+        """Return the sparse index of the matrix elements
+
+        The result is a tuple ``(rows, row_has_op, col_has_op)``. `rows`
+        contains a list of ``(col, element)`` tuples for the non-zero
+        elements in each row. The lists `row_has_op` and `col_has_op`
+        indicate for each row and column whether it contains an
+        :class:`.Operator` (including :obj:`.ZeroOperator`), or they are
+        None if the matrix has elements that are neither scalars nor
+        operators. The index is created only once.
+        """
+        if self._sparse is None:
+            (n, m) = self.shape
+            rows = []
+            row_has_op = [False] * n
+            col_has_op = [False] * m
+            for (i, row) in enumerate(self.matrix.tolist()):
+                entries = []
+                for (j, val) in enumerate(row):
+                    if isinstance(val, Operator):
+                        row_has_op[i] = col_has_op[j] = True
+                    elif not is_scalar(val):
+                        row_has_op = col_has_op = None
+                    if not _is_zero_element(val):
+                        entries.append((j, val))
+                rows.append(entries)
+            self._sparse = (rows, row_has_op, col_has_op)
+        return self._sparse
+
+    def _sparse_dot(self, other):
+        """Matrix product of `self` and `other`, evaluating only products of
+        non-zero elements, or None if the sparse product is not possible.
+
+        The result is identical to the dense product: an element to which an
+        :class:`.Operator` would contribute (even as a factor in a product
+        with zero) is an :class:`.Operator`."""
+        if self.matrix.dtype != object and other.matrix.dtype != object:
+            return None  # numpy's dense product is faster
+        if self.shape[1] != other.shape[0]:
+            return None  # numpy raises the appropriate exception
+        rows_a, row_has_op, _ = self._get_sparse()
+        rows_b, _, col_has_op = other._get_sparse()
+        if row_has_op is None or col_has_op is None:
+            return None
+        n, m = self.shape[0], other.shape[1]
+        res = np_zeros((n, m), dtype=object)
+        for (i, row) in enumerate(rows_a):
+            row_res = {}
+            for (k, a) in row:
+                for (j, b) in rows_b[k]:
+                    if j in row_res:
+                        row_res[j] = row_res[j] + a * b
+                    else:
+                        row_res[j] = a * b
+            for (j, val) in row_res.items():
+                res[i, j] = val
+            if row_has_op[i]:
+                cols = range(m)
+            else:
+                cols = [j for j in range(m) if col_has_op[j]]
+            for j in cols:
+                if j not in row_res:
+                    res[i, j] = ZeroOperator
+                elif not isinstance(res[i, j], Operator):
+                    res[i, j] = res[i, j] + ZeroOperator
+        return res
+
     def __add__(self, other):
         if isinstance(other, Matrix):
             return Matrix(self.matrix + other.matrix)
@@ -134,7 +215,10 @@ class Matrix(Expression):
 
     def __mul__(self, other):
         if isinstance(other, Matrix):
-            return Matrix(self.matrix.dot(other.matrix))
+            res = self._sparse_dot(other)
+            if res is None:
+                res = self.matrix.dot(other.matrix)
+            return Matrix(res)
         else:
             return Matrix(self.matrix * other)
 
@@ -219,6 +303,58 @@ class Matrix(Expression):
         emat = [func(o, *args, **kwargs) for o in self.matrix.ravel()]
         return Matrix(np_array(emat).reshape(s))
 
+    def _map_elements(self, func, skip_zeros=False, workers=None):
+        """Apply `func` to every distinct element of the matrix
+
+        Args:
+            func (callable): function that takes a matrix element as its only
+                argument
+            skip_zeros (bool): If True, assume that ``func(zero) == zero``,
+                and copy zero elements without calling `func`
+            workers (int or None): If given, the distinct elements are
+                processed in a pool of `workers` processes (cf.
+                :func:`.parallel_map`). This has no effect if `func` cannot be
+                pickled, or inside a context that changes the algebraic rules.
+
+        Returns:
+            Matrix: Matrix of the same shape (and class), with the results
+            of `func`.
+        """
+        emat = self.matrix.ravel().tolist()
+        if skip_zeros:
+            ncols = self.shape[1]
+            elements = [
+                (i * ncols + j, val)
+                for (i, row) in enumerate(self._get_sparse()[0])
+                for (j, val) in row]
+        else:
+            elements = enumerate(emat)
+        distinct = {}  # (type, element) => index in todo
+        todo = []
+        todo_indices = []  # (position in emat, index in todo)
+        for (pos, val) in elements:
+            try:
+                key = (type(val), val)
+                i = distinct.setdefault(key, len(todo))
+            except TypeError:  # unhashable element
+                i = len(todo)
+            if i == len(todo):
+                todo.append(val)
+            todo_indices.append((pos, i))
+        results = parallel_map(func, todo, workers)
+        for (pos, i) in todo_indices:
+            emat[pos] = results[i]
+        if self.matrix.dtype == object and any(
+                type(val) not in _NUMBER_TYPES for val in results):
+            # the result has dtype object in any case, and filling an array
+            # is much faster than letting numpy inspect every element
+            res = np_empty(len(emat), dtype=object)
+            for (pos, val) in enumerate(emat):
+                res[pos] = val
+        else:
+            res = np_array(emat)
+        return self.__class__(res.reshape(self.shape))
+
     def series_expand(self, param: Symbol, about, order: int):
         """Expand the matrix expression as a truncated power series in a scalar
         parameter.
@@ -237,20 +373,23 @@ class Matrix(Expression):
                       for o in self.matrix.ravel()])
         return tuple((Matrix(np_array(em).reshape(s)) for em in emats))
 
-    def expand(self):
+    def expand(self, workers=None):
         """Expand each matrix element distributively.
 
+        Each distinct non-zero element is expanded only once. If `workers` is
+        given, the elements are expanded in a pool of `workers` processes.
+
         Returns:
             Matrix: Expanded matrix.
         """
-        return self.element_wise(
-            lambda o: o.expand() if isinstance(o, QuantumExpression) else o)
+        return self._map_elements(
+            _expand_element, skip_zeros=True, workers=workers)
 
     def _substitute(self, var_map):
         if self in var_map:
             return var_map[self]
         else:
-            return self.element_wise(lambda o: substitute(o, var_map))
+            return self._map_elements(lambda o: substitute(o, var_map))
 
     @property
     def free_symbols(self):
@@ -272,18 +411,25 @@ class Matrix(Expression):
         else:
             return ProductSpace.create(*arg_spaces)
 
-    def simplify_scalar(self, func=sympy.simplify):
-        """Simplify all scalar expressions appearing in the Matrix."""
+    def simplify_scalar(self, func=None, workers=None):
+        """Simplify all scalar expressions appearing in the Matrix.
+
+        See :meth:`.QuantumExpression.simplify_scalar` for the meaning of
+        `func` and `workers`.
+        """
+        func = get_simplify_func(func)
+        if workers is not None:
+            get_simplify_cache().populate(func, self, workers=workers)
 
         def element_simplify(v):
             if isinstance(v, sympy.Basic):
-                return func(v)
+                return simplify_cached(v, func=func)
             elif isinstance(v, QuantumExpression):
                 return v.simplify_scalar(func=func)
             else:
                 return v
 
-        return self.element_wise(element_simplify)
+        return self._map_elements(element_simplify, skip_zeros=True)
 
 
 def hstackm(matrices):
@@ -431,3 +577,38 @@ def ReAdjoint(opmatrix):
         Matrix: The matrix real part of the operand.
     """
     return (opmatrix.H + opmatrix) / 2
+
+
+_NUMBER_TYPES = (bool, int, float, complex)
+
+
+def _expand_element(val):
+    """Expand a matrix element (module-level, so that it can be pickled)"""
+    if isinstance(val, QuantumExpression):
+        return val.expand()
+    return val
+
+
+def _is_zero_element(val):
+    """Check whether a matrix element is zero, without any symbolic
+    evaluation"""
+    if isinstance(val, QuantumExpression):
+        return val.is_zero
+    return val == 0
+
+
+def _intern_elements(matrix):
+    """Return the object array `matrix`, with all SymPy elements replaced by
+    their interned version (:func:`.intern_sympy`). The input array is not
+    modified; a copy is made only if any element is replaced."""
+    res = None
+    for (i, val) in enumerate(matrix.flat):
+        if isinstance(val, sympy.Basic):
+            interned = intern_sympy(val)
+            if interned is not val:
+                if res is None:
+                    res = matrix.copy()
+                res.flat[i] = interned
+    if res is None:
+        return matrix
+    return res
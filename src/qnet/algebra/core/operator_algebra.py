@@ -8,6 +8,7 @@ documentation for the basic :class:`Operator` class.
 import re
 from abc import ABCMeta
 from collections import OrderedDict, defaultdict
+from collections.abc import Iterator
 from itertools import product as cartesian_product
 
 from sympy import Expr as SympyExpr, I, sqrt, sympify
@@ -20,7 +21,8 @@ from .algebraic_properties import (
     assoc, assoc_indexed, commutator_order, delegate_to_method,
     disjunct_hs_zero, filter_neutral, implied_local_space, match_replace,
     match_replace_binary, orderby, scalars_to_op, indexed_sum_over_const,
-    indexed_sum_over_kronecker)
+    indexed_sum_over_kronecker, local_sigma_product)
+from .abstract_algebra import Operation, ExpansionEstimate
 from .exceptions import CannotSimplify, BasisNotSetError
 from .hilbert_space_algebra import (
     HilbertSpace, LocalSpace, ProductSpace, TrivialSpace, )
@@ -40,7 +42,8 @@ DENSE_DIMENSION_LIMIT = 1000
 __all__ = [
     'Adjoint', 'Create', 'Destroy', 'Displace', 'Jminus', 'Jplus',
     'Jz', 'LocalOperator', 'LocalSigma', 'NullSpaceProjector', 'Operator',
-    'OperatorPlus', 'OperatorPlusMinusCC', 'OperatorSymbol', 'OperatorTimes',
+    'OperatorPlus', 'OperatorPlusMinusCC', 'OperatorPower', 'OperatorSymbol',
+    'OperatorTimes',
     'OperatorTrace', 'Phase', 'PseudoInverse', 'ScalarTimesOperator',
     'Squeeze', 'Jmjmcoeff', 'Jpjmcoeff', 'Jzjmcoeff', 'LocalProjector', 'X',
     'Y', 'Z', 'adjoint', 'create_operator_pm_cc', 'decompose_space',
@@ -652,7 +655,7 @@ class LocalSigma(LocalOperator):
         if isinstance(self.j, (int, SymbolicLabelBase)):
             return self.j
         else:
-            return self.space.basis_labels.index(self.j)
+            return self.space.basis_index(self.j)
 
     @property
     def index_k(self):
@@ -660,7 +663,7 @@ class LocalSigma(LocalOperator):
         if isinstance(self.k, (int, SymbolicLabelBase)):
             return self.k
         else:
-            return self.space.basis_labels.index(self.k)
+            return self.space.basis_index(self.k)
 
     def raise_jk(self, j_incr=0, k_incr=0):
         r'''Return a new :class:`LocalSigma` instance with incremented `j`,
@@ -743,7 +746,98 @@ class OperatorTimes(QuantumTimes, Operator):
 
     _neutral_element = IdentityOperator
     _binary_rules = OrderedDict()
-    _simplifications = [assoc, orderby, filter_neutral, match_replace_binary]
+    _simplifications = [
+        assoc, orderby, filter_neutral, local_sigma_product,
+        match_replace_binary]
+
+
+class OperatorPower(Operator, Operation):
+    r"""A product of `exp` identical factors `base`, $\Op{A}^n$
+
+    Inside the :func:`.collect_operator_powers` context, consecutive
+    identical operands of :class:`OperatorTimes` are collected into an
+    :class:`OperatorPower` when instantiating through
+    :meth:`~.Expression.create`, which keeps the operands of long products
+    (e.g., in Kerr or multi-photon terms) short::
+
+        >>> a = Destroy(hs=1)
+        >>> print(ascii(a.dag() * a.dag() * a * a))
+        a^(1)H * a^(1)H * a^(1) * a^(1)
+        >>> with collect_operator_powers():
+        ...     expr = a.dag() * a.dag() * a * a
+        >>> print(ascii(expr))
+        a^(1)H**2 * a^(1)**2
+        >>> [type(op).__name__ for op in expr.operands]
+        ['OperatorPower', 'OperatorPower']
+
+    Args:
+        base (Operator): The repeated factor
+        exp (int): The number of factors, at least 2
+    """
+
+    _rules = OrderedDict()
+    _simplifications = [match_replace]
+
+    def __init__(self, base, exp):
+        if not isinstance(base, Operator):
+            raise TypeError("base must be an Operator, not %r" % base)
+        if not isinstance(exp, int) or exp < 2:
+            raise ValueError("exp must be an integer >= 2, not %r" % exp)
+        super().__init__(base, exp)
+
+    @property
+    def base(self):
+        """The repeated factor"""
+        return self.operands[0]
+
+    @property
+    def exp(self):
+        """The number of factors"""
+        return self.operands[1]
+
+    @property
+    def space(self):
+        return self.base.space
+
+    def as_product(self):
+        """The equivalent :class:`OperatorTimes` of `exp` factors, without
+        collecting them back into a power"""
+        return OperatorTimes(*([self.base] * self.exp))
+
+    def __pow__(self, other):
+        if isinstance(other, int) and other > 0:
+            return OperatorPower.create(self.base, self.exp * other)
+        return super().__pow__(other)
+
+    def _expand(self):
+        base = self.base.expand()
+        if isinstance(base, OperatorPlus):
+            return OperatorTimes(*([base] * self.exp)).expand()
+        return OperatorPower.create(base, self.exp)
+
+    def _iter_terms(self):
+        return self.as_product()._iter_terms()
+
+    def _estimate_expansion(self):
+        base = self.base._estimate_expansion()
+        return ExpansionEstimate(
+            terms=base.terms**self.exp, factors=base.factors * self.exp)
+
+    def _series_expand(self, param, about, order):
+        return self.as_product()._series_expand(param, about, order)
+
+    def _diff(self, sym):
+        return self.as_product()._diff(sym)
+
+    def _adjoint(self):
+        return OperatorPower.create(self.base.adjoint(), self.exp)
+
+    def _pseudo_inverse(self):
+        return OperatorPower.create(self.base.pseudo_inverse(), self.exp)
+
+    def _simplify_scalar(self, func):
+        return OperatorPower.create(
+            self.base.simplify_scalar(func=func), self.exp)
 
 
 class ScalarTimesOperator(Operator, ScalarTimesQuantumExpression):
@@ -1159,26 +1253,46 @@ def get_coeffs(expr, expand=False, epsilon=0.):
     doesn't exist.
 
     Args:
-        expr: The operator expression to get all coefficients from.
-        expand: Whether to expand the expression distributively.
+        expr: The operator expression to get all coefficients from, or an
+            iterator over ``(coeff, term)`` tuples as returned by
+            :meth:`~.QuantumExpression.iter_terms`.
+        expand: Whether to expand the expression distributively. The terms of
+            the expansion are processed one at a time, without instantiating
+            the expanded expression. Like terms that cancel are dropped. If
+            the entire expansion vanishes, the result is
+            ``{ZeroOperator: 1}``, as for a non-expanded `expr` that is
+            :obj:`ZeroOperator` (but it is empty for an iterator `expr`
+            without any terms).
         epsilon: If non-zero, drop all Operators with coefficients that have
             absolute value less than epsilon.
 
     Returns:
         dict: A dictionary ``{op1: coeff1, op2: coeff2, ...}``
     """
-    if expand:
-        expr = expr.expand()
     ret = defaultdict(int)
-    operands = expr.operands if isinstance(expr, OperatorPlus) else [expr]
-    for e in operands:
-        c, t = _coeff_term(e)
+    if isinstance(expr, Iterator) or expand:
+        terms = expr if isinstance(expr, Iterator) else expr.iter_terms()
+        for (c, t) in terms:
+            ret[t] += c
+        # like terms of the expansion may cancel
+        for (t, c) in list(ret.items()):
+            if c == 0:
+                del ret[t]
+        if len(ret) == 0 and not isinstance(expr, Iterator):
+            # as for ``expr.expand() == ZeroOperator``
+            ret[ZeroOperator] = 1
+    else:
+        operands = expr.operands if isinstance(expr, OperatorPlus) else [expr]
+        for e in operands:
+            c, t = _coeff_term(e)
+            ret[t] += c
+    # apply `epsilon` to the sums, as the terms of an expansion may cancel
+    for (t, c) in list(ret.items()):
         try:
             if abs(complex(c)) < epsilon:
-                continue
+                del ret[t]
         except TypeError:
             pass
-        ret[t] += c
     return ret
 
 
@@ -1242,7 +1356,7 @@ def Jpjmcoeff(ls, m, shift=False):
         s = sympify(n - 1) / 2
         assert n == int(2 * s + 1)
         if isinstance(m, str):
-            m = ls.basis_labels.index(m) - s  # m is now Sympy expression
+            m = ls.basis_index(m) - s  # m is now Sympy expression
         elif isinstance(m, int):
             if shift:
                 assert 0 <= m < n
@@ -1267,7 +1381,7 @@ def Jzjmcoeff(ls, m, shift):
         s = sympify(n - 1) / 2
         assert n == int(2 * s + 1)
         if isinstance(m, str):
-            return ls.basis.index(m) - s
+            return ls.basis_index(m) - s
         elif isinstance(m, int):
             if shift:
                 assert 0 <= m < n
@@ -1293,7 +1407,7 @@ def Jmjmcoeff(ls, m, shift):
         s = sympify(n - 1) / 2
         assert n == int(2 * s + 1)
         if isinstance(m, str):
-            m = ls.basis.index(m) - s  # m is now Sympy expression
+            m = ls.basis_index(m) - s  # m is now Sympy expression
         elif isinstance(m, int):
             if shift:
                 assert 0 <= m < n
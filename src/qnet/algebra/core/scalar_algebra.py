@@ -1,11 +1,14 @@
 """Implementation of the scalar (quantum) algebra"""
 from abc import ABCMeta
 from collections import OrderedDict
+from functools import lru_cache
 from itertools import product as cartesian_product
+from operator import add, mul, sub, truediv
 
 import numpy
 import sympy
 from numpy import complex128, float64, int64
+from sympy.polys.fields import FracElement
 
 from .abstract_quantum_algebra import (
     QuantumExpression, QuantumIndexedSum, QuantumOperation, QuantumPlus,
@@ -14,10 +17,13 @@ from .algebraic_properties import (
     assoc, assoc_indexed, convert_to_scalars, filter_neutral,
     indexed_sum_over_const, scalar_indexed_sum_over_kronecker, match_replace,
     match_replace_binary, orderby)
+from .coefficient_ring import CoefficientField
 from .hilbert_space_algebra import TrivialSpace
+from ...utils.interning import intern_sympy
 from ...utils.singleton import Singleton, singleton_object
 from ...utils.ordering import KeyTuple
 from ...utils.indices import SymbolicLabelBase
+from ...utils.simplify_cache import simplify_cached
 
 __all__ = [
     'Scalar', 'ScalarValue', 'ScalarExpression', 'Zero', 'One', 'ScalarPlus',
@@ -31,7 +37,18 @@ class Scalar(QuantumExpression, metaclass=ABCMeta):
 
     #: types that may be wrapped by :class:`ScalarValue`
     _val_types = (
-        int, float, complex, sympy.Basic, int64, complex128, float64)
+        int, float, complex, sympy.Basic, int64, complex128, float64,
+        FracElement)
+
+    #: inexact numeric types (including :obj:`numpy.float64` and
+    #: :obj:`numpy.complex128`, as subclasses). Arithmetic between these and
+    #: numeric SymPy values is done natively, without sympification
+    _inexact_types = (float, complex)
+
+    #: :class:`.CoefficientField` in which symbolic coefficients are
+    #: represented, or None for general SymPy expressions, see
+    #: :func:`.polynomial_coefficients`
+    _coeff_field = None
 
     #: values that cannot be wrapped by :class:`ScalarValue`
     _invalid = {sympy.oo, sympy.zoo, numpy.nan, numpy.inf}
@@ -172,6 +189,11 @@ class ScalarValue(Scalar):
         <class 'numpy.int64'>
         <class 'numpy.complex128'>
         <class 'numpy.float64'>
+        <class 'sympy.polys.fields.FracElement'>
+
+    A rational function (:class:`~sympy.polys.fields.FracElement`) is only
+    used internally, inside :func:`.polynomial_coefficients`. The
+    :attr:`val` attribute always returns a SymPy expression in this case.
 
     A :class:`ScalarValue` behaves exactly like its wrapped value in all
     algebraic contexts::
@@ -187,6 +209,12 @@ class ScalarValue(Scalar):
         """
         if val in cls._invalid:
             raise ValueError("Invalid value %r" % val)
+        field = cls._coeff_field
+        if (field is not None and isinstance(val, sympy.Basic) and
+                not val.is_number):
+            poly = field.from_expr(val)
+            if poly is not None:
+                val = poly
         if val == 0:
             return Zero
         elif val == 1:
@@ -200,7 +228,9 @@ class ScalarValue(Scalar):
             return cls(val)
 
     def __init__(self, val):
+        val = intern_sympy(val)
         self._val = val
+        self._val_expr = None
         if not isinstance(val, self._val_types):
             raise TypeError(
                 "val must be one of " +
@@ -213,15 +243,25 @@ class ScalarValue(Scalar):
         else:
             return Zero
 
+    def _simplify_scalar(self, func):
+        if isinstance(self.val, sympy.Basic):
+            return ScalarValue.create(simplify_cached(self.val, func=func))
+        else:
+            return self
+
     @property
     def val(self):
         """The wrapped scalar value"""
+        if isinstance(self._val, FracElement):
+            if self._val_expr is None:
+                self._val_expr = self._val.as_expr()
+            return self._val_expr
         return self._val
 
     @property
     def args(self):
         """Tuple containing the wrapped scalar value as its only element"""
-        return (self._val,)
+        return (self.val,)
 
     def _series_expand(self, param, about, order):
         if isinstance(self.val, sympy.Basic):
@@ -285,36 +325,36 @@ class ScalarValue(Scalar):
         return hash(self.val)
 
     def __neg__(self):
-        return self.create(-self.val)
+        return self.create(-self._val)
 
     def __abs__(self):
         return self.create(abs(self.val))
 
     def __add__(self, other):
         if isinstance(other, ScalarValue):
-            return self.create(self.val + other.val)
+            return self.create(_binary_op(add, self._val, other._val))
         elif isinstance(other, self._val_types):
-            return self.create(self.val + other)
+            return self.create(_binary_op(add, self._val, other))
         elif other == 1:
-            return self.create(self.val + 1)
+            return self.create(_binary_op(add, self._val, 1))
         else:
             return super().__add__(other)  # other == 0
 
     def __sub__(self, other):
         if isinstance(other, ScalarValue):
-            return self.create(self.val - other.val)
+            return self.create(_binary_op(sub, self._val, other._val))
         elif isinstance(other, self._val_types):
-            return self.create(self.val - other)
+            return self.create(_binary_op(sub, self._val, other))
         elif other == 1:
-            return self.create(self.val - 1)
+            return self.create(_binary_op(sub, self._val, 1))
         else:
             return super().__sub__(other)  # other == 0
 
     def __mul__(self, other):
         if isinstance(other, ScalarValue):
-            return self.create(self.val * other.val)
+            return self.create(_binary_op(mul, self._val, other._val))
         elif isinstance(other, self._val_types):
-            return self.create(self.val * other)
+            return self.create(_binary_op(mul, self._val, other))
         else:
             return super().__mul__(other)  # other == 0, 1
 
@@ -328,10 +368,10 @@ class ScalarValue(Scalar):
 
     def __truediv__(self, other):
         if isinstance(other, ScalarValue):
-            return self.create(self.val / other.val)
+            return self.create(_binary_op(truediv, self._val, other._val))
         elif isinstance(other, self._val_types):
             try:
-                return self.create(self.val / other)
+                return self.create(_binary_op(truediv, self._val, other))
             except ValueError:
                 # sympy may produce 'infinity', which `create` catches as a
                 # ValueError
@@ -357,23 +397,23 @@ class ScalarValue(Scalar):
 
     def __radd__(self, other):
         if other == 1:
-            return self.create(1 + self.val)
+            return self.create(_binary_op(add, 1, self._val))
         elif isinstance(other, self._val_types):
-            return self.create(other + self.val)
+            return self.create(_binary_op(add, other, self._val))
         else:
             return super().__radd__(other)  # other == 0
 
     def __rsub__(self, other):
         if other == 1:
-            return self.create(1 - self.val)
+            return self.create(_binary_op(sub, 1, self._val))
         elif isinstance(other, self._val_types):
-            return self.create(other - self.val)
+            return self.create(_binary_op(sub, other, self._val))
         else:
             return super().__radd__(other)  # other == 0
 
     def __rmul__(self, other):
         if isinstance(other, self._val_types):
-            return self.create(other * self.val)
+            return self.create(_binary_op(mul, other, self._val))
         else:
             return super().__rmul__(other)  # other == 0, 1
 
@@ -389,7 +429,7 @@ class ScalarValue(Scalar):
         if other == 1:
             return self.create(1 / self.val)
         elif isinstance(other, self._val_types):
-            return self.create(other / self.val)
+            return self.create(_binary_op(truediv, other, self._val))
         else:
             return super().__rtruediv__(other)  # other == 0, 1/x -> x^(-1)
 
@@ -865,6 +905,32 @@ class ScalarIndexedSum(QuantumIndexedSum, Scalar):
             term = ScalarValue.create(term)
         super().__init__(term, *ranges)
 
+    def _sum_terms(self, terms):
+        # Like successive additions, combine all the values of ScalarValue,
+        # One, and Zero terms into a single value, but with a single
+        # (linear-time) sympy.Add for all the SymPy values
+        numbers = []
+        sympy_vals = []
+        others = []
+        for term in terms:
+            if isinstance(term, ScalarValue):
+                if isinstance(term._val, sympy.Basic):
+                    sympy_vals.append(term._val)
+                else:
+                    numbers.append(term._val)
+            elif term is One or term is Zero:
+                numbers.append(term.val)
+            else:
+                others.append(term)
+        val = 0
+        for number in numbers:
+            val = _binary_op(add, val, number)
+        if len(sympy_vals) > 0:
+            val = _binary_op(add, val, sympy.Add(*sympy_vals))
+        if len(others) == 0:
+            return ScalarValue.create(val)
+        return super()._sum_terms([ScalarValue.create(val)] + others)
+
     def __pow__(self, other):
         if other == 0:
             return self._one
@@ -1061,6 +1127,45 @@ def is_scalar(scalar):
     return isinstance(scalar, Scalar) or isinstance(scalar, Scalar._val_types)
 
 
+def _binary_op(op, a, b):
+    """Apply the arithmetic operator `op` to the wrapped values `a` and `b`
+
+    If one of the values is an inexact (Python or NumPy) float or complex
+    number and the other is a SymPy value without any symbols (e.g.
+    ``sympy.I`` or ``sympy.Rational(1, 2)``), the SymPy value is evaluated to a
+    native number first. Thus, purely numeric coefficients are never promoted
+    to SymPy objects; SymPy arithmetic is used only when a symbol appears, or
+    if both values are exact.
+
+    Rational functions (inside :func:`.polynomial_coefficients`) are combined
+    in the :class:`.CoefficientField`, if possible.
+    """
+    if isinstance(a, FracElement) or isinstance(b, FracElement):
+        if Scalar._coeff_field is not None:
+            res = Scalar._coeff_field.binary_op(op, a, b)
+            if res is not None:
+                return res
+        a, b = CoefficientField.to_expr(a), CoefficientField.to_expr(b)
+    if isinstance(a, sympy.Basic):
+        if isinstance(b, Scalar._inexact_types) and a.is_number:
+            a = _sympy_to_number(a)
+    elif isinstance(b, sympy.Basic):
+        if isinstance(a, Scalar._inexact_types) and b.is_number:
+            b = _sympy_to_number(b)
+    return op(a, b)
+
+
+@lru_cache(maxsize=1024)
+def _sympy_to_number(val):
+    """Evaluate the numeric SymPy `val` to a float or complex number"""
+    if val.is_Number:
+        return float(val)
+    val = complex(val)
+    if val.imag == 0:
+        return val.real
+    return val
+
+
 Scalar._zero = Zero
 Scalar._one = One
 Scalar._base_cls = Scalar
@@ -14,10 +14,12 @@ from .scalar_algebra import is_scalar
 from .abstract_quantum_algebra import (
     ScalarTimesQuantumExpression, QuantumExpression, QuantumSymbol,
     QuantumPlus, QuantumTimes, QuantumAdjoint, QuantumIndexedSum,
-    ensure_local_space, _series_expand_combine_prod)
+    ensure_local_space, _series_expand_combine_prod, _iter_product_terms,
+    _estimate_product_expansion)
 from .algebraic_properties import (
-    accept_bras, assoc, assoc_indexed, basis_ket_zero_outside_hs,
-    filter_neutral, match_replace, match_replace_binary, orderby)
+    accept_bras, assoc, assoc_indexed, basis_ket_outer_product,
+    basis_ket_overlap, basis_ket_zero_outside_hs, filter_neutral,
+    match_replace, match_replace_binary, orderby)
 from .exceptions import OverlappingSpaces, UnequalSpaces, SpaceTooLargeError
 from .hilbert_space_algebra import FullSpace, TrivialSpace
 from qnet.algebra.core.algebraic_properties import (
@@ -273,7 +275,7 @@ class BasisKet(LocalKet, KetSymbol):
         hs._check_basis_label_type(label_or_index)
         if isinstance(label_or_index, str):
             label = label_or_index
-            ind = hs.basis_labels.index(label)  # raises BasisNotSetError
+            ind = hs.basis_index(label)  # raises BasisNotSetError
         elif isinstance(label_or_index, int):
             if hs.has_basis:
                 label = hs.basis_labels[label_or_index]
@@ -499,12 +501,16 @@ class OperatorTimesKet(State, Operation):
             return sum((cto * et for cto in ct.operands), ZeroKet)
         return ct * et
 
+    def _iter_terms(self):
+        return _iter_product_terms(self.operands, OperatorTimesKet.create)
+
+    def _estimate_expansion(self):
+        return _estimate_product_expansion(self.operands)
+
     def _series_expand(self, param, about, order):
         ce = self.operator.series_expand(param, about, order)
         te = self.ket.series_expand(param, about, order)
-
-        return tuple(ce[k] * te[n - k]
-                     for n in range(order + 1) for k in range(n + 1))
+        return _series_expand_combine_prod(ce, te, order)
 
 
 class Bra(State, QuantumAdjoint):
@@ -577,7 +583,7 @@ class BraKet(ScalarExpression, Operation):
     """
     _rules = OrderedDict()
     _space = TrivialSpace
-    _simplifications = [match_replace]
+    _simplifications = [basis_ket_overlap, match_replace]
 
     def __init__(self, bra, ket):
         _check_kets(bra, ket, same_space=True)
@@ -611,7 +617,7 @@ class BraKet(ScalarExpression, Operation):
 class KetBra(Operator, Operation):
     """A symbolic operator formed by the outer product of two states"""
     _rules = OrderedDict()
-    _simplifications = [match_replace]
+    _simplifications = [basis_ket_outer_product, match_replace]
 
     def __init__(self, ket, bra):
         _check_kets(ket, bra, same_space=True)
@@ -642,11 +648,18 @@ class KetBra(Operator, Operation):
             res_summands.append(KetBra.create(k, b))
         return OperatorPlus.create(*res_summands)
 
+    def _iter_terms(self):
+        # the bra has the conjugate coefficients of its ket
+        return _iter_product_terms(
+            (self.ket, self.bra.ket), KetBra.create, conjugate=(1, ))
+
+    def _estimate_expansion(self):
+        return _estimate_product_expansion((self.ket, self.bra.ket))
+
     def _series_expand(self, param, about, order):
         ke = self.ket.series_expand(param, about, order)
         be = self.bra.series_expand(param, about, order)
-        return tuple(ke[k] * be[n - k]
-                     for n in range(order + 1) for k in range(n + 1))
+        return _series_expand_combine_prod(ke, be, order)
 
 
 class KetIndexedSum(State, QuantumIndexedSum):
@@ -4,7 +4,9 @@ from ..core.circuit_algebra import (
 __all__ = ["connect", ]
 
 
-def connect(components, connections, force_SLH=False, expand_simplify=True):
+def connect(
+        components, connections, force_SLH=False, expand_simplify=True,
+        workers=None):
     """Connect a list of components according to a list of connections.
 
     Args:
@@ -16,6 +18,9 @@ def connect(components, connections, force_SLH=False, expand_simplify=True):
         force_SLH (bool): If True, convert the result to an SLH object
         expand_simplify (bool): If the result is an SLH object, expand and
             simplify the circuit after each feedback connection is added
+        workers (int or None): If given, expand and simplify in a pool of
+            `workers` processes (see :meth:`.SLH.expand` and
+            :meth:`.SLH.simplify_scalar`)
     """
     combined = Concatenation.create(*components)
     cdims = [c.cdim for c in components]
@@ -48,6 +53,7 @@ def connect(components, connections, force_SLH=False, expand_simplify=True):
     for k in range(nfb):
         combined = combined.feedback()
         if isinstance(combined, SLH) and expand_simplify:
-            combined = combined.expand().simplify_scalar()
+            combined = combined.expand(workers=workers).simplify_scalar(
+                workers=workers)
 
     return combined
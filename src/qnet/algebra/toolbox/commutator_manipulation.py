@@ -1,14 +1,25 @@
 from collections.__init__ import OrderedDict
 from functools import partial
 
-from ..core.abstract_algebra import simplify
+from sympy import sqrt
+
+from ..core.abstract_algebra import Expression, simplify
+from ..core.exceptions import CannotSimplify
+from ..core.hilbert_space_algebra import LocalSpace
 from ..core.operator_algebra import (
-    Operator, OperatorTimes,
-    Commutator, )
+    Operator, OperatorTimes, OperatorPower, OperatorPlus, ScalarTimesOperator,
+    Commutator, Create, Destroy, Jz, Jplus, Jminus, LocalSigma,
+    IdentityOperator, ZeroOperator, Jpjmcoeff, Jmjmcoeff, Jzjmcoeff)
+from ..core.scalar_algebra import KroneckerDelta, is_scalar
 from ..pattern_matching import wc, pattern
+from ...utils.lru import LRUDict
+
 
+__all__ = [
+    'expand_commutators_leibniz', 'evaluate_commutators',
+    'evaluate_commutator']
 
-__all__ = ['expand_commutators_leibniz', 'evaluate_commutators']
+__private__ = ['clear_commutator_cache']
 
 
 def expand_commutators_leibniz(expr, expand_expr=True):
@@ -28,19 +39,27 @@ def expand_commutators_leibniz(expr, expand_expr=True):
     recurse = partial(expand_commutators_leibniz, expand_expr=expand_expr)
     A = wc('A', head=Operator)
     C = wc('C', head=Operator)
-    AB = wc('AB', head=OperatorTimes)
-    BC = wc('BC', head=OperatorTimes)
+    AB = wc('AB', head=(OperatorTimes, OperatorPower))
+    BC = wc('BC', head=(OperatorTimes, OperatorPower))
 
     def leibniz_right(A, BC):
         """[A, BC] -> [A, B] C + B [A, C]"""
-        B = BC.operands[0]
-        C = OperatorTimes.create(*BC.operands[1:])
+        if isinstance(BC, OperatorPower):
+            B = BC.base
+            C = OperatorPower.create(BC.base, BC.exp - 1)
+        else:
+            B = BC.operands[0]
+            C = OperatorTimes.create(*BC.operands[1:])
         return Commutator.create(A, B) * C + B * Commutator.create(A, C)
 
     def leibniz_left(AB, C):
         """[AB, C] -> A [B, C] C + [A, C] B"""
-        A = AB.operands[0]
-        B = OperatorTimes(*AB.operands[1:])
+        if isinstance(AB, OperatorPower):
+            A = AB.base
+            B = OperatorPower.create(AB.base, AB.exp - 1)
+        else:
+            A = AB.operands[0]
+            B = OperatorTimes(*AB.operands[1:])
         return A * Commutator.create(B, C) + Commutator.create(A, C) * B
 
     rules = OrderedDict([
@@ -72,3 +91,249 @@ def evaluate_commutators(expr):
     B = wc('B', head=Operator)
     return simplify(
         expr, [(pattern(Commutator, A, B), lambda A, B: A*B - B*A)])
+
+
+###############################################################################
+# Closed-form commutators of local operators
+###############################################################################
+
+
+def _comm_destroy_create(A, B):
+    return IdentityOperator
+
+
+def _comm_create_destroy(A, B):
+    return -IdentityOperator
+
+
+def _comm_jz_jplus(A, B):
+    return B
+
+
+def _comm_jz_jminus(A, B):
+    return -B
+
+
+def _comm_jplus_jminus(A, B):
+    return 2 * Jz(hs=A.space)
+
+
+def _comm_sigma_sigma(A, B):
+    r"""[σ_ab, σ_cd] = δ_bc σ_ad - δ_da σ_cb"""
+    ls = A.space
+    return (
+        KroneckerDelta(A.k, B.j) * LocalSigma.create(A.j, B.k, hs=ls) -
+        KroneckerDelta(B.k, A.j) * LocalSigma.create(B.j, A.k, hs=ls))
+
+
+def _comm_destroy_sigma(A, B):
+    r"""[a, σ_jk] = √j σ_{j-1,k} - √(k+1) σ_{j,k+1}"""
+    return (
+        sqrt(B.index_j) * B.raise_jk(j_incr=-1) -
+        sqrt(B.index_k + 1) * B.raise_jk(k_incr=+1))
+
+
+def _comm_create_sigma(A, B):
+    r"""[a^†, σ_jk] = √(j+1) σ_{j+1,k} - √k σ_{j,k-1}"""
+    return (
+        sqrt(B.index_j + 1) * B.raise_jk(j_incr=+1) -
+        sqrt(B.index_k) * B.raise_jk(k_incr=-1))
+
+
+def _comm_jz_sigma(A, B):
+    r"""[J_z, σ_jk] = (m_j - m_k) σ_jk"""
+    ls = A.space
+    return (
+        (Jzjmcoeff(ls, B.index_j, shift=True) -
+         Jzjmcoeff(ls, B.index_k, shift=True)) * B)
+
+
+def _comm_jplus_sigma(A, B):
+    ls = A.space
+    return (
+        Jpjmcoeff(ls, B.index_j, shift=True) * B.raise_jk(j_incr=+1) -
+        Jmjmcoeff(ls, B.index_k, shift=True) * B.raise_jk(k_incr=-1))
+
+
+def _comm_jminus_sigma(A, B):
+    ls = A.space
+    return (
+        Jmjmcoeff(ls, B.index_j, shift=True) * B.raise_jk(j_incr=-1) -
+        Jpjmcoeff(ls, B.index_k, shift=True) * B.raise_jk(k_incr=+1))
+
+
+def _antisymmetric(comm):
+    """Turn a closed-form for [A, B] into one for [B, A] = -[A, B]"""
+
+    def swapped(A, B):
+        return -comm(B, A)
+
+    swapped.__doc__ = comm.__doc__
+    return swapped
+
+
+#: Closed-form commutators ``[A, B]`` for two :class:`.LocalOperator`
+#: instances acting on the same :class:`.LocalSpace`. The keys are pairs of
+#: operator classes (:class:`.LocalProjector` is handled as
+#: :class:`.LocalSigma`), the values are callables that receive `A` and `B`
+#: and return the commutator. A callable may raise
+#: :exc:`.CannotSimplify` (e.g. for spin operators on a Hilbert space without
+#: a basis)
+_COMMUTATOR_TABLE = {
+    (Destroy, Create): _comm_destroy_create,
+    (Create, Destroy): _comm_create_destroy,
+    (Jz, Jplus): _comm_jz_jplus,
+    (Jplus, Jz): _antisymmetric(_comm_jz_jplus),
+    (Jz, Jminus): _comm_jz_jminus,
+    (Jminus, Jz): _antisymmetric(_comm_jz_jminus),
+    (Jplus, Jminus): _comm_jplus_jminus,
+    (Jminus, Jplus): _antisymmetric(_comm_jplus_jminus),
+    (LocalSigma, LocalSigma): _comm_sigma_sigma,
+    (Destroy, LocalSigma): _comm_destroy_sigma,
+    (LocalSigma, Destroy): _antisymmetric(_comm_destroy_sigma),
+    (Create, LocalSigma): _comm_create_sigma,
+    (LocalSigma, Create): _antisymmetric(_comm_create_sigma),
+    (Jz, LocalSigma): _comm_jz_sigma,
+    (LocalSigma, Jz): _antisymmetric(_comm_jz_sigma),
+    (Jplus, LocalSigma): _comm_jplus_sigma,
+    (LocalSigma, Jplus): _antisymmetric(_comm_jplus_sigma),
+    (Jminus, LocalSigma): _comm_jminus_sigma,
+    (LocalSigma, Jminus): _antisymmetric(_comm_jminus_sigma),
+}
+
+#: Bounded cache for :func:`evaluate_commutator`
+_COMMUTATOR_CACHE = LRUDict(maxsize=10000)
+
+
+def _table_key(op):
+    """Class of `op` as used in the keys of `_COMMUTATOR_TABLE`"""
+    if isinstance(op, LocalSigma):
+        return LocalSigma
+    return op.__class__
+
+
+def clear_commutator_cache():
+    """Clear the cache of commutators used by :func:`evaluate_commutator`"""
+    _COMMUTATOR_CACHE.clear()
+
+
+def evaluate_commutator(A, B, expand=True, cache=None):
+    r"""Evaluate the commutator $[A, B]$ from closed-form tables
+
+    Commutators of two local operators on the same :class:`.LocalSpace`
+    (:class:`.Destroy`, :class:`.Create`, :class:`.Jz`, :class:`.Jplus`,
+    :class:`.Jminus`, :class:`.LocalSigma`) are looked up in a table of
+    closed-form results instead of expanding $A B - B A$ and re-simplifying.
+    Sums and scalar prefactors are handled by bilinearity, and products by
+    the Leibniz rule
+
+    .. math::
+
+        [A_1 \dots A_n, B] = \sum_{i} A_1 \dots A_{i-1} [A_i, B]
+                             A_{i+1} \dots A_n
+
+    (and analogously for a product in the second argument), skipping any
+    factor that acts on a Hilbert space disjoint from the other operand.
+    Commutators of operands that are not covered by the table are
+    instantiated through :meth:`.Commutator.create`.
+
+    Args:
+        A (Operator): The left operand
+        B (Operator): The right operand
+        expand (bool): Whether to expand the result
+        cache (dict or None): A dict in which to look up and store the
+            commutators of all operand pairs that are encountered. If None, a
+            bounded module-wide cache is used (see
+            :func:`clear_commutator_cache`). Results obtained inside of a
+            context that changes the algebraic rules (e.g.
+            :func:`.truncated_algebra`) are only re-used inside of the same
+            context.
+
+    Example:
+
+        >>> hs = LocalSpace('q', dimension=3)
+        >>> a, a_dag = Destroy(hs=hs), Create(hs=hs)
+        >>> print(ascii(evaluate_commutator(a_dag * a, a)))
+        -a^(q)
+        >>> print(ascii(evaluate_commutator(a_dag * a, a_dag * a_dag)))
+        2 * a^(q)H * a^(q)H
+    """
+    if cache is None:
+        cache = _COMMUTATOR_CACHE
+    if is_scalar(A) or is_scalar(B):
+        return ZeroOperator
+    key = (A, B, expand, Expression._rule_contexts)
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+    res = _evaluate_commutator(A, B, expand, cache)
+    cache[key] = res
+    return res
+
+
+def _evaluate_commutator(A, B, expand, cache):
+    """Uncached implementation of :func:`evaluate_commutator`"""
+    recurse = partial(evaluate_commutator, expand=expand, cache=cache)
+    if A == B or A.space.isdisjoint(B.space):
+        return ZeroOperator
+    # bilinearity
+    if (isinstance(A, ScalarTimesOperator) or
+            isinstance(B, ScalarTimesOperator)):
+        coeff = 1
+        if isinstance(A, ScalarTimesOperator):
+            coeff, A = A.coeff, A.term
+        if isinstance(B, ScalarTimesOperator):
+            coeff, B = coeff * B.coeff, B.term
+        res = coeff * recurse(A, B)
+        if expand:
+            res = res.expand()
+        return res
+    if isinstance(A, OperatorPlus):
+        return OperatorPlus.create(*[recurse(o, B) for o in A.operands])
+    if isinstance(B, OperatorPlus):
+        return OperatorPlus.create(*[recurse(A, o) for o in B.operands])
+    # Leibniz rule
+    if isinstance(A, OperatorTimes):
+        return _leibniz_sum(A.operands, B, expand, recurse, left=True)
+    if isinstance(B, OperatorTimes):
+        return _leibniz_sum(B.operands, A, expand, recurse, left=False)
+    if isinstance(A, OperatorPower):
+        return _leibniz_sum(
+            (A.base, ) * A.exp, B, expand, recurse, left=True)
+    if isinstance(B, OperatorPower):
+        return _leibniz_sum(
+            (B.base, ) * B.exp, A, expand, recurse, left=False)
+    # local operators
+    if isinstance(A.space, LocalSpace):
+        try:
+            comm = _COMMUTATOR_TABLE[(_table_key(A), _table_key(B))]
+            res = comm(A, B)
+            if expand:
+                res = res.expand()
+            return res
+        except (KeyError, CannotSimplify):
+            pass
+    return Commutator.create(A, B)
+
+
+def _leibniz_sum(factors, other, expand, recurse, left):
+    """Sum over Leibniz-rule terms for the commutator of a product of
+    `factors` with `other`. If `left`, the product is the left operand of the
+    commutator, otherwise the right operand."""
+    summands = []
+    for i, factor in enumerate(factors):
+        if factor.space.isdisjoint(other.space):
+            continue
+        if left:
+            comm = recurse(factor, other)
+        else:
+            comm = recurse(other, factor)
+        if comm is ZeroOperator:
+            continue
+        summand = OperatorTimes.create(
+            *(factors[:i] + (comm, ) + factors[i+1:]))
+        if expand:
+            summand = summand.expand()
+        summands.append(summand)
+    return OperatorPlus.create(*summands)
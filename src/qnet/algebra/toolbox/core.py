@@ -3,12 +3,19 @@ from collections import OrderedDict
 from copy import copy
 
 from ..core.abstract_algebra import Expression
+from ..core.algebraic_properties import (
+    collect_powers, ladder_zero_in_truncation, match_replace_binary, orderby)
+from ..core.coefficient_ring import CoefficientField
+from ..core.operator_algebra import OperatorTimes
+from ..core.scalar_algebra import Scalar
+from ..core.state_algebra import OperatorTimesKet
 from ...utils.check_rules import check_rules_dict
 
 
 __all__ = [
     "no_instance_caching", "temporary_instance_cache", "extra_rules",
-    "extra_binary_rules", "no_rules"]
+    "extra_binary_rules", "no_rules", "truncated_algebra",
+    "collect_operator_powers", "polynomial_coefficients"]
 
 
 @contextmanager
@@ -29,10 +36,8 @@ def temporary_instance_cache(cls):
     """Use a temporary cache for instances obtained from the `create` method of
     the given `cls`. That is, no cached instances from outside of the managed
     context will be used within the managed context, and vice versa"""
-    orig_instances = cls._instances
-    cls._instances = {}
-    yield
-    cls._instances = orig_instances
+    with _temporary_instance_caches([cls]):
+        yield
 
 
 @contextmanager
@@ -43,11 +48,9 @@ def extra_rules(cls, rules):
     orig_rules = copy(cls._rules)
     rules = check_rules_dict(rules)
     cls._rules.update(check_rules_dict(rules))
-    orig_instances = cls._instances
-    cls._instances = {}
-    yield
+    with _temporary_instance_caches([cls]), _rule_context():
+        yield
     cls._rules = orig_rules
-    cls._instances = orig_instances
 
 
 @contextmanager
@@ -57,11 +60,9 @@ def extra_binary_rules(cls, rules):
     """
     orig_rules = copy(cls._binary_rules)
     cls._binary_rules.update(check_rules_dict(rules))
-    orig_instances = cls._instances
-    cls._instances = {}
-    yield
+    with _temporary_instance_caches([cls]), _rule_context():
+        yield
     cls._binary_rules = orig_rules
-    cls._instances = orig_instances
 
 
 @contextmanager
@@ -72,8 +73,6 @@ def no_rules(cls):
     """
     has_rules = True
     has_binary_rules = True
-    orig_instances = cls._instances
-    cls._instances = {}
     try:
         orig_rules = cls._rules
         cls._rules = OrderedDict([])
@@ -84,9 +83,169 @@ def no_rules(cls):
         cls._binary_rules = OrderedDict([])
     except AttributeError:
         has_binary_rules = False
-    yield
+    with _temporary_instance_caches([cls]), _rule_context():
+        yield
     if has_rules:
         cls._rules = orig_rules
     if has_binary_rules:
         cls._binary_rules = orig_binary_rules
-    cls._instances = orig_instances
+
+
+@contextmanager
+def truncated_algebra():
+    """Context manager in which products of operators that vanish in the
+    finite dimension of their Hilbert space are dropped.
+
+    Within the managed context, :class:`.OperatorTimes` and
+    :class:`.OperatorTimesKet` treat the basis of every :class:`.LocalSpace`
+    as complete, e.g. ``Destroy(hs=hs)**k`` and ``Create(hs=hs)**k`` are zero
+    for ``k >= hs.dimension``. This is exact for spins, and corresponds to a
+    truncation of the Fock space for harmonic oscillators. Implies
+    `temporary_instance_cache` for both classes.
+
+    >>> hs = LocalSpace('c', dimension=3)
+    >>> a = Destroy(hs=hs)
+    >>> with truncated_algebra():
+    ...     print(ascii(a * a * a))
+    ...     print(ascii(a.dag() * a.dag() * a * a))
+    0
+    a^(c)H * a^(c)H * a^(c) * a^(c)
+    """
+    classes = (OperatorTimes, OperatorTimesKet)
+    orig_simplifications = {}
+    for cls in classes:
+        orig_simplifications[cls] = cls._simplifications
+        simplifications = list(cls._simplifications)
+        # check after the operands are flattened and ordered, but before
+        # any of the (more expensive) rules are applied
+        try:
+            i_insert = simplifications.index(orderby) + 1
+        except ValueError:
+            i_insert = 0
+        simplifications.insert(i_insert, ladder_zero_in_truncation)
+        cls._simplifications = simplifications
+    try:
+        with _temporary_instance_caches(classes), _rule_context():
+            yield
+    finally:
+        for cls in classes:
+            cls._simplifications = orig_simplifications[cls]
+
+
+@contextmanager
+def collect_operator_powers():
+    """Context manager in which repeated factors of an :class:`.OperatorTimes`
+    are collected into an :class:`.OperatorPower`.
+
+    Within the managed context, consecutive identical operands of a product
+    are run-length encoded when instantiating through
+    :meth:`~.Expression.create`. This keeps long same-space products, e.g. in
+    Kerr or multi-photon terms, short. Factors that combine with their
+    neighbors (e.g., in normal ordering) are still combined. Implies
+    `temporary_instance_cache` for :class:`.OperatorTimes`.
+
+    >>> a = Destroy(hs=1)
+    >>> with collect_operator_powers():
+    ...     print(ascii(a.dag() * a.dag() * a * a * a))
+    a^(1)H**2 * a^(1)**3
+    """
+    orig_simplifications = OperatorTimes._simplifications
+    simplifications = list(orig_simplifications)
+    # collect after the binary rules have combined everything they can
+    try:
+        i_insert = simplifications.index(match_replace_binary) + 1
+    except ValueError:
+        i_insert = len(simplifications)
+    simplifications.insert(i_insert, collect_powers)
+    OperatorTimes._simplifications = simplifications
+    try:
+        with _temporary_instance_caches([OperatorTimes]), _rule_context():
+            yield
+    finally:
+        OperatorTimes._simplifications = orig_simplifications
+
+
+@contextmanager
+def polynomial_coefficients(field=None):
+    """Represent symbolic scalar coefficients as sparse rational functions
+
+    Within the managed context, every symbolic :class:`.ScalarValue` that is a
+    rational function of symbols, their conjugates and square roots, and the
+    imaginary unit is stored as an element of `field` (a new
+    :class:`.CoefficientField` if not given). Arithmetic on these
+    coefficients, e.g. when collecting the terms of an
+    :class:`.OperatorPlus`, then always yields a canonical form, and terms
+    cancel without simplification::
+
+        >>> kappa, Delta = sympy.symbols('kappa Delta', positive=True)
+        >>> a = Destroy(hs=1)
+        >>> c = (kappa**2 - Delta**2) / (kappa - Delta)
+        >>> print(ascii(c * a - kappa * a))
+        (-kappa + (-Delta**2 + kappa**2)/(-Delta + kappa)) * a^(1)
+        >>> with polynomial_coefficients():
+        ...     print(ascii(c * a - kappa * a))
+        Delta * a^(1)
+
+    Coefficients with other functions or floating point numbers remain
+    general SymPy expressions. The context yields the `field`. Implies a
+    temporary instance cache for all expressions (cf.
+    `temporary_instance_cache`).
+    """
+    if field is None:
+        field = CoefficientField()
+    orig_field = Scalar._coeff_field
+    Scalar._coeff_field = field
+    # any class with its own cache (e.g. from `temporary_instance_cache`)
+    # would otherwise keep serving instances with non-field coefficients
+    classes = [
+        cls for cls in _all_subclasses(Expression)
+        if '_instances' in cls.__dict__]
+    try:
+        with _temporary_instance_caches(classes), _rule_context():
+            yield field
+    finally:
+        Scalar._coeff_field = orig_field
+
+
+@contextmanager
+def _temporary_instance_caches(classes):
+    """Use a new empty instance cache for each of the given `classes`
+
+    On exit, a class that did not have its own cache before shares the cache
+    of its base class again (instead of keeping the cache it inherited at the
+    time of entering the context).
+    """
+    orig_instances = {}
+    for cls in classes:
+        orig_instances[cls] = cls.__dict__.get('_instances', None)
+        cls._instances = {}
+    try:
+        yield
+    finally:
+        for cls in classes:
+            if orig_instances[cls] is None:
+                del cls._instances
+            else:
+                cls._instances = orig_instances[cls]
+
+
+def _all_subclasses(cls):
+    """List of `cls` and all of its (direct and indirect) subclasses"""
+    result = [cls]
+    for subclass in cls.__subclasses__():
+        for sub in _all_subclasses(subclass):
+            if sub not in result:
+                result.append(sub)
+    return result
+
+
+@contextmanager
+def _rule_context():
+    """Register a context that changes the rules for creating expressions, by
+    adding a new token to ``Expression._rule_contexts``"""
+    orig_rule_contexts = Expression._rule_contexts
+    Expression._rule_contexts = orig_rule_contexts + (object(), )
+    try:
+        yield
+    finally:
+        Expression._rule_contexts = orig_rule_contexts
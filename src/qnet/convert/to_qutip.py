@@ -1,20 +1,25 @@
 """Conversion of QNET expressions to qutip objects.
 """
 import re
+from collections.abc import Iterator
 from functools import reduce
+import numpy as np
+import sympy
 from sympy import symbols
 from sympy.utilities.lambdify import lambdify
-from scipy.sparse import csr_matrix
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.special import binom, factorial, gamma
 from numpy import (
     diag as np_diag, arange, cos as np_cos, sin as np_sin)
 from qnet.algebra.core.scalar_algebra import ScalarValue, is_scalar
-from qnet.algebra.core.exceptions import AlgebraError
+from qnet.algebra.core.exceptions import AlgebraError, BasisNotSetError
 from qnet.algebra.core.circuit_algebra import SLH, move_drive_to_H
 from qnet.algebra.core.abstract_algebra import Operation
+from qnet.algebra.core.indexed_operations import IndexedSum
 from qnet.algebra.core.operator_algebra import (
         Operator, IdentityOperator, ZeroOperator, LocalOperator, Create,
         Destroy, Jz, Jplus, Jminus, Phase, Displace, Squeeze, LocalSigma,
-        OperatorPlus, OperatorTimes, ScalarTimesOperator,
+        OperatorPlus, OperatorTimes, OperatorPower, ScalarTimesOperator,
         Adjoint, PseudoInverse, OperatorTrace, NullSpaceProjector)
 from qnet.algebra.core.state_algebra import (
         State, BraKet, KetBra, BasisKet, CoherentStateKet, KetPlus, TensorKet,
@@ -24,6 +29,7 @@ from qnet.algebra.core.super_operator_algebra import (
         SuperOperator, IdentitySuperOperator, SuperOperatorPlus,
         SuperOperatorTimes, ScalarTimesSuperOperator, SPre, SPost,
         SuperOperatorTimesOperator, ZeroSuperOperator)
+from qnet.utils.indices import IntIndex, index_arrays
 
 try:
     import qutip
@@ -43,7 +49,14 @@ def convert_to_qutip(expr, full_space=None, mapping=None):
     """Convert a QNET expression to a qutip object
 
     Args:
-        expr: a QNET expression
+        expr: a QNET expression, or an iterator over ``(coeff, term)``
+            tuples as returned by
+            :meth:`~.QuantumExpression.iter_terms`, or over expressions as
+            returned by :meth:`~.IndexedSum.doit_iter`. In the latter cases,
+            the terms are converted one at a time and summed, without
+            instantiating the expanded expression. Indexed sums are
+            evaluated numerically over all values of their indices at once
+            if possible, and converted one term at a time otherwise.
         full_space (HilbertSpace): The
             Hilbert space in which `expr` is defined. If not given,
             ``expr.space`` is used. The Hilbert space must have a well-defined
@@ -54,8 +67,11 @@ def convert_to_qutip(expr, full_space=None, mapping=None):
             for symbols
     Raises:
         ValueError: if `expr` is not in `full_space`, or if `expr` cannot be
-            converted.
+            converted, or if `expr` is an iterator and no `full_space` is
+            given or the iterator is empty.
     """
+    if isinstance(expr, Iterator):
+        return _convert_terms_to_qutip(expr, full_space, mapping)
     if full_space is None:
         full_space = expr.space
     if not expr.space.is_tensor_factor_of(full_space):
@@ -73,7 +89,9 @@ def convert_to_qutip(expr, full_space=None, mapping=None):
             else:
                 assert callable(ret)
                 return ret(expr)
-    if expr is IdentityOperator:
+    if isinstance(expr, IndexedSum):
+        return _convert_indexed_sum_to_qutip(expr, full_space, mapping)
+    elif expr is IdentityOperator:
         local_spaces = full_space.local_factors
         if len(local_spaces) == 0:
             raise ValueError("full_space %s does not have local factors"
@@ -82,10 +100,7 @@ def convert_to_qutip(expr, full_space=None, mapping=None):
             return qutip.tensor(*[qutip.qeye(s.dimension)
                                   for s in local_spaces])
     elif expr is ZeroOperator:
-        return qutip.tensor(
-            *[qutip.Qobj(csr_matrix((s.dimension, s.dimension)))
-              for s in full_space.local_factors]
-        )
+        return _zero_qobj(expr, full_space)
     elif isinstance(expr, LocalOperator):
         return _convert_local_operator_to_qutip(expr, full_space, mapping)
     elif (isinstance(expr, Operator) and isinstance(expr, Operation)):
@@ -213,9 +228,9 @@ def _convert_local_operator_to_qutip(expr, full_space, mapping):
         j = expr.j
         k = expr.k
         if isinstance(j, str):
-            j = expr.space.basis_labels.index(j)
+            j = expr.space.basis_index(j)
         if isinstance(k, str):
-            k = expr.space.basis_labels.index(k)
+            k = expr.space.basis_index(k)
         ket = qutip.basis(n, j)
         bra = qutip.basis(n, k).dag()
         return ket * bra
@@ -224,6 +239,221 @@ def _convert_local_operator_to_qutip(expr, full_space, mapping):
                          % (str(expr), type(expr)))
 
 
+def _convert_terms_to_qutip(
+        terms, full_space, mapping, expr=None, check_expansion=False):
+    """Sum over the qutip objects for all ``coeff * term`` in the `terms`
+    iterator of ``(coeff, term)`` tuples (or of expressions), converting one
+    term at a time.
+
+    If given, `expr` is the expression that the `terms` add up to. It
+    determines the shape of the (zero) result if there are no terms;
+    without `expr`, a ValueError is raised in this case. If
+    `check_expansion` is True, `terms` must be the expansion of `expr`, and a
+    ValueError is raised if the expansion reproduces `expr`."""
+    if full_space is None:
+        raise ValueError(
+            "full_space must be given when converting an iterator of terms")
+    res = None
+    for item in terms:
+        if isinstance(item, tuple):
+            coeff, term = item
+            if check_expansion and term == expr:
+                raise ValueError("Cannot represent as QuTiP object: {!s}"
+                                 .format(expr))
+            item = coeff * term
+        qobj = convert_to_qutip(item, full_space, mapping=mapping)
+        res = qobj if res is None else res + qobj
+    if res is None:
+        if expr is None:
+            raise ValueError(
+                "Cannot determine the shape of the QuTiP object for an empty "
+                "iterator of terms")
+        res = _zero_qobj(expr, full_space)
+    return res
+
+
+def _zero_qobj(expr, full_space):
+    """Zero QuTiP object of the same shape as `expr` converted in
+    `full_space`"""
+    local_spaces = full_space.local_factors
+    if isinstance(expr, State):
+        ket = qutip.tensor(
+            *[qutip.Qobj(csr_matrix((s.dimension, 1))) for s in local_spaces])
+        return ket.dag() if expr.isbra else ket
+    return qutip.tensor(
+        *[qutip.Qobj(csr_matrix((s.dimension, s.dimension)))
+          for s in local_spaces])
+
+
+#: NumPy/SciPy implementations of SymPy functions that :func:`lambdify` does
+#: not translate for the 'numpy' module, but that are common in the
+#: coefficients of indexed sums
+_VECTORIZED_FUNCTIONS = {
+    'factorial': factorial,
+    'binomial': binom,
+    'gamma': gamma,
+    'KroneckerDelta': lambda i, j: np.equal(i, j).astype(int),
+}
+
+
+def _convert_indexed_sum_to_qutip(expr, full_space, mapping):
+    """Convert an :class:`.IndexedSum` to qutip, as a single array
+    computation over all values of the indices if possible (see
+    :func:`_vectorized_indexed_sum_to_qutip`), or one term at a time
+    otherwise"""
+    if not mapping:
+        res = _vectorized_indexed_sum_to_qutip(expr, full_space)
+        if res is not None:
+            return res
+    terms = (term for term in expr.doit_iter() if not term.is_zero)
+    return _convert_terms_to_qutip(terms, full_space, mapping, expr=expr)
+
+
+def _vectorized_indexed_sum_to_qutip(expr, full_space):
+    """Convert the :class:`.IndexedSum` `expr` to qutip without expanding it
+
+    This requires the summand to be a coefficient times a :class:`.BasisKet`
+    or :class:`.LocalSigma` (or a tensor product of these), where the
+    coefficient and any :class:`.IntIndex`/:class:`.FockIndex` labels depend
+    on the summation indices. The coefficient and the labels are evaluated as
+    vectorized NumPy functions of arrays of all index values, and the results
+    are filled directly into a sparse matrix. Return None if `expr` does not
+    have this structure, or if the numerical evaluation fails, e.g. because
+    the coefficient contains free symbols other than the indices.
+    """
+    is_operator = isinstance(expr, Operator)
+    local_factors = expr.space.local_factors
+    all_spaces = full_space.local_factors
+    if len(local_factors) == 0:
+        # e.g. a sum over scalars times the identity
+        return None
+    own_space_index = all_spaces.index(local_factors[0])
+    if full_space != expr.space:
+        # a ket can only be represented in its own space. For operators, we
+        # pad with identities, which requires the local factors of `expr` to
+        # be contiguous in `full_space`
+        own_spaces = all_spaces[
+            own_space_index:own_space_index+len(local_factors)]
+        if not is_operator or own_spaces != local_factors:
+            return None
+    coeff, factors = _split_indexed_summand(expr.term)
+    if coeff is None:
+        return None
+    variables = tuple(expr.variables)
+    try:
+        values = index_arrays(expr.ranges)
+    except ValueError:  # infinite range
+        return None
+    if any(vals.dtype.kind not in 'iu' for vals in values):
+        return None
+    data = _evaluate_vectorized(coeff, variables, values, dtype=float)
+    if data is None:
+        return None
+    data = data.astype(complex)
+    if not np.all(np.isfinite(data)):
+        return None
+    try:
+        dims = [hs.dimension for hs in local_factors]
+    except BasisNotSetError:
+        return None
+    row_indices = []
+    col_indices = []
+    for (hs, dim) in zip(local_factors, dims):
+        if hs not in factors:
+            return None
+        indices = []
+        for label in factors[hs]:
+            index = _evaluate_label(label, hs, variables, values)
+            if index is None or np.any((index < 0) | (index >= dim)):
+                return None
+            indices.append(index)
+        row_indices.append(indices[0])
+        if is_operator:
+            col_indices.append(indices[1])
+    rows = expr.space.flat_index(row_indices)
+    if is_operator:
+        cols = expr.space.flat_index(col_indices)
+    else:
+        cols = np.zeros(len(data), dtype=int)
+    dimension = expr.space.dimension
+    if is_operator:
+        shape = (dimension, dimension)
+        qobj_dims = [dims, dims]
+    else:
+        shape = (dimension, 1)
+        qobj_dims = [dims, [1] * len(dims)]
+    matrix = coo_matrix((data, (rows, cols)), shape=shape).tocsr()
+    matrix.eliminate_zeros()
+    res = qutip.Qobj(matrix, dims=qobj_dims)
+    if full_space != expr.space:
+        res = qutip.tensor(
+            *([qutip.qeye(s.dimension)
+               for s in all_spaces[:own_space_index]] +
+              [res, ] +
+              [qutip.qeye(s.dimension)
+               for s in all_spaces[own_space_index+len(local_factors):]]))
+    return res
+
+
+def _split_indexed_summand(term):
+    """Split the summand of an indexed sum into a SymPy coefficient and a
+    dict that maps each local Hilbert space to the tuple of labels of the
+    :class:`.BasisKet` (one label) or :class:`.LocalSigma` (two labels)
+    acting in it. Return ``(None, None)`` if `term` does not have this
+    structure."""
+    coeff = sympy.Integer(1)
+    if isinstance(term, (ScalarTimesKet, ScalarTimesOperator)):
+        if not isinstance(term.coeff, ScalarValue):
+            return None, None
+        coeff = sympy.sympify(term.coeff.val)
+        term = term.term
+    if isinstance(term, (TensorKet, OperatorTimes)):
+        operands = term.operands
+    else:
+        operands = (term, )
+    factors = {}
+    for op in operands:
+        if op.space in factors:
+            return None, None
+        if isinstance(op, BasisKet):
+            factors[op.space] = (op.label, )
+        elif isinstance(op, LocalSigma):
+            factors[op.space] = (op.j, op.k)
+        else:
+            return None, None
+    return coeff, factors
+
+
+def _evaluate_vectorized(sympy_expr, variables, values, dtype):
+    """Evaluate `sympy_expr` for the arrays of `values` of the `variables`
+    (converted to `dtype`). Return None if this is not possible."""
+    if not sympy_expr.free_symbols <= set(variables):
+        return None
+    try:
+        func = lambdify(
+            variables, sympy_expr, modules=[_VECTORIZED_FUNCTIONS, 'numpy'])
+        with np.errstate(all='ignore'):
+            res = func(*[vals.astype(dtype) for vals in values])
+    except (NameError, TypeError, ValueError, ZeroDivisionError):
+        return None
+    return np.broadcast_to(res, values[0].shape)
+
+
+def _evaluate_label(label, hs, variables, values):
+    """Evaluate the basis `label` in `hs` to an array of integer indices
+    for the arrays of `values` of the `variables`, or return None if this is
+    not possible"""
+    if isinstance(label, IntIndex):
+        index = _evaluate_vectorized(label.expr, variables, values, dtype=int)
+        if index is None or index.dtype.kind not in 'iu':
+            return None
+        return index
+    try:
+        return np.full(values[0].shape, hs.basis_index(label))
+    except (ValueError, BasisNotSetError):
+        return None
+
+
 def _convert_operator_operation_to_qutip(expr, full_space, mapping):
     if isinstance(expr, OperatorPlus):
         return sum((convert_to_qutip(op, full_space, mapping=mapping)
@@ -231,11 +461,9 @@ def _convert_operator_operation_to_qutip(expr, full_space, mapping):
     elif isinstance(expr, OperatorTimes):
         # if any factor acts non-locally, we need to expand distributively.
         if any(len(op.space) > 1 for op in expr.operands):
-            se = expr.expand()
-            if se == expr:
-                raise ValueError("Cannot represent as QuTiP object: {!s}"
-                                 .format(expr))
-            return convert_to_qutip(se, full_space, mapping=mapping)
+            return _convert_terms_to_qutip(
+                expr.iter_terms(), full_space, mapping, expr=expr,
+                check_expansion=True)
         all_spaces = full_space.local_factors
         by_space = []
         ck = 0
@@ -253,6 +481,9 @@ def _convert_operator_operation_to_qutip(expr, full_space, mapping):
         assert ck == len(expr.operands)
         # combine local factors in tensor product
         return qutip.tensor(*by_space)
+    elif isinstance(expr, OperatorPower):
+        return convert_to_qutip(
+            expr.base, full_space, mapping=mapping) ** expr.exp
     elif isinstance(expr, Adjoint):
         return convert_to_qutip(qutip.dag(expr.operands[0]), full_space,
                                 mapping=mapping)
@@ -1,13 +1,16 @@
 """Conversion of QNET expressions to sympy matrices. For small Hilbert spaces,
 this facilitates some analytic treatments, such as decomposition into a basis.
 """
+from collections.abc import Iterator
+
 import sympy
 from sympy.physics.quantum import TensorProduct as tensor
 from qnet.algebra.core.abstract_algebra import Operation
+from qnet.algebra.core.indexed_operations import IndexedSum
 from qnet.algebra.core.operator_algebra import (
     IdentityOperator, ZeroOperator, LocalOperator, Create, Destroy, Jz, Jplus,
     Jminus, Phase, Displace, Squeeze, LocalSigma, Operator,
-    OperatorPlus, OperatorTimes, ScalarTimesOperator,
+    OperatorPlus, OperatorTimes, OperatorPower, ScalarTimesOperator,
     Adjoint, PseudoInverse, NullSpaceProjector)
 
 
@@ -38,7 +41,10 @@ def convert_to_sympy_matrix(expr, full_space=None):
     of the matrix may contain symbols.
 
     Parameters:
-        expr: a QNET expression
+        expr: a QNET expression, or an iterator over ``(coeff, term)``
+            tuples as returned by :meth:`~.QuantumExpression.iter_terms`, or
+            over expressions as returned by :meth:`~.IndexedSum.doit_iter`.
+            Indexed sums are converted one term at a time.
         full_space (qnet.algebra.hilbert_space_algebra.HilbertSpace): The
             Hilbert space in which `expr` is defined. If not given,
             ``expr.space`` is used. The Hilbert space must have a well-defined
@@ -48,13 +54,19 @@ def convert_to_sympy_matrix(expr, full_space=None):
         qnet.algebra.hilbert_space_algebra.BasisNotSetError: if `full_space`
             does not have a defined basis
         ValueError: if `expr` is not in `full_space`, or if `expr` cannot be
-            converted.
+            converted, or if `expr` is an iterator and no `full_space` is
+            given.
     """
+    if isinstance(expr, Iterator):
+        return _convert_terms_to_sympy_matrix(expr, full_space)
     if full_space is None:
         full_space = expr.space
     if not expr.space.is_tensor_factor_of(full_space):
         raise ValueError("expr must be in full_space")
-    if expr is IdentityOperator:
+    if isinstance(expr, IndexedSum):
+        terms = (term for term in expr.doit_iter() if not term.is_zero)
+        return _convert_terms_to_sympy_matrix(terms, full_space)
+    elif expr is IdentityOperator:
         return sympy.eye(full_space.dimension)
     elif expr is ZeroOperator:
         return 0
@@ -103,11 +115,8 @@ def convert_to_sympy_matrix(expr, full_space=None):
         elif isinstance(expr, OperatorTimes):
             # if any factor acts non-locally, we need to expand distributively.
             if any(len(op.space) > 1 for op in expr.operands):
-                se = expr.expand()
-                if se == expr:
-                    raise ValueError("Cannot represent as sympy matrix: %s"
-                                     % expr)
-                return convert_to_sympy_matrix(se, full_space)
+                return _convert_terms_to_sympy_matrix(
+                    expr.iter_terms(), full_space, expr=expr)
             all_spaces = full_space.local_factors
             by_space = []
             ck = 0
@@ -130,6 +139,8 @@ def convert_to_sympy_matrix(expr, full_space=None):
                 return by_space[0]
             else:
                 return tensor(*by_space)
+        elif isinstance(expr, OperatorPower):
+            return convert_to_sympy_matrix(expr.base, full_space) ** expr.exp
         elif isinstance(expr, Adjoint):
             return convert_to_sympy_matrix(expr.operand, full_space).H
         elif isinstance(expr, PseudoInverse):
@@ -146,3 +157,23 @@ def convert_to_sympy_matrix(expr, full_space=None):
     else:
         raise ValueError(
             "Cannot convert '%s' of type %s" % (str(expr), type(expr)))
+
+
+def _convert_terms_to_sympy_matrix(terms, full_space, expr=None):
+    """Sum over the matrices for all ``coeff * term`` in the `terms` iterator
+    of ``(coeff, term)`` tuples (or of expressions), converting one term at a
+    time. If `expr` is given, `terms` must be its expansion, and a ValueError
+    is raised if the expansion reproduces `expr`."""
+    if full_space is None:
+        raise ValueError(
+            "full_space must be given when converting an iterator of terms")
+    res = sympy.zeros(full_space.dimension)
+    for item in terms:
+        if isinstance(item, tuple):
+            coeff, term = item
+            if expr is not None and term == expr:
+                raise ValueError(
+                    "Cannot represent as sympy matrix: %s" % expr)
+            item = coeff * term
+        res += convert_to_sympy_matrix(item, full_space)
+    return res
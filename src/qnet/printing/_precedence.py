@@ -17,6 +17,7 @@ from sympy.printing.precedence import (
 PRECEDENCE_VALUES = {
     "OperatorPlus": PRECEDENCE["Add"],
     "OperatorTimes": PRECEDENCE["Mul"],
+    "OperatorPower": PRECEDENCE["Pow"],
     "ScalarTimesOperator": PRECEDENCE["Mul"],
     "Commutator": PRECEDENCE["Add"],
     "SingleOperatorOperation": PRECEDENCE["Atom"],
@@ -368,6 +368,14 @@ class QnetAsciiPrinter(QnetBasePrinter):
         return self._spaced_product_sym.join(
             [self.parenthesize(op, prec, **kwargs) for op in expr.operands])
 
+    def _print_OperatorPower(self, expr, adjoint=False):
+        prec = precedence(expr)
+        kwargs = {}
+        if adjoint:
+            kwargs['adjoint'] = adjoint
+        base_str = self.parenthesize(expr.base, prec, **kwargs)
+        return base_str + "**" + str(expr.exp)
+
     def _print_Commutator(self, expr):
         return "[" + self.doprint(expr.A) + ", " + self.doprint(expr.B) + "]"
 
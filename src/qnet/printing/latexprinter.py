@@ -179,6 +179,14 @@ class QnetLatexPrinter(QnetAsciiPrinter):
         res += args_str
         return res
 
+    def _print_OperatorPower(self, expr, adjoint=False):
+        prec = precedence(expr)
+        kwargs = {}
+        if adjoint:
+            kwargs['adjoint'] = adjoint
+        base_str = self.parenthesize(expr.base, prec, **kwargs)
+        return '{' + base_str + '}^{%d}' % expr.exp
+
     def _print_Commutator(self, expr):
         return (
             r'\left[' + self.doprint(expr.A) + ", " + self.doprint(expr.B) +
@@ -4,7 +4,9 @@ from sympy.printing.conventions import split_super_sub
 
 from .asciiprinter import QnetAsciiPrinter
 from .sympy import SympyUnicodePrinter
-from ._unicode_mappings import render_unicode_sub_super
+from ._unicode_mappings import (
+    render_unicode_sub_super, _SUPERSCRIPT_MAPPING)
+from ._precedence import precedence
 
 __all__ = []
 __private__ = ['QnetUnicodePrinter', 'SubSupFmt', 'SubSupFmtNoUni']
@@ -158,6 +160,19 @@ class QnetUnicodePrinter(QnetAsciiPrinter):
         else:
             return '[%s]_%s→%s' % (operand, o, i)
 
+    def _print_OperatorPower(self, expr, adjoint=False):
+        prec = precedence(expr)
+        kwargs = {}
+        if adjoint:
+            kwargs['adjoint'] = adjoint
+        base_str = self.parenthesize(expr.base, prec, **kwargs)
+        if (base_str[-1] in _SUPERSCRIPT_MAPPING.values() or
+                base_str.endswith('†')):
+            # avoid the exponent running into the label or the dagger
+            base_str = self._parenth_left + base_str + self._parenth_right
+        return base_str + ''.join(
+            _SUPERSCRIPT_MAPPING[digit] for digit in str(expr.exp))
+
     def _print_SeriesInverse(self, expr):
         return r'[{operand}]⁻¹'.format(
             operand=self.doprint(expr.operand))
@@ -1,7 +1,9 @@
 import re
 from abc import ABCMeta, abstractmethod
+from itertools import count, islice, product as cartesian_product
 
 import attr
+import numpy
 import sympy
 from sympy.core.cache import cacheit as sympy_cacheit
 
@@ -12,7 +14,8 @@ __all__ = [
     'IndexOverRange', 'IndexOverFockSpace']
 
 __private__ = [
-    'yield_from_ranges', 'SymbolicLabelBase', 'IndexRangeBase', 'product']
+    'yield_from_ranges', 'yield_index_tuples', 'yield_index_blocks',
+    'index_arrays', 'SymbolicLabelBase', 'IndexRangeBase', 'product']
 
 
 # support routines
@@ -64,6 +67,54 @@ def yield_from_ranges(ranges):
         yield _merge_dicts(*dicts)
 
 
+def yield_index_tuples(ranges):
+    """Return an iterator over tuples of index values for all combinations of
+    the given index `ranges`, in the same order as :func:`yield_from_ranges`.
+
+    The values of finite ranges are generated only once, and no dict is
+    created for any combination. The index symbols for the values in each
+    tuple are ``[r.index_symbol for r in ranges]``.
+    """
+    if all(index_range.is_finite for index_range in ranges):
+        return cartesian_product(
+            *[tuple(index_range.iter_values()) for index_range in ranges])
+    else:
+        return product(*[index_range.iter_values for index_range in ranges])
+
+
+def yield_index_blocks(ranges, block_size):
+    """Yield lists of (up to) `block_size` tuples of index values, for all
+    combinations of the given index `ranges`, cf. :func:`yield_index_tuples`.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+    tuples = yield_index_tuples(ranges)
+    while True:
+        block = list(islice(tuples, block_size))
+        if len(block) == 0:
+            break
+        yield block
+
+
+def index_arrays(ranges):
+    """Return a list of numpy arrays, one for each of the (finite) index
+    `ranges`, with the index values for all combinations of the `ranges`.
+
+    That is, ``zip(*index_arrays(ranges))`` iterates over the same tuples as
+    :func:`yield_index_tuples`::
+
+        >>> i, j = IdxSym('i'), IdxSym('j')
+        >>> index_arrays([IndexOverRange(i, 0, 2), IndexOverList(j, [1, 5])])
+        [array([0, 0, 1, 1, 2, 2]), array([1, 5, 1, 5, 1, 5])]
+
+    Raises:
+        ValueError: if any of the `ranges` is infinite
+    """
+    grids = numpy.meshgrid(
+        *[index_range.to_array() for index_range in ranges], indexing='ij')
+    return [grid.ravel() for grid in grids]
+
+
 # IdxSym
 
 class IdxSym(sympy.Symbol):
@@ -224,6 +275,27 @@ class IndexRangeBase(metaclass=ABCMeta):
         # IndexRangeBase.iter()
         raise NotImplementedError()
 
+    def iter_values(self):
+        """Generator function for the values of the index (without the
+        mapping to the :attr:`index_symbol` that :meth:`iter` yields)"""
+        for mapping in self.iter():
+            yield mapping[self.index_symbol]
+
+    def to_array(self):
+        """Numpy array of the values of the index
+
+        Raises:
+            ValueError: if the range is infinite
+        """
+        if not self.is_finite:
+            raise ValueError("Cannot convert infinite range to array")
+        return numpy.array(list(self.iter_values()))
+
+    @property
+    def is_finite(self):
+        """Whether the range has a finite number of values"""
+        return True
+
     @abstractmethod
     def __len__(self):
         raise NotImplementedError()
@@ -245,6 +317,9 @@ class IndexOverList(IndexRangeBase):
         for val in self.values:
             yield {self.index_symbol: val}
 
+    def iter_values(self):
+        return iter(self.values)
+
     def __len__(self):
         return len(self.values)
 
@@ -268,6 +343,13 @@ class IndexOverRange(IndexRangeBase):
         for ind in self.range:
             yield {self.index_symbol: ind}
 
+    def iter_values(self):
+        return iter(self.range)
+
+    def to_array(self):
+        rng = self.range
+        return numpy.arange(rng.start, rng.stop, rng.step)
+
     @property
     def range(self):
         return range(
@@ -303,6 +385,21 @@ class IndexOverFockSpace(IndexRangeBase):
             for ind in range(self.hs.dimension):
                 yield {self.index_symbol: ind}
 
+    def iter_values(self):
+        if self.hs._dimension is None:
+            return count()
+        else:
+            return iter(range(self.hs.dimension))
+
+    def to_array(self):
+        if self.hs._dimension is None:
+            raise ValueError("Cannot convert infinite range to array")
+        return numpy.arange(self.hs.dimension)
+
+    @property
+    def is_finite(self):
+        return self.hs._dimension is not None
+
     def __len__(self):
         return self.hs._dimension
 
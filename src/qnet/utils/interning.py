@@ -0,0 +1,122 @@
+r"""
+Interning of SymPy scalars.
+
+Equal SymPy coefficients are created over and over by different code paths,
+e.g. ``sympyOne/2`` in :func:`.lindblad`, or ``sqrt(kappa)`` in the
+:class:`.SLH` model of every component of a network. Each copy occupies
+memory, and its hash (used in the instance cache keys of every expression
+that contains it) must be computed separately.
+
+Therefore, the SymPy values wrapped by :class:`.ScalarValue` (and thus the
+coefficients of :class:`.ScalarTimesOperator` etc.) and the SymPy elements
+of a :class:`.Matrix` are passed through :func:`intern_sympy`, which
+returns a single shared object for all equal values::
+
+    >>> x = sympy.symbols('x')
+    >>> a = intern_sympy(sympy.sqrt(x) / 2)
+    >>> b = intern_sympy(sympy.sqrt(x) / 2)
+    >>> a is b
+    True
+
+The table of interned objects (see :func:`get_intern_table`) is bounded; if
+it is full, the least recently used objects are discarded from it.
+"""
+from collections import OrderedDict, namedtuple
+
+import sympy
+
+__all__ = ['InternTable', 'InternTableInfo', 'get_intern_table']
+
+__private__ = ['intern_sympy']
+
+
+#: Statistics for an :class:`InternTable`
+InternTableInfo = namedtuple(
+    'InternTableInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class InternTable:
+    """Bounded least-recently-used table of canonical objects
+
+    Args:
+        maxsize (int or None): The maximum number of objects in the table. If
+            the table is full, the least recently used object is discarded.
+            If None, the table may grow without bound. A `maxsize` of 0
+            disables interning.
+
+    Calling the table as ``table(obj)`` returns an object equal to `obj` that
+    is shared by all calls with an equal `obj`, as long as it remains in the
+    table.
+    """
+
+    def __init__(self, maxsize=10000):
+        self._maxsize = maxsize
+        self._table = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __call__(self, obj):
+        # There is no lock: the individual operations on the OrderedDict are
+        # atomic, and in a race, the worst case is an object that is not
+        # shared
+        table = self._table
+        try:
+            res = table[obj]
+        except KeyError:
+            if self._maxsize == 0:
+                return obj
+            self._misses += 1
+            table[obj] = obj
+            if self._maxsize is not None and len(table) > self._maxsize:
+                table.popitem(last=False)
+            return obj
+        self._hits += 1
+        table.move_to_end(obj)
+        return res
+
+    @property
+    def maxsize(self):
+        """The maximum number of objects in the table (None for unbounded)
+
+        Setting the `maxsize` to a smaller value discards the least recently
+        used objects, if necessary.
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        self._maxsize = maxsize
+        if maxsize is not None:
+            while len(self._table) > maxsize:
+                self._table.popitem(last=False)
+
+    def __len__(self):
+        return len(self._table)
+
+    def info(self):
+        """Return a :class:`InternTableInfo` with the number of hits, misses,
+        the maximum size, and the current size of the table"""
+        return InternTableInfo(
+            self._hits, self._misses, self._maxsize, len(self._table))
+
+    def clear(self):
+        """Discard all objects and reset the statistics"""
+        self._table.clear()
+        self._hits = 0
+        self._misses = 0
+
+
+_INTERN_TABLE = InternTable()
+
+
+def get_intern_table():
+    """Return the process-wide :class:`InternTable` used for SymPy scalars"""
+    return _INTERN_TABLE
+
+
+def intern_sympy(val):
+    """Return the interned version of `val`, if `val` is a SymPy object, or
+    `val` unchanged otherwise"""
+    if isinstance(val, sympy.Basic):
+        return _INTERN_TABLE(val)
+    return val
@@ -0,0 +1,40 @@
+"""Bounded dictionaries for process-wide caches"""
+from collections import OrderedDict
+
+__all__ = []
+
+__private__ = ['LRUDict']
+
+
+class LRUDict(OrderedDict):
+    """Dictionary that holds at most `maxsize` items
+
+    If an item is added to a full dictionary, the least recently used item is
+    discarded. Looking up an item with ``d[key]`` counts as a use. A
+    `maxsize` of None means the dictionary may grow without bound.
+
+    >>> d = LRUDict(maxsize=2)
+    >>> d['a'] = 1
+    >>> d['b'] = 2
+    >>> d['a']
+    1
+    >>> d['c'] = 3
+    >>> list(d.keys())
+    ['a', 'c']
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        super().__init__()
+
+    def __getitem__(self, key):
+        val = super().__getitem__(key)
+        self.move_to_end(key)
+        return val
+
+    def __setitem__(self, key, val):
+        super().__setitem__(key, val)
+        self.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self) > self.maxsize:
+                self.popitem(last=False)
@@ -1,8 +1,11 @@
+from itertools import accumulate
+
 __all__ = []
 
 __private__ = [  # anything not in __all__ must be in __private__
     'BadPermutationError', 'block_perm_and_perms_within_blocks',
-    'check_permutation', 'compose_permutations', 'concatenate_permutations',
+    'block_structure_from_pairs', 'check_permutation',
+    'compose_permutations', 'concatenate_permutations',
     'full_block_perm', 'invert_permutation',
     'permutation_from_block_permutations', 'permutation_from_disjoint_cycles',
     'permutation_to_block_permutations', 'permutation_to_disjoint_cycles',
@@ -163,6 +166,45 @@ def permutation_to_block_permutations(permutation):
     return res_permutations
 
 
+def block_structure_from_pairs(n, pairs):
+    """Find the finest block structure of the range of indices ``0, ..., n-1``
+    in which both indices of every pair in `pairs` are in the same block.
+
+    E.g., for the pairs of row and column indices of the non-zero elements of
+    a matrix, this is the block (-diagonal) structure of the matrix, and for
+    the pairs ``(i, permutation[i])`` it is the block structure of a
+    permutation::
+
+        >>> block_structure_from_pairs(6, [(0, 1), (1, 2), (5, 4)])
+        (3, 1, 2)
+
+    The runtime is linear in `n` and the number of pairs.
+
+    :param n: The total number of indices
+    :type n: int
+    :param pairs: Iterable of tuples of indices
+    :return: Tuple of block sizes that sum up to `n`
+    :rtype: tuple
+    """
+    # reach[i] is the largest index that must be in the same block as i
+    reach = list(range(n))
+    for (i, j) in pairs:
+        if i > j:
+            i, j = j, i
+        if j > reach[i]:
+            reach[i] = j
+    blocks = []
+    block_start = 0
+    block_end = 0
+    for k in range(n):
+        if reach[k] > block_end:
+            block_end = reach[k]
+        if block_end == k:
+            blocks.append(k + 1 - block_start)
+            block_start = k + 1
+    return tuple(blocks)
+
+
 def permutation_from_block_permutations(permutations):
     """Reverse operation to :py:func:`permutation_to_block_permutations`
     Compute the concatenation of permutations
@@ -282,7 +324,7 @@ def block_perm_and_perms_within_blocks(permutation, block_structure):
     """
     nblocks = len(block_structure)
 
-    offsets = [sum(block_structure[:k]) for k in range(nblocks)]
+    offsets = [0] + list(accumulate(block_structure))[:-1]
     images = [permutation[offset: offset + length] for (offset, length) in zip(offsets, block_structure)]
 
     images_mins = list(map(min, images))
@@ -0,0 +1,286 @@
+r"""
+Process-wide memoization of the simplification of scalar coefficients.
+
+Methods like :meth:`.QuantumExpression.simplify_scalar`,
+:meth:`.Matrix.simplify_scalar`, or :meth:`.SLH.simplify_scalar` apply a
+function (:func:`sympy.simplify`, by default) to every symbolic coefficient
+in an expression. The same coefficients tend to recur many times, both
+within a single expression and across repeated calls, e.g. when reducing a
+circuit. All of these methods therefore route through
+:func:`simplify_cached`, which stores the results in a single bounded
+:class:`SimplifyCache` (see :func:`get_simplify_cache`), keyed by
+``(func, expr)``::
+
+    >>> cache = get_simplify_cache()
+    >>> cache.clear()
+    >>> x = sympy.symbols('x')
+    >>> simplify_cached(sympy.sin(x)**2 + sympy.cos(x)**2)
+    1
+    >>> simplify_cached(sympy.sin(x)**2 + sympy.cos(x)**2)
+    1
+    >>> cache.info()
+    SimplifyCacheInfo(hits=1, misses=1, maxsize=10000, currsize=1)
+
+The cache may be saved to and loaded from disk, so that the work of
+simplifying is not lost between runs, see :meth:`SimplifyCache.persist`.
+"""
+import atexit
+import os
+import pickle
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+import sympy
+
+from .simplify_profiles import get_simplify_func
+
+__all__ = [
+    'SimplifyCache', 'SimplifyCacheInfo', 'get_simplify_cache',
+    'simplify_cached']
+
+__private__ = ['parallel_map']
+
+
+#: Statistics for a :class:`SimplifyCache`
+SimplifyCacheInfo = namedtuple(
+    'SimplifyCacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class SimplifyCache:
+    """Bounded least-recently-used cache for simplified scalars
+
+    Args:
+        maxsize (int or None): The maximum number of cached results. If the
+            cache is full, the least recently used entry is discarded. If
+            None, the cache may grow without bound. A `maxsize` of 0 disables
+            caching.
+
+    Calling the cache object as ``cache(func, expr)`` returns ``func(expr)``,
+    evaluating it only if the result is not yet in the cache. Entries are
+    keyed by the function object and the (structural) value of `expr`, so
+    `func` must be a pure function.
+    """
+
+    _file_format = 1
+
+    def __init__(self, maxsize=10000):
+        self._maxsize = maxsize
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.RLock()
+
+    def __call__(self, func, expr):
+        key = (func, expr)
+        try:
+            with self._lock:
+                res = self._cache[key]
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return res
+        except KeyError:
+            pass
+        except TypeError:  # unhashable func or expr
+            return func(expr)
+        res = func(expr)
+        with self._lock:
+            self._misses += 1
+            self._store(key, res)
+        return res
+
+    def _store(self, key, res):
+        if self._maxsize == 0:
+            return
+        self._cache[key] = res
+        self._cache.move_to_end(key)
+        if self._maxsize is not None:
+            while len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+
+    @property
+    def maxsize(self):
+        """The maximum number of cached results (None for unbounded)
+
+        Setting the `maxsize` to a smaller value discards the least recently
+        used entries, if necessary.
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        with self._lock:
+            self._maxsize = maxsize
+            if maxsize is not None:
+                while len(self._cache) > maxsize:
+                    self._cache.popitem(last=False)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def info(self):
+        """Return a :class:`SimplifyCacheInfo` with the number of hits,
+        misses, the maximum size, and the current size of the cache"""
+        with self._lock:
+            return SimplifyCacheInfo(
+                self._hits, self._misses, self._maxsize, len(self._cache))
+
+    def clear(self):
+        """Discard all cached results and reset the statistics"""
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def save(self, filename):
+        """Write the cache to `filename`
+
+        Entries for functions that cannot be pickled (lambdas, local
+        functions) are skipped. The file is written atomically, via a
+        temporary file.
+        """
+        with self._lock:
+            items = list(self._cache.items())
+        picklable = {}
+        entries = []
+        for ((func, expr), res) in items:
+            if func not in picklable:
+                try:
+                    pickle.dumps(func)
+                    picklable[func] = True
+                except Exception:
+                    picklable[func] = False
+            if picklable[func]:
+                entries.append((func, expr, res))
+        tmpfile = "%s.%d.tmp" % (filename, os.getpid())
+        with open(tmpfile, 'wb') as out_fh:
+            pickle.dump((self._file_format, entries), out_fh)
+        os.replace(tmpfile, filename)
+
+    def load(self, filename):
+        """Add the entries stored in `filename` by :meth:`save` to the cache
+
+        Entries already in the cache take precedence. Note that loading a
+        pickle file can execute arbitrary code, so `filename` must be
+        trusted.
+
+        Raises:
+            ValueError: if `filename` was not written by :meth:`save`
+        """
+        with open(filename, 'rb') as in_fh:
+            data = pickle.load(in_fh)
+        try:
+            file_format, entries = data
+        except (TypeError, ValueError):
+            file_format = None
+        if file_format != self._file_format:
+            raise ValueError("%s is not a simplification cache" % filename)
+        with self._lock:
+            for (func, expr, res) in entries:
+                if (func, expr) not in self._cache:
+                    self._store((func, expr), res)
+
+    def populate(self, func, expr, workers=None):
+        """Simplify the distinct SymPy coefficients in `expr` in parallel
+
+        All non-atomic SymPy objects that appear anywhere in `expr` (which may
+        also be a :class:`.Matrix`, an :class:`.SLH` object, or a list of
+        expressions) and that are not yet in the cache are passed to `func` in
+        a pool of `workers` processes. The results are stored in the cache,
+        so that a subsequent serial simplification of `expr` only has to
+        rebuild the expression. If `func` cannot be pickled, or if `workers`
+        is less than 2, the coefficients are simplified serially.
+
+        Note that the cache must be large enough to hold all the distinct
+        coefficients of `expr` for this to be effective.
+        """
+        todo = []
+        seen = set()
+        for coeff in _iter_sympy_coeffs(expr, set()):
+            key = (func, coeff)
+            if coeff not in seen and key not in self._cache:
+                seen.add(coeff)
+                todo.append(coeff)
+        results = parallel_map(func, todo, workers)
+        with self._lock:
+            self._misses += len(todo)
+            for (coeff, res) in zip(todo, results):
+                self._store((func, coeff), res)
+
+    def persist(self, filename):
+        """Load the cache from `filename` (if the file exists), and save it
+        back to `filename` when the Python process exits"""
+        if os.path.isfile(filename):
+            self.load(filename)
+        atexit.register(self.save, filename)
+
+
+_SIMPLIFY_CACHE = SimplifyCache()
+
+
+def get_simplify_cache():
+    """Return the process-wide :class:`SimplifyCache` used by
+    :func:`simplify_cached`"""
+    return _SIMPLIFY_CACHE
+
+
+def simplify_cached(expr, func=None):
+    """Return ``func(expr)``, using the process-wide cache
+
+    If `func` is None or a profile name, it is resolved with
+    :func:`.get_simplify_func`.
+    """
+    return _SIMPLIFY_CACHE(get_simplify_func(func), expr)
+
+
+def parallel_map(func, values, workers=None):
+    """Return the list ``[func(v) for v in values]``
+
+    If `workers` is at least 2, the values are processed in a pool of
+    `workers` processes, unless `func` cannot be pickled (e.g. a lambda), or
+    there are less than two values. The values are also processed serially
+    inside any context that changes the algebraic rules (e.g.
+    :func:`.truncated_algebra` or :func:`.polynomial_coefficients`), as the
+    worker processes would not see the changed rules.
+    """
+    from qnet.algebra.core.abstract_algebra import Expression
+    # importing locally avoids circular import
+    values = list(values)
+    if workers is None or workers < 2 or len(values) < 2:
+        return [func(val) for val in values]
+    if len(Expression._rule_contexts) > 0:
+        return [func(val) for val in values]
+    try:
+        pickle.dumps(func)
+    except Exception:
+        return [func(val) for val in values]
+    chunksize = max(1, len(values) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, values, chunksize=chunksize))
+
+
+def _iter_sympy_coeffs(expr, visited):
+    """Iterate over all non-atomic SymPy objects in `expr`, recursing into
+    the `args` and `kwargs` of QNET expressions, and into sequences and
+    arrays"""
+    if isinstance(expr, sympy.Basic):
+        if not expr.is_Atom:
+            yield expr
+        return
+    if isinstance(expr, (str, int, float, complex)):
+        return
+    if id(expr) in visited:
+        return
+    visited.add(id(expr))
+    if isinstance(expr, numpy.ndarray):
+        children = expr.flat
+    elif isinstance(expr, (list, tuple)):
+        children = expr
+    else:
+        try:
+            children = list(expr.args) + list(expr.kwargs.values())
+        except (AttributeError, NotImplementedError):
+            return
+    for child in children:
+        yield from _iter_sympy_coeffs(child, visited)
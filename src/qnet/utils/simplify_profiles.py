@@ -0,0 +1,168 @@
+r"""
+Strategies for the simplification of scalar coefficients.
+
+By default, :meth:`.QuantumExpression.simplify_scalar` (and thus all the
+circuit reductions that use it, e.g. :func:`.connect`,
+:func:`.move_drive_to_H`, or :func:`.eval_adiabatic_limit`) applies
+:func:`sympy.simplify` to every coefficient. This is thorough, but can be
+extremely slow for large coefficients. The :class:`TieredSimplify` strategy
+instead tries a sequence of cheap transformations first, and escalates to a
+final, expensive simplification only if the coefficient is small enough and
+the time budget has not been exhausted, keeping the best result found::
+
+    >>> x = sympy.symbols('x')
+    >>> fast = TieredSimplify(final=None)
+    >>> fast((x**2 - 1) / (x - 1))
+    x + 1
+
+The strategy used when no explicit `func` is passed to `simplify_scalar` is
+selected by name from one of the following profiles:
+
+* ``'thorough'``: apply :func:`sympy.simplify` to every coefficient (the
+  default)
+* ``'fast'``: use :class:`TieredSimplify`, escalating to
+  :func:`sympy.simplify` only for small coefficients
+
+See :func:`set_simplify_profile` and :func:`simplify_profile`.
+"""
+import time
+from contextlib import contextmanager
+
+import attr
+import sympy
+
+from ._attrs import immutable_attribs
+
+__all__ = [
+    'TieredSimplify', 'get_simplify_func', 'set_simplify_profile',
+    'simplify_profile']
+
+__private__ = []
+
+
+@immutable_attribs
+class TieredSimplify():
+    """Staged simplification of SymPy expressions under a budget
+
+    The `stages` are applied in order, each to the result of the previous
+    stage. The best (according to :func:`sympy.count_ops`) of all the
+    intermediary results is kept. Then, the `final` simplification is applied
+    to the best result so far, but only if its operation count does not
+    exceed `max_ops`.
+
+    No further stage (including `final`) is started after `time_budget`
+    seconds have elapsed for the current expression. A stage that is already
+    running is not interrupted.
+
+    Instances compare equal if they have the same parameters, and can be
+    pickled (if all the stage functions can be pickled), so that they can be
+    used with the cache in :mod:`qnet.utils.simplify_cache` and for
+    simplification in a process pool.
+
+    Attributes:
+        stages (tuple): Cheap transformations of a SymPy expression
+        final (callable or None): An expensive simplification
+        max_ops (int or None): The maximum number of operations in an
+            expression for which the `final` simplification is attempted
+            (None for no limit)
+        time_budget (float or None): The time budget per expression, in
+            seconds (None for no limit)
+    """
+    stages = attr.ib(
+        default=(sympy.expand, sympy.cancel, sympy.powsimp,
+                 sympy.factor_terms),
+        converter=tuple)
+    final = attr.ib(default=sympy.simplify)
+    max_ops = attr.ib(default=None)
+    time_budget = attr.ib(default=None)
+
+    def __call__(self, expr):
+        if not isinstance(expr, sympy.Basic) or expr.is_Atom:
+            return expr
+        t_start = time.perf_counter()
+        best = expr
+        best_ops = sympy.count_ops(expr)
+        current = expr
+        for stage in self.stages:
+            if self._budget_exhausted(t_start):
+                return best
+            try:
+                current = stage(current)
+            except sympy.PolynomialError:
+                continue
+            ops = sympy.count_ops(current)
+            if ops < best_ops:
+                best, best_ops = current, ops
+        if self.final is None or self._budget_exhausted(t_start):
+            return best
+        if self.max_ops is not None and best_ops > self.max_ops:
+            return best
+        res = self.final(best)
+        if sympy.count_ops(res) < best_ops:
+            best = res
+        return best
+
+    def _budget_exhausted(self, t_start):
+        if self.time_budget is None:
+            return False
+        return time.perf_counter() - t_start > self.time_budget
+
+
+_SIMPLIFY_PROFILES = {
+    'thorough': sympy.simplify,
+    'fast': TieredSimplify(max_ops=12, time_budget=0.05),
+}
+
+_SIMPLIFY_DEFAULT = {'profile': 'thorough'}
+
+
+def get_simplify_func(func=None):
+    """Resolve the `func` argument of the `simplify_scalar` methods
+
+    Args:
+        func (callable, str, or None): A function that simplifies a SymPy
+            expression, the name of a profile (``'fast'``, ``'thorough'``),
+            or None for the current default profile
+
+    Raises:
+        ValueError: if `func` is an unknown profile name
+    """
+    if func is None:
+        func = _SIMPLIFY_DEFAULT['profile']
+    if isinstance(func, str):
+        try:
+            return _SIMPLIFY_PROFILES[func]
+        except KeyError:
+            raise ValueError(
+                "Unknown simplification profile %r, must be one of %s"
+                % (func, ", ".join(sorted(_SIMPLIFY_PROFILES))))
+    return func
+
+
+def set_simplify_profile(profile):
+    """Set the default simplification profile (``'fast'`` or ``'thorough'``,
+    or a function)
+
+    Returns:
+        the previous default profile
+
+    Raises:
+        ValueError: if `profile` is an unknown profile name
+    """
+    if not (isinstance(profile, str) or callable(profile)):
+        raise TypeError("profile must be a profile name or a function")
+    get_simplify_func(profile)  # check profile name
+    prev_profile = _SIMPLIFY_DEFAULT['profile']
+    _SIMPLIFY_DEFAULT['profile'] = profile
+    return prev_profile
+
+
+@contextmanager
+def simplify_profile(profile):
+    """Context manager that temporarily sets the default simplification
+    profile, cf. :func:`set_simplify_profile`"""
+    prev_profile = set_simplify_profile(profile)
+    try:
+        yield
+    finally:
+        set_simplify_profile(prev_profile)
@@ -3,8 +3,12 @@ from qnet import (
     IdentitySuperOperator, ZeroKet, TrivialKet, FullSpace, TrivialSpace,
     CIdentity, CircuitZero, IdxSym, BasisKet, OperatorSymbol, FockIndex,
     KetIndexedSum, OperatorIndexedSum, StrLabel, LocalSpace,
-    IndexOverList, IndexOverFockSpace, IndexOverRange, Sum)
-from sympy import IndexedBase
+    IndexOverList, IndexOverFockSpace, IndexOverRange, Sum, Destroy,
+    KetSymbol, KetBra)
+from qnet.algebra.core.abstract_quantum_algebra import (
+    _TruncatedSeries, _SERIES_CACHE)
+from qnet.algebra.toolbox.core import truncated_algebra
+from sympy import IndexedBase, symbols
 
 
 def test_neutral_elements():
@@ -91,3 +95,55 @@ def test_sum_instantiator():
     #assert sum == ful
 
     # TODO: sum over A_i
+
+
+def test_series_expand_product():
+    """Test that the series expansion of a product of many factors agrees with
+    the series expansion of the expanded product"""
+    t = symbols('t')
+    hs = LocalSpace(1)
+    a = Destroy(hs=hs)
+    A = OperatorSymbol('A', hs=hs)
+    expr = (1 + t * a) * (A + t**2 * a.dag()) * (t * A + a) * (A - t * a)
+    terms = expr.series_expand(t, 0, 3)
+    expected = expr.expand().series_expand(t, 0, 3)
+    assert len(terms) == 4
+    assert tuple(c.expand() for c in terms) == expected
+    # lower orders are served from the cache
+    assert _SERIES_CACHE[(expr, t, 0, ())] == terms
+    assert expr.series_expand(t, 0, 1) == terms[:2]
+
+    # factors beyond the truncation order do not contribute
+    expr = (t * A) * (t * a) * (1 + t)
+    assert expr.series_expand(t, 0, 1) == (ZeroOperator, ZeroOperator)
+    assert expr.series_expand(t, 0, 2) == (
+        ZeroOperator, ZeroOperator, A * a)
+
+    psi = KetSymbol('Psi', hs=hs)
+    expr = (1 + t * a) * (psi + t * psi)
+    assert expr.series_expand(t, 0, 2) == (psi, psi + a * psi, a * psi)
+    expr = KetBra(t * psi, psi + t * psi)
+    assert expr.series_expand(t, 0, 2) == (
+        ZeroOperator, KetBra(psi, psi), KetBra(psi, psi))
+
+    # expansions in a rule context are not re-used outside of it
+    b = Destroy(hs=LocalSpace('q', dimension=2))
+    expr = (1 + t * b) * (1 + t * b)
+    with truncated_algebra():
+        assert expr.series_expand(t, 0, 2)[2] == ZeroOperator
+    assert expr.series_expand(t, 0, 2)[2] == b * b
+
+
+def test_truncated_series():
+    """Test arithmetic of truncated series"""
+    hs = LocalSpace(1)
+    a = Destroy(hs=hs)
+    s1 = _TruncatedSeries((IdentityOperator, a, ZeroOperator), 2)
+    s2 = _TruncatedSeries((ZeroOperator, a.dag(), a, a.dag()), 2)
+    assert s2.coeffs == (ZeroOperator, a.dag(), a)
+    assert s1.nonzero == (0, 1)
+    assert (s1 + s2).coeffs == (IdentityOperator, a + a.dag(), a)
+    # vanishing coefficients of products are not type-stable
+    assert (s1 * s2).coeffs == (Zero, a.dag(), a + a * a.dag())
+    assert s1.adjoint().coeffs == (IdentityOperator, a.dag(), ZeroOperator)
+    assert (s2 * s2 * s1).coeffs == (Zero, Zero, a.dag() * a.dag())
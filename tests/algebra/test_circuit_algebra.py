@@ -7,7 +7,10 @@ from qnet.algebra.core.circuit_algebra import (
     SLH, CircuitSymbol, CPermutation, circuit_identity, map_signals,
     SeriesProduct, invert_permutation, Concatenation, P_sigma, cid,
     map_signals_circuit, FB, getABCD, CIdentity,
-    pad_with_identity, move_drive_to_H, try_adiabatic_elimination)
+    pad_with_identity, move_drive_to_H, try_adiabatic_elimination,
+    suggest_fock_truncation, truncate_fock_spaces,
+    get_common_block_structure)
+from qnet.algebra.core.exceptions import AlgebraError
 from qnet.algebra.toolbox.circuit_manipulation import connect
 from qnet.utils.permutations import (
     permute, full_block_perm, block_perm_and_perms_within_blocks)
@@ -355,6 +358,66 @@ def test_ABCD():
     assert D[0, 0] == 1
 
 
+def test_suggest_fock_truncation():
+    """Test the estimate of the Fock space truncation for a driven cavity and
+    a degenerate parametric oscillator"""
+    from scipy.stats import poisson
+    kappa, Delta, E = sympy.symbols('kappa Delta E', positive=True)
+    hs = LocalSpace('cav', order_index=1)
+    a = Destroy(hs=hs)
+    slh = SLH(
+        identity_matrix(1), [sympy.sqrt(kappa) * a],
+        Delta * a.dag() * a).coherent_input(E)
+    params = {kappa: 2, Delta: 1, E: 3}
+    alpha = -sympy.sqrt(2) * 3 / (1 + I)
+    tail = 1e-8
+    dims = suggest_fock_truncation(slh, params, tail=tail)
+    assert list(dims) == [hs]
+    mean = float(abs(alpha)**2)
+    assert dims[hs] == int(poisson.isf(tail/2, mean)) + 1
+    assert suggest_fock_truncation(slh, params, tail=1e-3)[hs] < dims[hs]
+    with pytest.raises(ValueError):
+        suggest_fock_truncation(slh, {kappa: 2})
+
+    slh_trunc = truncate_fock_spaces(slh, dims)
+    assert slh_trunc.space == LocalSpace(
+        'cav', dimension=dims[hs], order_index=1)
+    assert truncate_fock_spaces(slh, {'cav': 5}).space.dimension == 5
+    assert truncate_fock_spaces(slh, {'other': 5}) == slh
+
+    # squeezed vacuum below threshold (eps < kappa/2 = 1/2)
+    def dpo(eps):
+        H = I * eps / 2 * (a.dag() * a.dag() - a * a)
+        return SLH(identity_matrix(1), [a], H)
+
+    assert suggest_fock_truncation(dpo(0))[hs] == 2
+    dim1 = suggest_fock_truncation(dpo(0.1))[hs]
+    dim2 = suggest_fock_truncation(dpo(0.4))[hs]
+    assert 2 < dim1 < dim2
+    with pytest.raises(ValueError) as exc_info:
+        suggest_fock_truncation(dpo(0.6))
+    assert "not stable" in str(exc_info.value)
+
+    qubit = LocalSpace('q', basis=('g', 'e'))
+    slh = SLH(identity_matrix(1), [LocalSigma('g', 'e', hs=qubit)], 0)
+    with pytest.raises(ValueError):
+        suggest_fock_truncation(slh)
+
+
+def test_common_block_structure():
+    """Test the maximal common block structure of two block structures"""
+    assert get_common_block_structure((1, 1, 1), (2, 1)) == (2, 1)
+    assert get_common_block_structure((1, 1, 2, 1), (2, 1, 2)) == (2, 3)
+    assert get_common_block_structure((2, 2), (1, 3)) == (4, )
+    assert get_common_block_structure((), ()) == ()
+    assert get_common_block_structure((1, ) * 100, (2, ) * 50) == (2, ) * 50
+    A = CircuitSymbol('A', 2)
+    B = CircuitSymbol('B', 1)
+    assert get_common_block_structure(A + B, B + A) == (3, )
+    with pytest.raises(AlgebraError):
+        get_common_block_structure((1, 1), (1, ))
+
+
 def test_inverse():
     """Test that the series product of a circuit and its inverse gives the
     identity"""
@@ -0,0 +1,80 @@
+from qnet import (
+    Destroy, OperatorSymbol, ScalarValue, ZeroOperator,
+    polynomial_coefficients)
+from qnet.algebra.core.coefficient_ring import CoefficientField
+from qnet.algebra.core.operator_algebra import ScalarTimesOperator
+from qnet.algebra.core.scalar_algebra import Scalar
+from qnet.algebra.toolbox.core import temporary_instance_cache
+
+import sympy
+from sympy.polys.fields import FracElement
+
+
+def test_coefficient_field():
+    """Test conversion and reduction in a CoefficientField"""
+    kappa, Delta = sympy.symbols('kappa Delta', positive=True)
+    alpha = sympy.symbols('alpha')
+    F = CoefficientField()
+    assert F.from_expr(sympy.exp(kappa)) is None
+    assert F.from_expr(sympy.sqrt(kappa + 1)) is None
+    assert F.from_expr(0.5 * kappa) is None
+    assert F.from_expr(sympy.Rational(1, 2)) == sympy.Rational(1, 2)
+    p = F.from_expr(sympy.sqrt(kappa))
+    assert isinstance(p, FracElement)
+    assert set(F.gens) == {kappa, sympy.sqrt(kappa)}
+    assert F.binary_op(lambda a, b: a * b, p, p) == F.from_expr(kappa)
+    q = F.from_expr(sympy.I * sympy.conjugate(alpha) / (1 + sympy.I))
+    assert sympy.I not in F.to_expr(q).as_numer_denom()[1].atoms()
+    assert sympy.simplify(
+        F.to_expr(q) - sympy.I * sympy.conjugate(alpha) / (1 + sympy.I)) == 0
+    # elements of earlier versions of the field are still usable
+    assert F.binary_op(
+        lambda a, b: a - b, p, F.from_expr(Delta * sympy.sqrt(kappa))
+    ) == F.from_expr((1 - Delta) * sympy.sqrt(kappa))
+    assert F.binary_op(lambda a, b: a * b, sympy.I, sympy.I) == -1
+    assert F.binary_op(lambda a, b: a == b, p, sympy.sqrt(kappa))
+
+
+def test_polynomial_coefficients():
+    """Test the polynomial_coefficients context manager"""
+    kappa, Delta = sympy.symbols('kappa Delta', positive=True)
+    a = Destroy(hs=1)
+    A = OperatorSymbol('A', hs=1)
+    assert Scalar._coeff_field is None
+    with polynomial_coefficients():
+        field = Scalar._coeff_field
+        assert isinstance(field, CoefficientField)
+        expr = (kappa**2 - Delta**2) / (kappa - Delta) * a - kappa * a
+        assert expr == Delta * a
+        assert isinstance(expr.coeff.val, sympy.Basic)
+        assert all(isinstance(arg, sympy.Basic) for arg in expr.coeff.args)
+        expr = sympy.sqrt(kappa) * (sympy.sqrt(kappa) * A) - kappa * A
+        assert expr == ZeroOperator
+        expr = sympy.I * (sympy.I * A)
+        assert expr == -A
+        coeff = ScalarValue.create(sympy.exp(kappa))
+        assert isinstance(coeff.val, sympy.exp)
+        assert (coeff * kappa).val == kappa * sympy.exp(kappa)
+        assert (0.5 * (kappa * A)).coeff == 0.5 * kappa
+        with polynomial_coefficients(field=field):
+            assert Scalar._coeff_field is field
+        assert Scalar._coeff_field is field
+    assert Scalar._coeff_field is None
+    # instances created inside the context are not cached outside of it
+    expr = (kappa**2 - Delta**2) / (kappa - Delta) * a - kappa * a
+    assert expr != Delta * a
+
+
+def test_polynomial_coefficients_class_cache():
+    """Test that polynomial_coefficients does not use instances from the cache
+    of a class with its own (temporary) instance cache"""
+    kappa, Delta = sympy.symbols('kappa Delta', positive=True)
+    a = Destroy(hs=1)
+    with temporary_instance_cache(ScalarTimesOperator):
+        expr = (kappa + Delta) * a
+        assert not isinstance(expr.coeff._val, FracElement)
+        with polynomial_coefficients():
+            expr = (kappa + Delta) * a
+            assert isinstance(expr.coeff._val, FracElement)
+        expr = (kappa + Delta) * a
+        assert not isinstance(expr.coeff._val, FracElement)
@@ -3,10 +3,10 @@ from sympy import symbols, sqrt
 from qnet.algebra.core.hilbert_space_algebra import LocalSpace
 from qnet.algebra.core.operator_algebra import (
     OperatorSymbol, Commutator, ZeroOperator, Create, Destroy, LocalSigma,
-    LocalProjector, IdentityOperator, Jplus, Jz)
+    LocalProjector, IdentityOperator, Jplus, Jminus, Jz, OperatorPower)
 from qnet.algebra.toolbox.commutator_manipulation import \
     (
-    expand_commutators_leibniz, evaluate_commutators, )
+    expand_commutators_leibniz, evaluate_commutators, evaluate_commutator)
 
 
 def test_disjunct_hs():
@@ -169,3 +169,69 @@ def test_commutator_expand_evaluate():
     assert expand_commutators_leibniz(expr) == (
         A * Commutator(B, C) * D + C * A * Commutator(B, D) +
         C * Commutator(A, D) * B + Commutator(A, C) * B * D)
+
+    assert expand_commutators_leibniz(Commutator(A*A, B)) == (
+        A * Commutator(A, B) + Commutator(A, B) * A)
+    expr = Commutator(OperatorPower(A, 3), B)
+    assert expand_commutators_leibniz(expr) == (
+        A * A * Commutator(A, B) + A * Commutator(A, B) * A +
+        Commutator(A, B) * OperatorPower(A, 2))
+    expr = Commutator(B, OperatorPower(A, 2))
+    assert expand_commutators_leibniz(expr) == (
+        -A * Commutator(A, B) - Commutator(A, B) * A)
+
+
+def test_evaluate_commutator_tables():
+    """Test closed-form commutators against explicit evaluation"""
+    hs_osc = LocalSpace("q", dimension=4)
+    hs_spin = LocalSpace("s", dimension=3)
+    hs_atom = LocalSpace("a", basis=('g', 'e', 'r'))
+    a, a_dag = Destroy(hs=hs_osc), Create(hs=hs_osc)
+    Jp, Jm, Jz_ = Jplus(hs=hs_spin), Jminus(hs=hs_spin), Jz(hs=hs_spin)
+    ops = [
+        a, a_dag, LocalSigma(1, 2, hs=hs_osc), LocalProjector(0, hs=hs_osc),
+        Jp, Jm, Jz_, LocalSigma(0, 1, hs=hs_spin),
+        LocalSigma(2, 2, hs=hs_spin),
+        LocalSigma('g', 'e', hs=hs_atom), LocalSigma('e', 'r', hs=hs_atom),
+        LocalProjector('e', hs=hs_atom)]
+    cache = {}
+    for A in ops:
+        for B in ops:
+            expected = (A * B - B * A).expand()
+            assert evaluate_commutator(A, B, cache=cache) == expected
+    assert len(cache) > 0
+
+
+def test_evaluate_commutator_leibniz():
+    """Test evaluation of commutators of sums and products"""
+    hs1 = LocalSpace("1")
+    hs2 = LocalSpace("2")
+    a1, a1_dag = Destroy(hs=hs1), Create(hs=hs1)
+    a2, a2_dag = Destroy(hs=hs2), Create(hs=hs2)
+    omega, g = symbols('omega, g')
+    H = (omega * a1_dag * a1 + g * (a1_dag * a2 + a1 * a2_dag) +
+         a1_dag * a1_dag * a1 * a1)
+    for op in [a1, a1_dag, a2, a1_dag * a2]:
+        expected = (H * op - op * H).expand()
+        assert evaluate_commutator(H, op, cache={}) == expected
+        assert evaluate_commutator(op, H, cache={}) == -expected
+    assert evaluate_commutator(a1, a2) == ZeroOperator
+    assert evaluate_commutator(a1, 5) == ZeroOperator
+
+    A = OperatorSymbol('A', hs=hs1)
+    B = OperatorSymbol('B', hs=hs1)
+    assert evaluate_commutator(A * B, a2 * a1) == (
+        (A * Commutator.create(B, a1) + Commutator.create(A, a1) * B) *
+        a2).expand()
+
+
+def test_evaluate_commutator_rule_contexts():
+    """Test that commutators cached in a rule context are not re-used outside
+    of that context"""
+    from qnet.algebra.toolbox.core import truncated_algebra
+    hs = LocalSpace('q', dimension=2)
+    a = Destroy(hs=hs)
+    ad = a.dag()
+    with truncated_algebra():
+        assert evaluate_commutator(ad, ad * a * ad) == ZeroOperator
+    assert evaluate_commutator(ad, ad * a * ad) == -ad * ad
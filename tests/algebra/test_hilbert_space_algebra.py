@@ -1,11 +1,17 @@
+import gc
+import pickle
+
+import numpy as np
 import pytest
 
 from qnet.algebra.core.hilbert_space_algebra import (
-        LocalSpace, ProductSpace, TrivialSpace, FullSpace)
+        LocalSpace, ProductSpace, TrivialSpace, FullSpace,
+        _FREE_LOCAL_SPACE_IDS)
 from qnet.algebra.core.exceptions import BasisNotSetError
 from qnet.algebra.core.operator_algebra import Destroy
 from qnet.algebra.core.state_algebra import (
     KetSymbol, BasisKet, TrivialKet)
+from qnet.algebra.toolbox.core import temporary_instance_cache
 
 
 def test_instantiate_with_basis():
@@ -219,3 +225,124 @@ def test_hs_basis_states():
         _ = FullSpace.dimension
     with pytest.raises(BasisNotSetError):
         _ = FullSpace.basis_states
+
+
+def test_basis_indices():
+    """Test the conversion between labels, indices, and local indices of
+    basis states"""
+    hs0 = LocalSpace('0')
+    hs1 = LocalSpace('1', basis=['g', 'e', 'r'])
+    hs2 = LocalSpace('2', dimension=4)
+    hs3 = LocalSpace('3', dimension=2)
+
+    assert hs1.basis_index('r') == 2
+    with pytest.raises(ValueError):
+        hs1.basis_index('x')
+    with pytest.raises(BasisNotSetError):
+        hs0.basis_index('0')
+    assert hs1.local_indices(2) == (2, )
+    assert hs1.flat_index((2, )) == 2
+
+    hs = hs1 * hs2 * hs3
+    labels = hs.basis_labels
+    assert len(labels) == hs.dimension == 24
+    for (index, label) in enumerate(labels):
+        assert hs.basis_index(label) == index
+        local_indices = hs.local_indices(index)
+        assert hs.flat_index(local_indices) == index
+        assert label == ",".join([
+            ls.basis_labels[ind]
+            for (ls, ind) in zip(hs.local_factors, local_indices)])
+    assert hs.basis_state(13) == hs.basis_state(labels[13])
+    assert hs.basis_state(-1) == hs.basis_state(labels[-1])
+    with pytest.raises(IndexError):
+        hs.basis_state(24)
+    with pytest.raises(ValueError):
+        hs.basis_index('g,0')
+    with pytest.raises(ValueError):
+        hs.local_indices(24)
+
+    indices = np.arange(24)
+    local_indices = hs.local_indices(indices)
+    assert [list(arr) for arr in local_indices] == [
+        [hs.local_indices(index)[i] for index in range(24)]
+        for i in range(3)]
+    assert list(hs.flat_index(local_indices)) == list(indices)
+
+    # the basis labels are not required for conversions between indices
+    big = LocalSpace('b1', dimension=1000) * LocalSpace('b2', dimension=1000)
+    assert big.basis_index('999,998') == 999998
+    assert big.basis_state(999998) == big.basis_state('999,998')
+    assert big._basis is None
+
+
+def test_set_operations():
+    """Test the set operations on Hilbert spaces, which are implemented via
+    bitmasks of the local factors"""
+    hs1 = LocalSpace('1')
+    hs2 = LocalSpace('2', dimension=2)
+    hs3 = LocalSpace('3')
+    hs4 = LocalSpace('4')
+    hs123 = hs1 * hs2 * hs3
+
+    # equal local spaces share a bitmask
+    assert LocalSpace('2', dimension=2)._mask == hs2._mask
+    assert LocalSpace('2')._mask != hs2._mask
+    assert hs123._mask == hs1._mask | hs2._mask | hs3._mask
+    assert pickle.loads(pickle.dumps(hs123))._mask == hs123._mask
+
+    assert hs1.isdisjoint(hs2 * hs3)
+    assert not hs123.isdisjoint(hs3 * hs4)
+    assert TrivialSpace.isdisjoint(hs1)
+    assert not hs1.isdisjoint(FullSpace)
+    assert not FullSpace.isdisjoint(hs1)
+
+    assert hs123.intersect(hs3 * hs4) == hs3
+    assert hs123.intersect(hs2 * hs3 * hs4) == hs2 * hs3
+    assert hs123.intersect(hs4) is TrivialSpace
+    assert hs123.intersect(FullSpace) is hs123
+    assert hs2.intersect(hs123) is hs2
+    assert hs2.intersect(hs1 * hs3) is TrivialSpace
+    assert hs123.remove(hs2) == hs1 * hs3
+    assert hs123.remove(hs4) is hs123
+    assert hs123.remove(hs1 * hs2 * hs3 * hs4) is TrivialSpace
+    assert hs123.remove(FullSpace) is TrivialSpace
+    assert hs2.remove(hs123) is TrivialSpace
+    assert hs2.remove(hs3) is hs2
+
+    assert hs2.is_tensor_factor_of(hs123)
+    assert hs123.is_tensor_factor_of(hs123)
+    assert (hs1 * hs3).is_tensor_factor_of(hs123)
+    assert not (hs1 * hs4).is_tensor_factor_of(hs123)
+    assert hs123.is_tensor_factor_of(FullSpace)
+    assert hs2.is_strict_subfactor_of(hs123)
+    assert (hs1 * hs3).is_strict_subfactor_of(hs123)
+    assert not hs123.is_strict_subfactor_of(hs123)
+    assert not hs4.is_strict_subfactor_of(hs123)
+
+    assert hs123 * (hs1 * hs3) is hs123
+    assert (hs2 * hs1) * hs3 is hs123
+    assert (hs3 * hs1) * hs2 == hs123
+    assert hs123 * FullSpace is FullSpace
+    assert hs123 * TrivialSpace is hs123
+
+
+def test_local_space_mask_recycling():
+    """Test that the bitmasks of garbage-collected local spaces are re-used,
+    but not while an equal local space is alive"""
+    with temporary_instance_cache(LocalSpace):
+        hs = LocalSpace('recycle')
+        mask = hs._mask
+        i = mask.bit_length() - 1
+        hs_copy = pickle.loads(pickle.dumps(hs))
+        assert hs_copy._mask == mask
+        del hs
+        gc.collect()
+        assert i not in _FREE_LOCAL_SPACE_IDS
+        hs_other = LocalSpace('recycle2')
+        assert hs_other._mask != mask
+        del hs_copy
+        gc.collect()
+        assert i in _FREE_LOCAL_SPACE_IDS
+        i_next = min(_FREE_LOCAL_SPACE_IDS)
+        assert LocalSpace('recycle3')._mask == 1 << i_next
@@ -1,4 +1,7 @@
-from qnet.utils.indices import IdxSym
+from qnet.utils.indices import (
+    IdxSym, IndexOverFockSpace, IndexOverList, IndexOverRange,
+    yield_from_ranges, yield_index_tuples, yield_index_blocks, index_arrays)
+from qnet.algebra.core.hilbert_space_algebra import LocalSpace
 from qnet.algebra.core.abstract_algebra import substitute
 
 import sympy
@@ -51,3 +54,34 @@ def test_idx_sym():
     expr = sympy.sqrt(IdxSym('n') + 1)
     expr2 = substitute(expr, {IdxSym('n'): IdxSym('n', primed=1)})
     assert expr2 == sympy.sqrt(IdxSym('n', primed=1) + 1)
+
+
+def test_index_tuples():
+    """Test the iteration over combinations of index ranges"""
+    i, j, k = IdxSym('i'), IdxSym('j'), IdxSym('k')
+    ranges = [
+        IndexOverRange(i, 0, 4, step=2),
+        IndexOverList(j, ['a', 'b']),
+        IndexOverFockSpace(k, hs=LocalSpace('f', dimension=3))]
+    tuples = list(yield_index_tuples(ranges))
+    assert len(tuples) == 18
+    assert tuples[:4] == [(0, 'a', 0), (0, 'a', 1), (0, 'a', 2), (0, 'b', 0)]
+    assert tuples == [
+        (mapping[i], mapping[j], mapping[k])
+        for mapping in yield_from_ranges(ranges)]
+    blocks = list(yield_index_blocks(ranges, block_size=5))
+    assert [len(block) for block in blocks] == [5, 5, 5, 3]
+    assert sum(blocks, []) == tuples
+    with pytest.raises(ValueError):
+        next(yield_index_blocks(ranges, block_size=0))
+
+    arrays = index_arrays([ranges[0], ranges[2]])
+    assert [list(array) for array in arrays] == [
+        [0, 0, 0, 2, 2, 2, 4, 4, 4], [0, 1, 2, 0, 1, 2, 0, 1, 2]]
+
+    # infinite ranges can be iterated, but not converted to arrays
+    infinite = IndexOverFockSpace(k, hs=LocalSpace('g'))
+    tuples = yield_index_tuples([infinite, ranges[1]])
+    assert [next(tuples) for _ in range(3)] == [(0, 'a'), (0, 'b'), (1, 'a')]
+    with pytest.raises(ValueError):
+        index_arrays([infinite])
@@ -1,3 +1,4 @@
+from qnet.algebra.core.abstract_algebra import Expression
 from qnet.algebra.core.hilbert_space_algebra import LocalSpace
 from qnet.algebra.core.operator_algebra import OperatorSymbol, OperatorPlus
 from qnet.algebra.toolbox.core import no_instance_caching, temporary_instance_cache
@@ -11,6 +12,7 @@ def test_context_instance_caching():
     c = OperatorSymbol("c", hs=h1)
     expr1 = a + b
     assert expr1 in OperatorPlus._instances.values()
+    assert OperatorPlus._instances is Expression._instances
     with no_instance_caching():
         assert expr1 in OperatorPlus._instances.values()
         expr2 = a + c
@@ -22,3 +24,5 @@ def test_context_instance_caching():
     assert expr1 in OperatorPlus._instances.values()
     assert expr2 not in OperatorPlus._instances.values()
 
+    # on exit, the class shares the cache of Expression again
+    assert '_instances' not in OperatorPlus.__dict__
@@ -0,0 +1,49 @@
+from qnet import Destroy, Matrix, ScalarValue
+from qnet.utils.interning import InternTable, get_intern_table, intern_sympy
+
+import numpy as np
+import sympy
+
+
+def test_intern_table_lru():
+    """Test that the table is bounded and discards the least recently used
+    objects first"""
+    x, y, z = sympy.symbols('x y z')
+    table = InternTable(maxsize=2)
+    a = table(x + 1)
+    assert table(x + 1) is a
+    table(y + 1)
+    assert table(x + 1) is a
+    assert table.info() == (2, 2, 2, 2)
+    table(z + 1)  # discards y + 1
+    assert len(table) == 2
+    assert table(x + 1) is a
+    table.maxsize = 1
+    assert len(table) == 1
+    table.clear()
+    assert table.info() == (0, 0, 1, 0)
+    table = InternTable(maxsize=0)
+    table(x + 1)
+    assert len(table) == 0
+
+
+def test_intern_coefficients():
+    """Test that equal SymPy coefficients in scalars and matrices share a
+    single object"""
+    kappa = sympy.symbols('kappa', positive=True)
+    a = Destroy(hs=0)
+    get_intern_table().clear()
+    c1 = sympy.sqrt(kappa) / 2
+    # an equal copy that bypasses SymPy's own cache
+    c2 = sympy.Mul._from_args(c1.args)
+    assert c1 == c2 and c1 is not c2
+    assert ScalarValue(c1).val is ScalarValue(c2).val
+    assert (c2 * a).coeff.val is c1
+    assert intern_sympy(c2) is c1
+    assert intern_sympy(2) == 2
+    m = np.array([[c2, 0], [0, a]], dtype=object)
+    M = Matrix(m)
+    assert M[0, 0] is c1
+    assert m[0, 0] is c2  # input is not modified
+    assert M == Matrix(m)
+    assert get_intern_table().info().misses == 1
@@ -1,4 +1,10 @@
-from qnet import Matrix, Zero, One, ZeroOperator, OperatorSymbol
+import numpy as np
+import pytest
+from qnet import (
+    Matrix, Zero, One, Operator, ZeroOperator, OperatorSymbol,
+    IdentityOperator, ScalarTimesOperator, identity_matrix,
+    permutation_matrix)
+from qnet.algebra.toolbox.core import temporary_instance_cache
 from sympy import symbols
 
 
@@ -40,3 +46,107 @@ def test_matrix_block_structure():
         [0, 0, 0, 1, 1, 1],
         [0, 0, 0, 1, 1, 1]])
     assert m.block_structure == (2, 1, 3)
+    blocks = m._get_blocks((3, 3))
+    assert [b.shape for b in blocks] == [(3, 3), (3, 3)]
+    assert blocks[1] == m[3:, 3:]
+    with pytest.raises(ValueError):
+        m._get_blocks((1, 5))
+
+    # off-diagonal elements connect blocks that are not adjacent
+    m = Matrix([
+        [1, 0, 0, 0],
+        [0, 1, 0, 0],
+        [0, 0, 1, 0],
+        [1, 0, 0, 1]])
+    assert m.block_structure == (4, )
+
+    # zero operators do not connect blocks
+    A = OperatorSymbol("A", hs=0)
+    m = Matrix([
+        [A, ZeroOperator, 0],
+        [ZeroOperator, 1, Zero],
+        [0, A, 1]])
+    assert m.block_structure == (1, 2)
+    assert (m * IdentityOperator).block_structure == (1, 2)
+    assert identity_matrix(100).block_structure == (1, ) * 100
+
+    v = Matrix([[A], [0], [1]])
+    assert v._get_blocks((1, 2)) == (v[:1, :], v[1:, :])
+
+
+def test_sparse_product():
+    """Test that the product of matrices, which is evaluated on the non-zero
+    elements only, is identical to the dense product"""
+    alpha, beta = symbols('alpha beta')
+    A = OperatorSymbol("A", hs=0)
+    B = OperatorSymbol("B", hs=0)
+    matrices = [
+        Matrix([[A, 0, 0], [0, 0, alpha], [0, 0, 0]]),
+        Matrix([[0, B, 0], [beta, 0, 0], [0, 0, 1]]),
+        Matrix([[1, 0, 0], [ZeroOperator, A, 0], [0, 0, ZeroOperator]]),
+        Matrix([[0, 0, 0], [0, 0, 0], [0, 0, 0]]),
+        Matrix([[alpha, 0, 0], [0, 0, 0], [0, 0, 2]]),
+        identity_matrix(3),
+        identity_matrix(3) * IdentityOperator,
+        permutation_matrix((2, 0, 1)),
+        Matrix([[A], [0], [B]])]
+    # the dense product instantiates e.g. 1 * A; don't let that leak into
+    # other tests that check `A * One is A`
+    with temporary_instance_cache(ScalarTimesOperator):
+        for m1 in matrices:
+            for m2 in matrices:
+                if m1.shape[1] != m2.shape[0]:
+                    continue
+                dense = m1.matrix.dot(m2.matrix)
+                sparse = (m1 * m2).matrix
+                assert (dense == sparse).all()
+                for (v_dense, v_sparse) in zip(dense.flat, sparse.flat):
+                    # an element is an operator in the dense product if any
+                    # operator was a factor, even with zero
+                    assert (
+                        isinstance(v_dense, Operator) ==
+                        isinstance(v_sparse, Operator))
+
+    m = matrices[0]
+    assert hash(m) == hash(Matrix(np.array(m.matrix)))
+    assert m._hash is not None
+    assert m == m
+
+
+def test_map_elements_distinct():
+    """Test that internal element-wise transformations are applied only once
+    to each distinct element, and not at all to zeros where possible, while
+    element_wise calls the user function for every element"""
+    alpha = symbols('alpha')
+    A = OperatorSymbol("A", hs=0)
+    m = Matrix([
+        [(A + alpha * A) * A, 0, ZeroOperator],
+        [0, (A + alpha * A) * A, 1],
+        [1.0, 1, ZeroOperator]])
+
+    calls = []
+
+    def func(val):
+        calls.append(val)
+        return val
+
+    assert m.element_wise(func) == m
+    assert len(calls) == 9
+    calls.clear()
+    assert m._map_elements(func) == m
+    # 1 and 1.0 are equal, but of different type
+    assert len(calls) == 5
+    assert isinstance(m._map_elements(func)[2, 0], float)
+    calls.clear()
+    assert m._map_elements(func, skip_zeros=True) == m
+    assert len(calls) == 3
+
+    expanded = m.expand()
+    assert expanded[0, 0] == expanded[1, 1] == ((A + alpha * A) * A).expand()
+    assert expanded[0, 2] is ZeroOperator
+    assert expanded[0, 1] == 0
+    assert m.expand(workers=2) == expanded
+    assert m.simplify_scalar() == m
+
+    assert identity_matrix(3).element_wise(func).matrix.dtype != object
+    assert m.substitute({alpha: 1})[1, 1] == (2 * A) * A
@@ -8,13 +8,15 @@ from sympy import symbols, sqrt, I, exp, sympify, Idx
 from qnet.algebra.core.operator_algebra import (
         Displace, Create, Destroy, OperatorSymbol, IdentityOperator,
         ZeroOperator, OperatorPlus, LocalSigma, LocalProjector, OperatorTrace,
-        Adjoint, X, Y, Z, ScalarTimesOperator, OperatorTimes, Jz,
-        Jplus, Jminus, Phase)
+        Adjoint, X, Y, Z, ScalarTimesOperator, OperatorTimes, OperatorPower,
+        Jz, Jplus, Jminus, Phase, get_coeffs)
 from qnet.algebra.core.matrix_algebra import Matrix, identity_matrix
+from qnet.algebra.toolbox.core import collect_operator_powers
 from qnet.algebra.core.hilbert_space_algebra import (
         LocalSpace, TrivialSpace, ProductSpace)
 from qnet.utils.indices import (
     FockIndex)
+from qnet.algebra.core.exceptions import ExpansionBudgetError
 from qnet.printing import ascii
 
 
@@ -733,3 +735,146 @@ def test_custom_identifier():
         assert ascii(expr) == '1 + b^(0)H * b^(0)'
         expr = expr.substitute({hs: LocalSpace(0)})
         assert ascii(expr) == '1 + a^(0)H * a^(0)'
+
+
+def test_gradient():
+    """Test differentiation by several parameters in a single pass"""
+    t, g, kappa, omega, x = symbols('t g kappa omega x', real=True)
+    a = Destroy(hs=1)
+    sig = LocalSigma(0, 1, hs=2)
+    H = (omega * a.dag() * a + g * (a.dag() * sig + sig.dag() * a) +
+         kappa * t * (a + a.dag()) * (g * a - omega**2 * a.dag()))
+    syms = (t, g, kappa, omega, x)
+    grad = H.gradient(syms)
+    assert len(grad) == len(syms)
+    for (deriv, sym) in zip(grad, syms):
+        assert deriv == H.diff(sym)
+    assert grad[-1] == ZeroOperator
+    assert Adjoint(t * OperatorSymbol('A', hs=1)).gradient([t, x]) == (
+        Adjoint(OperatorSymbol('A', hs=1)), ZeroOperator)
+    assert OperatorSymbol('A', hs=1).gradient([t]) == (ZeroOperator, )
+
+
+def test_operator_power():
+    """Test collection of repeated factors into an OperatorPower"""
+    t = symbols('t', real=True)
+    hs = LocalSpace(1)
+    a = Destroy(hs=hs)
+    A = OperatorSymbol('A', hs=hs)
+    B = OperatorSymbol('B', hs=hs)
+    C = OperatorSymbol('C', hs=2)
+    # powers are only collected on request
+    assert a * a * a == OperatorTimes(a, a, a)
+    assert (t * A)**3 == t**3 * OperatorTimes(A, A, A)
+    with collect_operator_powers():
+        assert a * a * a == OperatorPower(a, 3)
+        assert (a * a) * (a * a) == OperatorPower(a, 4)
+        assert A * A * B * B * B == OperatorTimes(
+            OperatorPower(A, 2), OperatorPower(B, 3))
+        assert A * C * A * C == OperatorTimes(
+            OperatorPower(A, 2), OperatorPower(C, 2))
+        # factors are still brought into normal order
+        assert (a * a * a.dag()).expand() == a.dag() * a * a + 2 * a
+        assert ((a + a.dag())**2).expand() == (
+            a**2 + a.dag()**2 + 2 * a.dag() * a + IdentityOperator)
+        assert ((a + a.dag())**3).expand() == (
+            (a + a.dag()) * (a + a.dag()) * (a + a.dag())).expand()
+        assert (t * A)**3 == t**3 * OperatorPower(A, 3)
+        assert ((t * A)**3).diff(t) == 3 * t**2 * OperatorPower(A, 3)
+        assert ((A + t * B)**2).series_expand(t, 0, 1) == (
+            OperatorPower(A, 2), A * B + B * A)
+        assert ascii(a.dag() * a.dag() * a) == 'a^(1)H**2 * a^(1)'
+        assert ascii((A + B)**2) == '(A^(1) + B^(1))**2'
+        assert OperatorTrace.create(A * A * C, over_space=hs) == (
+            OperatorTrace.create(OperatorPower(A, 2), over_space=hs) * C)
+    assert a * a * a == OperatorTimes(a, a, a)
+    assert OperatorPower.create(A, 1) == A
+    assert OperatorPower.create(A, 0) == IdentityOperator
+    assert OperatorPower.create(2 * A, 3) == 8 * OperatorPower(A, 3)
+    assert OperatorPower.create(OperatorPower(A, 2), 3) == OperatorPower(A, 6)
+    with pytest.raises(ValueError):
+        OperatorPower(A, 1)
+    with pytest.raises(TypeError):
+        OperatorPower(t, 2)
+    assert OperatorPower(a, 3).adjoint() == OperatorPower(a.dag(), 3)
+    assert OperatorPower(a, 3).as_product() == OperatorTimes(a, a, a)
+    assert OperatorPower(a, 2) * a.dag() == (
+        a * (a.dag() * a + IdentityOperator))
+    assert (OperatorPower(a, 2) * a.dag()).expand() == (
+        a.dag() * a * a + 2 * a)
+
+
+def test_iter_terms():
+    """Test lazy iteration over the terms of an expansion"""
+    g = symbols('g')
+    a = Destroy(hs=1)
+    A = OperatorSymbol('A', hs=1)
+    B = OperatorSymbol('B', hs=2)
+    exprs = [
+        (a + a.dag())**3, g * (A + 2 * B) * (A - B), (a + A) * (a.dag() + B),
+        a * a * a.dag(), 3 * a.dag() * a, IdentityOperator]
+    for expr in exprs:
+        terms = list(expr.iter_terms())
+        for (coeff, term) in terms:
+            assert not isinstance(term, (OperatorPlus, ScalarTimesOperator))
+        total = sum((coeff * term for (coeff, term) in terms), ZeroOperator)
+        assert (total - expr).expand() == ZeroOperator
+    assert list(ZeroOperator.iter_terms()) == []
+    assert list(((a + A) * (a - A)).expand_iter()) == list(
+        ((a + A) * (a - A)).iter_terms())
+    H = (a + a.dag()) * (a - a.dag())
+    coeffs = get_coeffs(H, expand=True)
+    assert coeffs == get_coeffs(H.expand())
+    assert coeffs == get_coeffs(H.iter_terms())
+    assert coeffs[a.dag() * a] == 0
+    assert get_coeffs(ZeroOperator, expand=True) == {ZeroOperator: 1}
+    assert get_coeffs(H - H, expand=True) == get_coeffs((H - H).expand())
+    assert get_coeffs(ZeroOperator.iter_terms()) == {}
+
+
+def test_expand_budget():
+    """Test estimating and limiting the number of terms produced by expand"""
+    a = Destroy(hs=1)
+    A = OperatorSymbol('A', hs=1)
+    B = OperatorSymbol('B', hs=2)
+    expr = (A + B) * (A - 2 * B) * (a + a.dag())
+    estimate = expr.estimate_expansion()
+    assert estimate.terms == 8
+    assert estimate.factors == 3
+    assert estimate.nbytes > 0
+    assert ((a + a.dag())**4).estimate_expansion().terms == 16
+    assert (2 * Adjoint(expr)).estimate_expansion() == estimate
+    assert A.estimate_expansion().terms == 1
+    with pytest.raises(ExpansionBudgetError) as exc_info:
+        expr.expand(budget=7)
+    assert "exceeds the budget of 7 terms" in str(exc_info.value)
+    assert expr.expand(budget=8) == expr.expand()
+
+
+def test_fingerprint():
+    """Test that fingerprints identify expressions that are equal after
+    expansion"""
+    g, kappa = symbols('g kappa')
+    a = Destroy(hs=1)
+    A = OperatorSymbol('A', hs=1)
+    B = OperatorSymbol('B', hs=2)
+    fp = (g * (kappa + 1) * a * (A + B)).fingerprint()
+    assert fp == (g * kappa * a * A + g * a * A + (g * kappa + g) * B * a
+                  ).fingerprint()
+    assert fp != (g * kappa * a * (A + B)).fingerprint()
+    assert (a * a.dag()).fingerprint() == (
+        a.dag() * a + IdentityOperator).fingerprint()
+    assert (0.5 * A).fingerprint() == ((0.5 + 1e-12) * A).fingerprint()
+    assert (0.5 * A).fingerprint() != ((0.5 + 1e-6) * A).fingerprint()
+    assert (0.5 * A).fingerprint() == (
+        (0.5 + 1e-6) * A).fingerprint(ndigits=4)
+    assert (0.5 * A).fingerprint() != (0.5 * B).fingerprint()
+    # coefficients are rounded relative to their magnitude
+    assert (1e-9 * A).fingerprint() != (2e-9 * B).fingerprint()
+    assert (1e-9 * A).fingerprint() != (2e-9 * A).fingerprint()
+    assert (1e-9 * A).fingerprint() == ((1e-9 + 1e-21) * A).fingerprint()
+    assert (A - A).fingerprint() == ZeroOperator.fingerprint()
+    # coefficients are expanded, but not simplified
+    assert ((kappa**2 - 1) / (kappa - 1) * A).fingerprint() != (
+        (kappa + 1) * A).fingerprint()
+    assert isinstance(fp, str)
@@ -1,8 +1,11 @@
 """Test indexed sums over operators"""
-from sympy import IndexedBase, symbols
+from sympy import IndexedBase, sqrt, symbols
 from qnet import (
-    IdxSym, IndexOverList, OperatorSymbol, OperatorIndexedSum, StrLabel,
-    KroneckerDelta)
+    IdxSym, IndexOverList, IndexOverRange, OperatorSymbol, OperatorIndexedSum,
+    StrLabel, KroneckerDelta, ExpansionBudgetError, ScalarTimesOperator)
+from qnet.algebra.toolbox.core import temporary_instance_cache
+from qnet.algebra.pattern_matching import wc
+from qnet.utils.indices import SymbolicLabelBase
 
 import pytest
 
@@ -30,3 +33,127 @@ def test_operator_kronecker_sum():
         term, IndexOverList(i, (1, 2)), IndexOverList(j, (1, 2)))
     assert sum == (
         alpha * OperatorIndexedSum.create(A(i, i), IndexOverList(i, (1, 2))))
+
+
+def test_doit_budget():
+    """Test estimating and limiting the number of terms produced by doit"""
+    i = IdxSym('i')
+    j = IdxSym('j')
+    A = OperatorSymbol('A', hs=0)
+
+    def B(i):
+        return OperatorSymbol(StrLabel(IndexedBase('B')[i]), hs=0)
+
+    sum = OperatorIndexedSum.create(
+        B(i) + j * A, IndexOverRange(i, 1, 10), IndexOverList(j, (1, 2, 3)))
+    assert sum.estimate_doit().terms == 60
+    assert sum.estimate_doit(indices=[j]).terms == 6
+    assert sum.estimate_doit(max_terms=5).terms == 10
+    assert sum.estimate_doit().nbytes > sum.estimate_doit(indices=[j]).nbytes
+    # evaluating the sum instantiates 1 * A; don't let that leak into other
+    # tests that check `A * One is A`
+    with temporary_instance_cache(ScalarTimesOperator):
+        with pytest.raises(ExpansionBudgetError) as exc_info:
+            sum.doit(budget=50)
+        assert 'budget of 50 terms' in str(exc_info.value)
+        assert sum.doit(budget=60) == sum.doit()
+        assert sum.doit(indices=[j], budget=6) == sum.doit(indices=[j])
+
+
+def test_doit_bulk_sum():
+    """Test that doit sums all terms at once, and re-uses the parts of the
+    term that do not depend on the index"""
+    from qnet.algebra.core.indexed_operations import _substitution_plan
+    i = IdxSym('i')
+    j = IdxSym('j')
+    alpha = IndexedBase('alpha')
+    A = OperatorSymbol('A', hs=0)
+    C = OperatorSymbol('C', hs=0)
+
+    def B(i):
+        return OperatorSymbol(StrLabel(IndexedBase('B')[i]), hs=0)
+
+    term = alpha[i] * B(i) * C + j * A * C
+    sum = OperatorIndexedSum.create(
+        term, IndexOverRange(i, 1, 20), IndexOverList(j, (1, 2)))
+    expected = None
+    for mapping in sum.ranges[0].iter():
+        for mapping2 in sum.ranges[1].iter():
+            mapping2.update(mapping)
+            summand = term.substitute(mapping2).simplify(rules=[(
+                wc('label', head=SymbolicLabelBase),
+                lambda label: label.evaluate(mapping2))])
+            expected = summand if expected is None else expected + summand
+    assert sum.doit() == expected
+    assert sum.doit(indices=[i, j]) == expected
+    B_1 = OperatorSymbol('B_1', hs=0)
+    assert sum.doit(max_terms=1) == alpha[1] * B_1 * C + A * C
+
+    substitute_i = _substitution_plan(term, {i})
+    res = substitute_i({i: 2})
+    assert res == term.substitute({i: 2})
+    const_summand = j * A * C
+    assert any(summand is const_summand for summand in term.operands)
+    assert any(summand is const_summand for summand in res.operands)
+    assert _substitution_plan(C, {i})({i: 2}) is C
+
+
+def test_doit_iter():
+    """Test lazy, chunked evaluation of indexed sums"""
+    from qnet import (
+        LocalSpace, BasisKet, KetIndexedSum, IndexOverFockSpace,
+        ScalarIndexedSum, FockIndex)
+    i = IdxSym('i')
+
+    def B(i):
+        return OperatorSymbol(StrLabel(IndexedBase('B')[i]), hs=0)
+
+    sum = OperatorIndexedSum.create(B(i), IndexOverRange(i, 1, 5))
+    terms = list(sum.doit_iter())
+    assert len(terms) == 5
+    assert terms[0] == OperatorSymbol('B_1', hs=0)
+    chunks = list(sum.doit_iter(chunk_size=2))
+    assert [len(chunk.operands) for chunk in chunks[:2]] == [2, 2]
+    assert chunks[2] == terms[4]
+    assert chunks[0] + chunks[1] + chunks[2] == sum.doit()
+    assert len(list(sum.doit_iter(chunk_size=2, max_terms=3))) == 2
+    with pytest.raises(ValueError):
+        next(sum.doit_iter(chunk_size=0))
+
+    # infinite sums may be evaluated lazily
+    hs = LocalSpace('f')
+    psi = KetIndexedSum(
+        BasisKet(FockIndex(i), hs=hs), IndexOverFockSpace(i, hs=hs))
+    chunks = psi.doit_iter(chunk_size=10)
+    assert len(next(chunks).operands) == 10
+    assert len(next(chunks).operands) == 10
+
+    sum = ScalarIndexedSum.create(i, IndexOverRange(i, 1, 10))
+    assert list(sum.doit_iter(chunk_size=4)) == [10, 26, 19]
+
+
+def test_substitute_indices():
+    """Test evaluating the terms of a multi-index sum for blocks of index
+    values"""
+    from qnet import (
+        LocalSpace, LocalSigma, LocalProjector, IndexOverFockSpace, FockIndex)
+    from qnet.utils.indices import yield_index_blocks
+    i, j, k = IdxSym('i'), IdxSym('j'), IdxSym('k')
+    hs1, hs2 = LocalSpace('s1', dimension=3), LocalSpace('s2', dimension=4)
+    sum = OperatorIndexedSum.create(
+        sqrt(j + 1) * LocalSigma(FockIndex(i), FockIndex(k), hs=hs1) *
+        LocalSigma(FockIndex(j), FockIndex(j + 1), hs=hs2),
+        IndexOverFockSpace(i, hs1), IndexOverRange(j, 0, 2),
+        IndexOverFockSpace(k, hs1))
+    terms = list(sum.terms)
+    assert len(terms) == 27
+    assert terms[0] == LocalProjector(0, hs=hs1) * LocalSigma(0, 1, hs=hs2)
+    assert terms[4] == (
+        sqrt(2) * LocalSigma(0, 1, hs=hs1) * LocalSigma(1, 2, hs=hs2))
+    blocks = yield_index_blocks(sum.ranges, block_size=10)
+    assert [
+        term for block in blocks
+        for term in sum.substitute_indices(block)] == terms
+    assert sum.substitute_indices([(2, 2, 0)]) == [
+        sqrt(3) * LocalSigma(2, 0, hs=hs1) * LocalSigma(2, 3, hs=hs2)]
+    assert sum.doit() == sum.doit(indices=['i', 'j', 'k'])
@@ -3,9 +3,11 @@ import pytest
 from qnet.algebra.core.hilbert_space_algebra import LocalSpace
 from qnet.algebra.core.operator_algebra import (
     OperatorSymbol, ScalarTimesOperator, OperatorPlus, Operator,
-    IdentityOperator, OperatorTimes)
+    IdentityOperator, OperatorTimes, Destroy, LocalSigma, Jplus,
+    Jminus, Jz, ZeroOperator)
+from qnet.algebra.core.state_algebra import KetSymbol, ZeroKet
 from qnet.algebra.toolbox.core import no_rules, extra_binary_rules
-from qnet.algebra.toolbox.core import extra_rules
+from qnet.algebra.toolbox.core import extra_rules, truncated_algebra
 from qnet.algebra.pattern_matching import wc, pattern_head, pattern
 from qnet.printing import srepr
 
@@ -95,3 +97,35 @@ def test_extra_binary_rules():
     with pytest.raises(AttributeError):
         with extra_rules(OperatorPlus, {'extra': rule}):
             expr = 2 * (a * b - b * a + IdentityOperator)
+
+
+def test_truncated_algebra():
+    """Test dropping of products that vanish in a truncated Hilbert space"""
+    hs = LocalSpace('c', dimension=3)
+    hs2 = LocalSpace('q', dimension=2)
+    a = Destroy(hs=hs)
+    b = Destroy(hs=hs2)
+    A = OperatorSymbol('A', hs=hs)
+    psi = KetSymbol('Psi', hs=hs)
+    a3 = OperatorTimes(a, a, a)
+    assert a * a * a == a3
+    with truncated_algebra():
+        assert a * a * a == ZeroOperator
+        assert a.dag() * a.dag() * a.dag() == ZeroOperator
+        assert a.dag() * a * a * a == ZeroOperator
+        assert a * a * b * a == ZeroOperator
+        assert b * b == ZeroOperator
+        assert a.dag() * a.dag() * a * a != ZeroOperator
+        assert a * LocalSigma(2, 0, hs=hs) * a != ZeroOperator
+        assert a * a * A * a != ZeroOperator
+        assert a3 * psi == ZeroKet
+        assert (a * a) * (a * psi) == ZeroKet
+        assert ((a + a.dag()) * a * a).expand() == a.dag() * a * a
+        spin = LocalSpace('s', basis=('-1', '0', '+1'))
+        assert Jplus(hs=spin) * Jz(hs=spin) * Jplus(hs=spin) != ZeroOperator
+        assert Jplus(hs=spin)**3 == ZeroOperator
+        assert (Jminus(hs=spin)**2 * Jplus(hs=spin)**2 * Jminus(hs=spin) !=
+                ZeroOperator)
+        assert (Jplus(hs=spin)**2 * Jminus(hs=spin) * Jplus(hs=spin)**2 ==
+                ZeroOperator)
+    assert a * a * a == a3
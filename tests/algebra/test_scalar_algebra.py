@@ -730,6 +730,44 @@ def test_real_complex():
         assert complex(alpha) == 0
 
 
+def test_numeric_arithmetic():
+    """Test that arithmetic with inexact numbers does not sympify"""
+    x = ScalarValue(0.5 + 1j)
+    half = ScalarValue(sympify(1) / 2)
+    v = half * x
+    assert v == 0.25 + 0.5j
+    assert isinstance(v.val, complex)
+    v = x + half
+    assert v == 1 + 1j
+    assert isinstance(v.val, complex)
+    v = x - half
+    assert v == 1j
+    assert isinstance(v.val, complex)
+    v = x / ScalarValue(I)
+    assert v == 1 - 0.5j
+    assert isinstance(v.val, complex)
+    v = ScalarValue(I) * 2.0
+    assert v == 2j
+    assert isinstance(v.val, complex)
+    v = 0.5 * ScalarValue(sympy_sqrt(2))
+    assert abs(v.val - 0.7071067811865476) < 1e-15
+    assert isinstance(v.val, float)
+    v = np.float64(2.0) / half
+    assert v == 4.0
+    assert isinstance(v.val, float)
+    v = ScalarValue(I) / 2
+    assert v.val == I / 2
+    alpha = symbols('alpha')
+    v = 0.5 * ScalarValue(alpha)
+    assert v.val == 0.5 * alpha
+    v = x * ScalarValue(alpha)
+    assert isinstance(v.val, SympyBasic)
+    A = OperatorSymbol("A", hs=0)
+    v = (I * 0.5) * A / 2.0
+    assert isinstance(v.coeff.val, complex)
+    assert v.coeff == 0.25j
+
+
 def test_scalar_conjugate(braket):
     """Test taking the complex conjugate (adjoint) of a scalar"""
     Psi = KetSymbol("Psi", hs=0)
@@ -0,0 +1,147 @@
+from qnet import OperatorSymbol, Matrix, SLH, Destroy
+from qnet import truncated_algebra
+from qnet.utils.simplify_cache import (
+    SimplifyCache, get_simplify_cache, simplify_cached, parallel_map)
+
+import atexit
+import os
+
+import sympy
+import pytest
+
+
+def count_calls(func):
+    """Wrap `func` such that the number of calls is recorded"""
+
+    def wrapped(expr):
+        wrapped.calls += 1
+        return func(expr)
+
+    wrapped.calls = 0
+    return wrapped
+
+
+def test_simplify_cache_lru():
+    """Test that the cache is bounded, and discards the least recently used
+    entries first"""
+    x, y, z = sympy.symbols('x y z')
+    func = count_calls(sympy.expand)
+    cache = SimplifyCache(maxsize=2)
+    assert cache(func, (x + 1)**2) == x**2 + 2*x + 1
+    assert cache(func, (y + 1)**2) == y**2 + 2*y + 1
+    assert cache(func, (x + 1)**2) == x**2 + 2*x + 1
+    assert func.calls == 2
+    assert cache.info() == (1, 2, 2, 2)
+    cache(func, (z + 1)**2)  # evicts (y+1)**2
+    assert len(cache) == 2
+    cache(func, (x + 1)**2)
+    assert func.calls == 3
+    cache(func, (y + 1)**2)
+    assert func.calls == 4
+    assert cache.info().hits == 2
+    cache.maxsize = 1
+    assert len(cache) == 1
+    cache.clear()
+    assert cache.info() == (0, 0, 1, 0)
+    # different functions do not share entries
+    cache.maxsize = None
+    cache(sympy.expand, (x + 1)**2)
+    cache(sympy.factor, (x + 1)**2)
+    assert cache.info().misses == 2
+    cache = SimplifyCache(maxsize=0)
+    cache(func, (x + 1)**2)
+    cache(func, (x + 1)**2)
+    assert func.calls == 6
+    assert len(cache) == 0
+
+
+def test_simplify_cache_persistence(tmpdir):
+    """Test saving and loading the cache"""
+    x = sympy.symbols('x')
+    filename = str(tmpdir.join('simplify.cache'))
+    cache = SimplifyCache()
+    cache(sympy.simplify, sympy.sin(x)**2 + sympy.cos(x)**2)
+    cache(lambda expr: expr, x)  # cannot be pickled
+    assert len(cache) == 2
+    cache.save(filename)
+    cache2 = SimplifyCache()
+    cache2.load(filename)
+    assert len(cache2) == 1
+    assert cache2(sympy.simplify, sympy.sin(x)**2 + sympy.cos(x)**2) == 1
+    assert cache2.info().hits == 1
+    cache3 = SimplifyCache()
+    cache3.persist(filename)
+    atexit.unregister(cache3.save)
+    assert len(cache3) == 1
+    tmpdir.join('other.pickle').write_binary(b'\x80\x03]q\x00.')
+    with pytest.raises(ValueError):
+        cache3.load(str(tmpdir.join('other.pickle')))
+
+
+def test_simplify_scalar_uses_cache():
+    """Test that the simplify_scalar methods go through the process-wide
+    cache"""
+    x, kappa = sympy.symbols('x kappa', positive=True)
+    coeff = sympy.sin(x)**2 + sympy.cos(x)**2
+    func = count_calls(sympy.simplify)
+    A = OperatorSymbol('A', hs=0)
+    B = OperatorSymbol('B', hs=0)
+    expr = coeff * A + 2 * coeff * B
+    get_simplify_cache().clear()
+    assert expr.simplify_scalar(func=func) == A + 2 * B
+    assert func.calls == 2
+    assert expr.simplify_scalar(func=func) == A + 2 * B
+    assert func.calls == 2
+    assert Matrix([[coeff, coeff * A]]).simplify_scalar(func=func) == Matrix(
+        [[1, A]])
+    assert func.calls == 2
+    a = Destroy(hs=0)
+    slh = SLH(Matrix([[1]]), Matrix([[sympy.sqrt(kappa**2) * a]]), coeff * a)
+    slh_simplified = slh.simplify_scalar(func=func)
+    assert slh_simplified.L[0, 0] == kappa * a
+    assert slh_simplified.H == a
+    assert func.calls == 3
+    assert simplify_cached(coeff, func=func) == 1
+    assert func.calls == 3
+    assert get_simplify_cache().info().misses == 3
+
+
+def test_simplify_scalar_workers():
+    """Test simplifying the coefficients of an expression in a process
+    pool"""
+    x = sympy.symbols('x')
+    a = Destroy(hs=0)
+    coeffs = [
+        (sympy.sin(n * x)**2 + sympy.cos(n * x)**2) * sympy.exp(n * x)
+        for n in range(1, 5)]
+    H = sum(((c * a.dag()**n) for (n, c) in enumerate(coeffs)), 0 * a)
+    L = Matrix([[coeffs[0] * a], [coeffs[1] * a.dag()]])
+    slh = SLH(Matrix([[1, 0], [0, 1]]), L, H)
+    cache = get_simplify_cache()
+    cache.clear()
+    slh_simplified = slh.simplify_scalar(workers=2)
+    misses = cache.info().misses
+    assert misses >= len(coeffs)
+    assert slh_simplified == slh.simplify_scalar()
+    assert cache.info().misses == misses
+    assert slh_simplified.L[0, 0] == sympy.exp(x) * a
+    assert H.simplify_scalar(workers=2) == slh_simplified.H
+    assert L.simplify_scalar(workers=2) == slh_simplified.L
+    assert cache.info().misses == misses
+    # functions that cannot be pickled are applied serially
+    expr = H.simplify_scalar(func=lambda c: sympy.simplify(c), workers=2)
+    assert expr == slh_simplified.H
+
+
+def _get_pid(_):
+    return os.getpid()
+
+
+def test_parallel_map_rule_contexts():
+    """Test that parallel_map falls back to serial processing in contexts that
+    change the algebraic rules, which worker processes would not see"""
+    pids = parallel_map(_get_pid, range(8), workers=2)
+    assert os.getpid() not in pids
+    with truncated_algebra():
+        pids = parallel_map(_get_pid, range(8), workers=2)
+    assert set(pids) == {os.getpid()}
@@ -0,0 +1,84 @@
+import pickle
+
+from qnet import OperatorSymbol, Destroy, SLH, Matrix
+from qnet.utils.simplify_profiles import (
+    TieredSimplify, get_simplify_func, set_simplify_profile, simplify_profile)
+
+import sympy
+import pytest
+
+
+def test_tiered_simplify():
+    """Test the stages and budgets of TieredSimplify"""
+    x, y = sympy.symbols('x y')
+    calls = []
+
+    def final(expr):
+        calls.append(expr)
+        return sympy.simplify(expr)
+
+    tiered = TieredSimplify(final=final)
+    assert tiered((x**2 - 1) / (x - 1)) == x + 1
+    assert tiered(sympy.sin(x)**2 + sympy.cos(x)**2) == 1
+    assert len(calls) == 2
+    assert tiered(x) == x
+    assert tiered(2) == 2
+    assert len(calls) == 2
+
+    # expressions that are too large skip the final simplification
+    coeff = (sympy.sin(x)**2 + sympy.cos(x)**2) * (x + y)**3
+    tiered = TieredSimplify(final=final, max_ops=5)
+    res = tiered(coeff)
+    assert len(calls) == 2
+    assert sympy.count_ops(res) <= sympy.count_ops(coeff)
+    assert sympy.simplify(res - coeff) == 0
+
+    # an exhausted time budget skips all further stages
+    tiered = TieredSimplify(final=final, time_budget=-1)
+    assert tiered(coeff) is coeff
+    assert len(calls) == 2
+
+    # the result is never worse than the input
+    tiered = TieredSimplify(stages=[sympy.expand], final=None)
+    assert tiered.stages == (sympy.expand, )
+    assert tiered((x + y)**3) == (x + y)**3
+
+    assert TieredSimplify(max_ops=5) == TieredSimplify(max_ops=5)
+    assert TieredSimplify(max_ops=5) != TieredSimplify(max_ops=6)
+    tiered = TieredSimplify(max_ops=5, time_budget=1.0)
+    assert pickle.loads(pickle.dumps(tiered)) == tiered
+    assert hash(pickle.loads(pickle.dumps(tiered))) == hash(tiered)
+
+
+def test_simplify_profiles():
+    """Test selecting the default simplification profile"""
+    x = sympy.symbols('x', positive=True)
+    assert get_simplify_func() is sympy.simplify
+    assert get_simplify_func('thorough') is sympy.simplify
+    assert isinstance(get_simplify_func('fast'), TieredSimplify)
+    assert get_simplify_func(sympy.expand) is sympy.expand
+    with pytest.raises(ValueError):
+        get_simplify_func('slow')
+    with pytest.raises(ValueError):
+        set_simplify_profile('slow')
+    with pytest.raises(TypeError):
+        set_simplify_profile(None)
+
+    A = OperatorSymbol('A', hs=0)
+    expr = (x**2 - 1) / (x - 1) * A
+    with simplify_profile('fast'):
+        assert get_simplify_func() == get_simplify_func('fast')
+        assert expr.simplify_scalar() == (x + 1) * A
+    assert get_simplify_func() is sympy.simplify
+    assert expr.simplify_scalar('fast') == (x + 1) * A
+
+    a = Destroy(hs=0)
+    slh = SLH(Matrix([[1]]), Matrix([[sympy.sqrt(x**2) * a]]), expr)
+    prev_profile = set_simplify_profile('fast')
+    try:
+        assert prev_profile == 'thorough'
+        slh_simplified = slh.simplify_scalar()
+        assert slh_simplified.L[0, 0] == x * a
+        assert slh_simplified.H == (x + 1) * A
+    finally:
+        set_simplify_profile(prev_profile)
@@ -3,11 +3,11 @@ import unittest
 from sympy import sqrt, exp, I, pi, Idx, IndexedBase, symbols, factorial
 
 from qnet.algebra.core.abstract_algebra import simplify
-from qnet.algebra.core.scalar_algebra import ScalarValue
+from qnet.algebra.core.scalar_algebra import ScalarValue, KroneckerDelta
 from qnet.algebra.toolbox.core import no_rules
 from qnet.algebra.core.operator_algebra import (
         OperatorSymbol, Create, Destroy, Jplus, Jminus, Jz, Phase, Displace,
-        LocalSigma, IdentityOperator, OperatorPlus)
+        LocalSigma, IdentityOperator, OperatorPlus, ZeroOperator)
 from qnet.algebra.core.hilbert_space_algebra import LocalSpace
 from qnet.algebra.core.state_algebra import (
     KetSymbol, ZeroKet, KetPlus, ScalarTimesKet, CoherentStateKet,
@@ -416,3 +416,71 @@ def test_disallow_inner_bra():
     assert isinstance(
         KetIndexedSum.create(Bra(psi_i), IndexOverFockSpace(i, hs=0)),
         Bra)
+
+
+def test_basis_ket_index_products():
+    """Test products of basis kets and of local sigmas that are reduced by
+    comparing levels directly"""
+    hs = LocalSpace('a', basis=('g', 'e', 'r'))
+    hs_no_basis = LocalSpace('b')
+    for space in (hs, hs_no_basis):
+        ket = [BasisKet(i, hs=space) for i in range(3)]
+        sig = [[LocalSigma.create(i, j, hs=space) for j in range(3)]
+               for i in range(3)]
+        for i in range(3):
+            for j in range(3):
+                assert BraKet.create(ket[i], ket[j]) == (1 if i == j else 0)
+                assert KetBra.create(ket[i], ket[j]) == LocalSigma(
+                    i, j, hs=space)
+                for k in range(3):
+                    for m in range(3):
+                        if j == k:
+                            assert sig[i][j] * sig[k][m] == sig[i][m]
+                        else:
+                            assert sig[i][j] * sig[k][m] == ZeroOperator
+        A = OperatorSymbol('A', hs=space)
+        assert sig[0][1] * sig[1][2] * A * sig[2][0] == (
+            sig[0][2] * A * sig[2][0])
+        assert (sig[0][1] * sig[1][2] * sig[2][0]).__class__ == (
+            sig[0][0].__class__)
+    assert LocalSigma('g', 'e', hs=hs) * LocalSigma(1, 'r', hs=hs) == (
+        LocalSigma(0, 2, hs=hs))
+
+    # symbolic labels fall through to the rules
+    i, j = symbols('i, j', cls=IdxSym)
+    ket_i = BasisKet(FockIndex(i), hs=0)
+    ket_j = BasisKet(FockIndex(j), hs=0)
+    assert BraKet.create(ket_i, ket_j) == KroneckerDelta(i, j)
+    sig_i = LocalSigma(0, FockIndex(i), hs=0)
+    sig_j = LocalSigma(FockIndex(j), 1, hs=0)
+    assert sig_i * sig_j == KroneckerDelta(i, j) * LocalSigma(0, 1, hs=0)
+
+
+def test_ketbra_iter_terms():
+    """Test that the terms of a KetBra have the conjugate coefficients of the
+    bra"""
+    from qnet.algebra.core.operator_algebra import get_coeffs
+    g = symbols('g')
+    hs = LocalSpace('ketbra_terms', dimension=2)
+    psi = BasisKet(0, hs=hs) + g * BasisKet(1, hs=hs)
+    phi = BasisKet(0, hs=hs) + I * BasisKet(1, hs=hs)
+    for expr in (KetBra(psi, psi), KetBra(phi, psi), KetBra(psi, phi)):
+        total = sum(c * t for (c, t) in expr.iter_terms())
+        assert (total - expr.expand()).expand() == ZeroOperator
+        assert get_coeffs(expr, expand=True) == get_coeffs(expr.expand())
+    coeffs = get_coeffs(KetBra(psi, psi), expand=True)
+    assert coeffs[LocalSigma(0, 1, hs=hs)] == g.conjugate()
+    assert coeffs[LocalSigma(1, 1, hs=hs)] == g * g.conjugate()
+    coeffs = get_coeffs(KetBra(psi, phi), expand=True)
+    assert coeffs[LocalSigma(0, 1, hs=hs)] == -I
+
+
+def test_ketbra_fingerprint():
+    """Test that a KetBra has the same fingerprint as its expansion, for
+    complex and symbolic coefficients in the bra"""
+    g = symbols('g')
+    hs = LocalSpace('ketbra_fp', dimension=2)
+    psi = BasisKet(0, hs=hs) + g * BasisKet(1, hs=hs)
+    phi = BasisKet(0, hs=hs) + (0.5 + 1j) * BasisKet(1, hs=hs)
+    for expr in (KetBra(psi, psi), KetBra(phi, phi), KetBra(psi, I * phi)):
+        assert expr.fingerprint() == expr.expand().fingerprint()
@@ -87,3 +87,31 @@ def test_convert_to_sympy_matrix():
     expr2 = qnet.algebra.core.operator_algebra.Destroy(hs=Hil)
     assert (convert_to_sympy_matrix(expr, expr.space)
             == convert_to_sympy_matrix(expr2, expr2.space))
+
+
+def test_convert_indexed_sum_to_sympy_matrix():
+    from qnet.algebra.core.operator_algebra import (
+        Destroy, LocalSigma, OperatorIndexedSum)
+    from qnet.utils.indices import FockIndex, IdxSym, IndexOverRange
+    Hil = LocalSpace('full', basis=range(4))
+    i = IdxSym('i')
+    term = sympy.sqrt(i) * LocalSigma(FockIndex(i - 1), FockIndex(i), hs=Hil)
+    expr = OperatorIndexedSum(term, IndexOverRange(i, 1, 3))
+    a = convert_to_sympy_matrix(Destroy(hs=Hil), Hil)
+    assert convert_to_sympy_matrix(expr, Hil) == a
+    assert convert_to_sympy_matrix(expr.doit_iter(chunk_size=2), Hil) == a
+
+
+def test_convert_ketbra_to_sympy_matrix():
+    from qnet.algebra.core.operator_algebra import Create
+    from qnet.algebra.core.state_algebra import BasisKet, KetBra
+    g = sympy.symbols('g')
+    Hil_q1 = LocalSpace('Q1', basis=range(2))
+    Hil_q2 = LocalSpace('Q2', basis=range(2))
+    psi = (
+        BasisKet(0, hs=Hil_q1) * BasisKet(0, hs=Hil_q2) +
+        g * BasisKet(1, hs=Hil_q1) * BasisKet(1, hs=Hil_q2))
+    expr = KetBra(psi, psi) * Create(hs=Hil_q2)
+    space = Hil_q1 * Hil_q2
+    assert convert_to_sympy_matrix(expr, space) == convert_to_sympy_matrix(
+        expr.expand(), space)
@@ -1,3 +1,4 @@
+import sympy
 from sympy import symbols
 import numpy as np
 from numpy import sqrt
@@ -6,13 +7,20 @@ import qutip
 import pytest
 
 from qnet.algebra.core.operator_algebra import (
-    Create, Destroy, LocalSigma, LocalProjector, OperatorSymbol,
-    ScalarTimesOperator, ZeroOperator)
+    Create, Destroy, IdentityOperator, LocalSigma, LocalProjector,
+    OperatorSymbol, OperatorPower, ScalarTimesOperator, ZeroOperator)
 from qnet.algebra.core.circuit_algebra import SLH
 from qnet.algebra.core.matrix_algebra import identity_matrix, Matrix
 from qnet.convert.to_qutip import (
-    _time_dependent_to_qutip, convert_to_qutip, SLH_to_qutip)
+    _convert_terms_to_qutip, _time_dependent_to_qutip, convert_to_qutip,
+    SLH_to_qutip)
 from qnet.algebra.core.hilbert_space_algebra import LocalSpace
+from qnet.algebra.core.operator_algebra import OperatorIndexedSum
+from qnet.algebra.core.scalar_algebra import KroneckerDelta
+from qnet.algebra.core.state_algebra import (
+    BasisKet, CoherentStateKet, KetBra, KetIndexedSum)
+from qnet.utils.indices import (
+    FockIndex, IdxSym, IndexOverFockSpace, IndexOverList, IndexOverRange)
 
 _hs_counter = 0
 
@@ -70,6 +78,17 @@ def test_tensor_product():
                                     convert_to_qutip(sigma))
 
 
+def test_operator_power():
+    H = LocalSpace(hs_name(), dimension=5)
+    a = Create(hs=H).adjoint()
+    H2 = LocalSpace(hs_name(), basis=("e", "g", "h"))
+    sigma = LocalSigma('g', 'e', hs=H2)
+    aq = convert_to_qutip(a)
+    assert convert_to_qutip(OperatorPower(a, 3)) == aq**3
+    assert convert_to_qutip(OperatorPower(a, 2) * sigma) == qutip.tensor(
+        aq**2, convert_to_qutip(sigma))
+
+
 def test_local_sum():
     H = LocalSpace(hs_name(), dimension=5)
     ad = Create(hs=H)
@@ -87,6 +106,112 @@ def test_nonlocal_sum():
                         convert_to_qutip((a + sigma)*(a + sigma))
 
 
+def test_iter_terms():
+    i = IdxSym('i')
+    H = LocalSpace(hs_name(), dimension=5)
+    a = Create(hs=H).adjoint()
+    H2 = LocalSpace(hs_name(), basis=("e", "g", "h"))
+    sigma = LocalSigma('g', 'e', hs=H2)
+    expr = (a + sigma) * (a.dag() + 2 * sigma.dag())
+    full_space = H * H2
+    assert (
+        convert_to_qutip(expr.iter_terms(), full_space=full_space) ==
+        convert_to_qutip(expr.expand()))
+    assert convert_to_qutip(expr) == convert_to_qutip(expr.expand())
+    with pytest.raises(ValueError):
+        convert_to_qutip(expr.iter_terms())
+    with pytest.raises(ValueError):
+        convert_to_qutip(ZeroOperator.iter_terms(), full_space=full_space)
+    # an expansion without terms is converted to a zero of the right shape
+    psi = KetIndexedSum(
+        BasisKet(FockIndex(i), hs=H), IndexOverFockSpace(i, hs=H))
+    zero = _convert_terms_to_qutip(iter([]), H, None, expr=psi)
+    assert zero.isket and zero.shape == (5, 1) and zero.norm() == 0
+    zero = _convert_terms_to_qutip(iter([]), H, None, expr=psi.dag())
+    assert zero.isbra and zero.norm() == 0
+    zero = _convert_terms_to_qutip(iter([]), full_space, None, expr=expr)
+    assert zero == convert_to_qutip(ZeroOperator, full_space)
+
+
+def test_ketbra_iter_terms():
+    """Test the conversion of a KetBra with complex coefficients in the bra,
+    via its terms"""
+    H1 = LocalSpace(hs_name(), dimension=2)
+    H2 = LocalSpace(hs_name(), dimension=3)
+    psi = (
+        BasisKet(0, hs=H1) * BasisKet(0, hs=H2) +
+        (0.5 + 1j) * BasisKet(1, hs=H1) * BasisKet(1, hs=H2))
+    expr = KetBra(psi, psi) * Destroy(hs=H2).dag()
+    assert (
+        convert_to_qutip(expr) - convert_to_qutip(expr.expand())
+    ).norm() < 1e-12
+    assert (
+        convert_to_qutip(expr.iter_terms(), full_space=H1*H2) -
+        convert_to_qutip(expr.expand())).norm() < 1e-12
+
+
+def test_indexed_sum():
+    H = LocalSpace(hs_name(), dimension=5)
+    i = IdxSym('i')
+    a = Destroy(hs=H)
+    term = sympy.sqrt(i) * LocalSigma(FockIndex(i - 1), FockIndex(i), hs=H)
+    expr = OperatorIndexedSum(term, IndexOverRange(i, 1, 4))
+    assert convert_to_qutip(expr) == convert_to_qutip(a)
+    assert convert_to_qutip(
+        expr.doit_iter(chunk_size=3), full_space=H) == convert_to_qutip(a)
+    psi = KetIndexedSum(
+        BasisKet(FockIndex(i), hs=H), IndexOverFockSpace(i, hs=H))
+    assert convert_to_qutip(psi) == convert_to_qutip(psi.doit())
+
+
+def test_indexed_sum_identity():
+    """Test the conversion of an indexed sum over scalars times the
+    identity"""
+    H = LocalSpace(hs_name(), dimension=3)
+    i = IdxSym('i')
+    expr = OperatorIndexedSum(i * IdentityOperator, IndexOverRange(i, 0, 2))
+    assert (
+        convert_to_qutip(expr, full_space=H) ==
+        convert_to_qutip(expr.doit(), full_space=H))
+    assert convert_to_qutip(expr, full_space=H) == 3 * qutip.qeye(3)
+
+
+def test_indexed_sum_vectorized():
+    """Test the conversion of indexed sums that does not expand the sum"""
+    H1 = LocalSpace(hs_name(), dimension=20)
+    H2 = LocalSpace(hs_name(), dimension=3)
+    i, j = IdxSym('i'), IdxSym('j')
+    alpha = 0.5 + 0.25j
+    psi = CoherentStateKet(alpha, hs=H1).to_fock_representation()
+    assert (
+        convert_to_qutip(psi) -
+        qutip.coherent(20, alpha, method='analytic')).norm() < 1e-12
+    one = OperatorIndexedSum(
+        KroneckerDelta(i, j) * LocalSigma(FockIndex(i), FockIndex(j), hs=H2),
+        IndexOverFockSpace(i, hs=H2), IndexOverFockSpace(j, hs=H2))
+    assert convert_to_qutip(one) == qutip.qeye(3)
+    psi = KetIndexedSum(
+        (i + 2 * j) * BasisKet(FockIndex(i), hs=H1) *
+        BasisKet(FockIndex(j), hs=H2),
+        IndexOverRange(i, 0, 19, step=2), IndexOverList(j, [0, 2]))
+    assert (
+        convert_to_qutip(psi) -
+        convert_to_qutip(psi.doit())).norm() < 1e-12
+    op = OperatorIndexedSum(
+        sympy.sqrt(i) * LocalSigma(FockIndex(i - 1), FockIndex(i), hs=H2),
+        IndexOverRange(i, 1, 2))
+    assert (
+        convert_to_qutip(op, full_space=H1*H2) ==
+        convert_to_qutip(op.doit(), full_space=H1*H2))
+    # labels outside of the Hilbert space are not handled numerically, but
+    # are left to the term-by-term conversion
+    op = OperatorIndexedSum(
+        LocalSigma(FockIndex(i + 1), FockIndex(i), hs=H2),
+        IndexOverFockSpace(i, hs=H2))
+    with pytest.raises(ValueError):
+        convert_to_qutip(op)
+
+
 def test_scalar_coeffs():
     H = LocalSpace(hs_name(), dimension=5)
     a = Create(hs=H).adjoint()